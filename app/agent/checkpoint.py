@@ -0,0 +1,118 @@
+# app/agent/checkpoint.py
+"""메인 그래프 체크포인트 (승인 대기 run의 중단/재개)
+
+승인이 필요한 run은 EXECUTE 노드 직전에 중단되고, 그 시점의 상태가 체크포인트로 저장된다.
+승인 후에는 체크포인트에서 EXECUTE부터 이어서 실행하므로 분류/검색/분석 노드를 다시 실행하지 않으며,
+프로세스가 재시작되어도 (sqlite 백엔드) 승인 대기 run을 재개할 수 있다.
+
+저장소는 langgraph-checkpoint-sqlite의 SqliteSaver를 그대로 쓰고, 저장 크기를 줄이기 위해
+- 직렬화 결과가 일정 크기 이상이면 zlib 압축 (CompressingSerializer)
+- 기본 저장 시점은 run 종료/중단 시 1회 (CHECKPOINT_DURABILITY=exit)
+- 서브그래프는 체크포인트 없이 실행 (부모 노드 단위로만 저장)
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 체크포인트에서 복원을 허용할 상태 모델 (그 외 사용자 정의 타입은 역직렬화하지 않음)
+_STATE_MODELS = [("app.agent.state", name) for name in ("ComplianceResult", "RCAResult", "WorkflowResult")]
+
+# 이 크기 이상인 직렬화 값만 압축 (작은 값은 압축 이득보다 오버헤드가 큼)
+_COMPRESS_MIN_BYTES = 512
+_ZLIB_SUFFIX = "+zlib"
+
+
+class CompressingSerializer(SerializerProtocol):
+    """직렬화 결과가 일정 크기 이상이면 zlib 압축 (타입 이름에 +zlib 표시, 압축 안 된 기존 값도 읽음)"""
+    
+    def __init__(self, inner: SerializerProtocol, min_bytes: int = _COMPRESS_MIN_BYTES):
+        self.inner = inner
+        self.min_bytes = min_bytes
+    
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= self.min_bytes:
+            compressed = zlib.compress(data)
+            if len(compressed) < len(data):
+                return type_ + _ZLIB_SUFFIX, compressed
+        return type_, data
+    
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(_ZLIB_SUFFIX):
+            type_, payload = type_[:-len(_ZLIB_SUFFIX)], zlib.decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+@lru_cache(maxsize=1)
+def get_checkpointer() -> BaseCheckpointSaver:
+    """체크포인트 저장소 싱글톤 (CHECKPOINT_BACKEND: sqlite | memory)"""
+    settings = get_settings()
+    serde = JsonPlusSerializer(allowed_msgpack_modules=_STATE_MODELS)
+    if settings.CHECKPOINT_BACKEND == "memory":
+        logger.info("[checkpoint] Using in-memory checkpoints (lost on restart)")
+        return InMemorySaver(serde=serde)
+    
+    db_path = settings.CHECKPOINT_DB_PATH or settings.DATA_DIR / "checkpoints.sqlite"
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # 그래프 실행 스레드와 승인 API 스레드가 함께 사용 (SqliteSaver가 내부 락으로 직렬화)
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+    logger.info(f"[checkpoint] Opened checkpoint store: {db_path}")
+    return SqliteSaver(conn, serde=CompressingSerializer(serde))
+
+
+def thread_config(run_id: str) -> RunnableConfig:
+    """run 하나 = 체크포인트 thread 하나"""
+    return {"configurable": {"thread_id": run_id}}
+
+
+def list_thread_ids() -> List[str]:
+    """체크포인트가 남아 있는 run 목록"""
+    saver = get_checkpointer()
+    if isinstance(saver, SqliteSaver):
+        # 체크포인트 본문을 역직렬화하지 않고 thread_id만 조회
+        with saver.cursor(transaction=False) as cur:
+            return [row[0] for row in cur.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+    return list(dict.fromkeys(item.config["configurable"]["thread_id"] for item in saver.list(None)))
+
+
+def delete_checkpoints(run_id: str) -> None:
+    get_checkpointer().delete_thread(run_id)
+
+
+def delete_expired_checkpoints(retention_hours: float) -> List[str]:
+    """마지막 체크포인트가 보존 기간보다 오래된 run의 체크포인트 삭제
+    
+    Returns:
+        삭제된 run_id 목록
+    """
+    saver = get_checkpointer()
+    cutoff = time.time() - retention_hours * 3600
+    expired = []
+    for thread_id in list_thread_ids():
+        latest = saver.get_tuple(thread_config(thread_id))
+        if latest is not None and datetime.fromisoformat(latest.checkpoint["ts"]).timestamp() < cutoff:
+            expired.append(thread_id)
+    
+    for thread_id in expired:
+        saver.delete_thread(thread_id)
+    if expired:
+        logger.info(f"[checkpoint] Deleted checkpoints of {len(expired)} run(s) older than {retention_hours}h")
+    return expired
@@ -0,0 +1,147 @@
+"""검색 증거 추출 압축 (CPU 전용, 프롬프트 조립 전 단계)
+
+검색된 청크를 그대로 넘기면 chunk_text 가 붙인 오버랩 접두사와 질의와 무관한 문장까지
+프롬프트 토큰을 차지한다. 청크를 문장(줄) 단위로 나눠 질의와의 TF-IDF 코사인 유사도로
+점수를 매기고, 청크마다 상위 문장만 원래 순서대로 남긴다. 남긴 문장 바로 위의
+마크다운 제목은 문맥 유지를 위해 함께 남기며, doc_id·metadata(출처)는 그대로 유지한다.
+
+한국어는 조사가 붙어 어절 단위로는 잘 일치하지 않으므로 어절과 함께 문자 2-gram을 용어로 쓴다.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+_SENTENCE_SPLIT = re.compile(r"(?<=\D[.!?。])\s+|\n+")  # "1." 같은 목록 번호는 분리하지 않음
+_TERM = re.compile(r"[0-9A-Za-z가-힣]+")
+_HEADING = re.compile(r"^#{1,6}\s")
+OVERLAP_SEPARATOR = " ... "
+
+
+@dataclass
+class CompressionStats:
+    """압축 결과 통계"""
+    chunks: int = 0
+    compressed_chunks: int = 0
+    sentences_total: int = 0
+    sentences_kept: int = 0
+    chars_before: int = 0
+    chars_after: int = 0
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장/줄 단위 분리 (빈 문장 제외)"""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+def _terms(text: str) -> List[str]:
+    """어절 + 문자 2-gram"""
+    terms = []
+    for word in _TERM.findall(text.lower()):
+        terms.append(word)
+        if len(word) > 2:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def strip_overlap(content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """chunk_text 가 두 번째 청크부터 앞에 붙인 '이전 청크 꼬리 ... ' 접두사 제거"""
+    if not metadata or not metadata.get("chunk_index"):
+        return content
+    window = get_settings().CHUNK_OVERLAP + len(OVERLAP_SEPARATOR)
+    position = content.find(OVERLAP_SEPARATOR, 0, window)
+    if position < 0:
+        return content
+    return content[position + len(OVERLAP_SEPARATOR):]
+
+
+class TfidfScorer:
+    """문장 집합으로 IDF를 학습해 질의-문장 코사인 유사도 계산"""
+    
+    def __init__(self, sentences: Sequence[str]):
+        document_frequency: Counter = Counter()
+        for sentence in sentences:
+            document_frequency.update(set(_terms(sentence)))
+        n = len(sentences)
+        self.idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+    
+    def vector(self, text: str) -> Dict[str, float]:
+        counts = Counter(_terms(text))
+        # 질의에만 있는 용어는 문장과 겹치지 않으므로 기본 IDF 1.0
+        weights = {term: (1 + math.log(tf)) * self.idf.get(term, 1.0) for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+    
+    @staticmethod
+    def similarity(query: Dict[str, float], sentence: Dict[str, float]) -> float:
+        if len(sentence) < len(query):
+            query, sentence = sentence, query
+        return sum(w * sentence.get(term, 0.0) for term, w in query.items())
+
+
+def _select(sentences: List[str], scores: List[float], keep: int) -> List[str]:
+    """상위 점수 문장 + 바로 위 제목을 원래 순서대로 반환"""
+    body = [i for i, s in enumerate(sentences) if not _HEADING.match(s)]
+    ranked = sorted(body, key=lambda i: (-scores[i], i))[:keep]
+    
+    selected = set(ranked)
+    for i in ranked:
+        for j in range(i - 1, -1, -1):
+            if _HEADING.match(sentences[j]):
+                selected.add(j)
+                break
+    return [sentences[i] for i in sorted(selected)]
+
+
+def compress_evidence(
+    query: str,
+    evidence: Sequence[Dict[str, Any]],
+    ratio: Optional[float] = None,
+    min_sentences: Optional[int] = None,
+    min_chars: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], CompressionStats]:
+    """증거 청크마다 질의와 관련 높은 문장만 남김
+    
+    Args:
+        query: 사용자 질의
+        evidence: 증거 목록 (content, metadata 사용)
+        ratio: 청크당 남길 문장 비율
+        min_sentences: 청크당 최소 문장 수
+        min_chars: 이보다 짧은 청크는 오버랩 접두사만 제거하고 그대로 사용
+    
+    Returns:
+        (content 가 압축된 증거 사본 목록, 통계)
+    """
+    settings = get_settings()
+    ratio = settings.EVIDENCE_COMPRESSION_RATIO if ratio is None else ratio
+    min_sentences = settings.EVIDENCE_COMPRESSION_MIN_SENTENCES if min_sentences is None else min_sentences
+    min_chars = settings.EVIDENCE_COMPRESSION_MIN_CHARS if min_chars is None else min_chars
+    
+    stats = CompressionStats(chunks=len(evidence))
+    contents = [strip_overlap(e.get("content", ""), e.get("metadata")) for e in evidence]
+    split = [split_sentences(content) for content in contents]
+    
+    scorer = TfidfScorer([s for sentences in split for s in sentences])
+    query_vector = scorer.vector(query)
+    
+    compressed = []
+    for e, content, sentences in zip(evidence, contents, split):
+        stats.chars_before += len(e.get("content", ""))
+        stats.sentences_total += len(sentences)
+        keep = max(min_sentences, math.ceil(len(sentences) * ratio))
+        
+        if len(content) >= min_chars and len(sentences) > keep:
+            scores = [scorer.similarity(query_vector, scorer.vector(s)) for s in sentences]
+            sentences = _select(sentences, scores, keep)
+            content = "\n".join(sentences)
+            stats.compressed_chunks += 1
+        
+        stats.sentences_kept += len(sentences)
+        stats.chars_after += len(content)
+        compressed.append({**e, "content": content})
+    return compressed, stats
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Literal
+from typing import Any, List, Literal
 
 from app.agent.state import AgentState
 from app.integrations.llm.openrouter_client import get_openrouter_client
@@ -28,10 +28,31 @@ INTENT_SYSTEM_PROMPT = """당신은 사용자 요청을 분류하는 전문가
 
 5. **unknown**: 위 카테고리에 해당하지 않거나 판단 불가
 
+capabilities에는 요청 처리에 실제로 필요한 카테고리만 모두 나열하세요 (compliance/rca/workflow 중).
+mixed이면 2개 이상, 단일 카테고리면 그 1개, unknown이면 빈 배열입니다.
+   - 예: "보안 정책 확인 후 배포 계획 세워줘" → mixed, ["compliance", "workflow"]
+
 반드시 다음 JSON 형식으로만 응답하세요:
-{"intent": "compliance" | "rca" | "workflow" | "mixed" | "unknown", "reason": "분류 이유 (1문장)"}
+{"intent": "compliance" | "rca" | "workflow" | "mixed" | "unknown", "capabilities": ["compliance" | "rca" | "workflow"], "reason": "분류 이유 (1문장)"}
 """
 
+CAPABILITIES = ("compliance", "rca", "workflow")
+
+
+def resolve_capabilities(intent: str, capabilities: Any) -> List[str]:
+    """분류 결과를 실행할 서브그래프 목록으로 정규화
+    
+    단일 의도는 해당 서브그래프 하나. mixed는 응답의 capabilities를 쓰되,
+    2개 미만이거나 형식이 잘못되면 기존처럼 전부 실행한다.
+    """
+    if intent in CAPABILITIES:
+        return [intent]
+    if intent != "mixed":
+        return []
+    requested = set(capabilities) if isinstance(capabilities, list) else set()
+    selected = [c for c in CAPABILITIES if c in requested]
+    return selected if len(selected) >= 2 else list(CAPABILITIES)
+
 
 def classify_intent_node(state: AgentState) -> dict:
     """사용자 입력의 Intent를 분류하는 노드"""
@@ -45,7 +66,6 @@ def classify_intent_node(state: AgentState) -> dict:
         return {
             "intent": "unknown",
             "trace": {
-                **state.trace,
                 "classify_intent": {"status": "skipped", "reason": "empty input"}
             }
         }
@@ -67,16 +87,18 @@ def classify_intent_node(state: AgentState) -> dict:
         valid_intents = {"compliance", "rca", "workflow", "mixed", "unknown"}
         if intent not in valid_intents:
             intent = "unknown"
+        capabilities = resolve_capabilities(intent, result.get("capabilities"))
         
-        logger.info(f"[{run_id}] Intent classified: {intent} - {reason}")
+        logger.info(f"[{run_id}] Intent classified: {intent} {capabilities} - {reason}")
         
         return {
             "intent": intent,
+            "capabilities": capabilities,
             "trace": {
-                **state.trace,
                 "classify_intent": {
                     "status": "success",
                     "intent": intent,
+                    "capabilities": capabilities,
                     "reason": reason,
                 }
             }
@@ -86,9 +108,8 @@ def classify_intent_node(state: AgentState) -> dict:
         logger.error(f"[{run_id}] Failed to parse intent response: {e}")
         return {
             "intent": "unknown",
-            "errors": state.errors + [f"Intent 분류 실패: JSON 파싱 오류"],
+            "errors": [f"Intent 분류 실패: JSON 파싱 오류"],
             "trace": {
-                **state.trace,
                 "classify_intent": {"status": "error", "error": str(e)}
             }
         }
@@ -96,9 +117,8 @@ def classify_intent_node(state: AgentState) -> dict:
         logger.error(f"[{run_id}] Intent classification failed: {e}")
         return {
             "intent": "unknown",
-            "errors": state.errors + [f"Intent 분류 실패: {str(e)}"],
+            "errors": [f"Intent 분류 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "classify_intent": {"status": "error", "error": str(e)}
             }
         }
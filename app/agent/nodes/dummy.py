@@ -11,11 +11,13 @@ logger = logging.getLogger(__name__)
 def dummy_node(state: AgentState) -> Dict[str, Any]:
     logger.info(f"[orchestrator][node_start] dummy_node run_id={state.run_id}")
 
-    # state 갱신(전달/변경 증명)
-    state.trace["dummy"] = {
-        "ok": True,
-        "message": "passed dummy node",
+    # state 갱신(전달/변경 증명) - trace 리듀서가 병합하므로 이 노드의 항목만 반환
+    trace = {
+        "dummy": {
+            "ok": True,
+            "message": "passed dummy node",
+        }
     }
 
-    logger.info(f"[orchestrator][node_end] dummy_node run_id={state.run_id} trace={state.trace}")
-    return state.model_dump()
\ No newline at end of file
+    logger.info(f"[orchestrator][node_end] dummy_node run_id={state.run_id} trace={trace}")
+    return {"trace": trace}
\ No newline at end of file
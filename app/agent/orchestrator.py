@@ -2,18 +2,23 @@
 """LangGraph 메인 오케스트레이터 - 서브그래프 라우팅"""
 from __future__ import annotations
 
+import contextvars
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from functools import lru_cache
 from typing import Literal
 
 from langgraph.graph import StateGraph, START, END
 
+from app.agent.checkpoint import get_checkpointer
 from app.agent.state import AgentState
-from app.agent.nodes.classify_intent import classify_intent_node
+from app.agent.nodes.classify_intent import CAPABILITIES, classify_intent_node
+from app.agent.prefetch import start_prefetch
 from app.agent.subgraphs.compliance_graph import get_compliance_graph
 from app.agent.subgraphs.rca_graph import get_rca_graph
 from app.agent.subgraphs.workflow_graph import get_workflow_graph
+from app.core.config import get_settings
 from app.core.logging import (
     get_structured_logger,
     log_node_start,
@@ -23,11 +28,46 @@ from app.core.logging import (
     log_error,
     log_approval,
 )
-from app.services.audit_service import create_audit_summary, save_audit_summary
+from app.services.audit_service import RUN_METRICS_KEY, create_audit_summary, save_audit_summary, snapshot_run_metrics
 
 logger = get_structured_logger(__name__)
 
 
+# ===== 노드 함수 =====
+
+def classify_intent_with_prefetch_node(state: AgentState) -> dict:
+    """Intent 분류 노드 - 분류 LLM 호출과 병행해 검색을 미리 시작 (RETRIEVAL_PREFETCH_ENABLED)"""
+    prefetch = start_prefetch(state.run_id, state.user_input or "")
+    result = classify_intent_node(state)
+    if prefetch is None:
+        return result
+    
+    # 실행할 서브그래프에 필요 없는 검색은 취소
+    prefetch.keep(result.get("capabilities", []))
+    return {
+        **result,
+        "trace": {
+            **result.get("trace", {}),
+            "retrieval_prefetch": prefetch.summary(),
+        }
+    }
+
+
+def _subgraph_delta(state: AgentState, result: dict) -> dict:
+    """서브그래프 최종 상태에서 부모 상태 대비 새로 추가된 evidence / errors / trace 항목만 추출
+    
+    서브그래프는 입력 상태를 그대로 이어받아 리듀서로 누적하므로 앞부분은 부모 값과 같은 객체다.
+    """
+    return {
+        "evidence": result.get("evidence", [])[len(state.evidence):],
+        "errors": result.get("errors", [])[len(state.errors):],
+        "trace": {
+            key: value for key, value in result.get("trace", {}).items()
+            if state.trace.get(key) is not value
+        },
+    }
+
+
 # ===== 라우터 함수 =====
 
 def route_by_intent(state: AgentState) -> Literal["COMPLIANCE", "RCA", "WORKFLOW", "MIXED", "END"]:
@@ -63,17 +103,15 @@ def compliance_subgraph_node(state: AgentState) -> dict:
         compliance_graph = get_compliance_graph()
         
         # 서브그래프 실행
-        result = compliance_graph.invoke(state.model_dump())
+        result = compliance_graph.invoke(state)
         
         duration_ms = (time.perf_counter() - start_time) * 1000
         log_node_end(logger, run_id, "COMPLIANCE_SUBGRAPH", duration_ms, "success")
         
-        # 결과에서 필요한 필드만 추출하여 반환
+        # 결과에서 필요한 필드와 새로 추가된 항목만 반환
         return {
             "compliance_result": result.get("compliance_result"),
-            "evidence": result.get("evidence", state.evidence),
-            "errors": result.get("errors", state.errors),
-            "trace": result.get("trace", state.trace),
+            **_subgraph_delta(state, result),
         }
         
     except Exception as e:
@@ -81,9 +119,8 @@ def compliance_subgraph_node(state: AgentState) -> dict:
         log_error(logger, run_id, "SubgraphError", str(e), "COMPLIANCE_SUBGRAPH")
         log_node_end(logger, run_id, "COMPLIANCE_SUBGRAPH", duration_ms, "error", {"error": str(e)})
         return {
-            "errors": state.errors + [f"Compliance 서브그래프 실행 실패: {str(e)}"],
+            "errors": [f"Compliance 서브그래프 실행 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "compliance_subgraph": {"status": "error", "error": str(e)}
             }
         }
@@ -100,18 +137,16 @@ def rca_subgraph_node(state: AgentState) -> dict:
         rca_graph = get_rca_graph()
         
         # 서브그래프 실행
-        result = rca_graph.invoke(state.model_dump())
+        result = rca_graph.invoke(state)
         
         duration_ms = (time.perf_counter() - start_time) * 1000
         log_node_end(logger, run_id, "RCA_SUBGRAPH", duration_ms, "success")
         
-        # 결과에서 필요한 필드만 추출하여 반환
+        # 결과에서 필요한 필드와 새로 추가된 항목만 반환
         return {
             "rca_result": result.get("rca_result"),
             "context": result.get("context", state.context),
-            "evidence": result.get("evidence", state.evidence),
-            "errors": result.get("errors", state.errors),
-            "trace": result.get("trace", state.trace),
+            **_subgraph_delta(state, result),
         }
         
     except Exception as e:
@@ -119,9 +154,8 @@ def rca_subgraph_node(state: AgentState) -> dict:
         log_error(logger, run_id, "SubgraphError", str(e), "RCA_SUBGRAPH")
         log_node_end(logger, run_id, "RCA_SUBGRAPH", duration_ms, "error", {"error": str(e)})
         return {
-            "errors": state.errors + [f"RCA 서브그래프 실행 실패: {str(e)}"],
+            "errors": [f"RCA 서브그래프 실행 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "rca_subgraph": {"status": "error", "error": str(e)}
             }
         }
@@ -138,7 +172,7 @@ def workflow_subgraph_node(state: AgentState) -> dict:
         workflow_graph = get_workflow_graph()
         
         # 서브그래프 실행
-        result = workflow_graph.invoke(state.model_dump())
+        result = workflow_graph.invoke(state)
         
         duration_ms = (time.perf_counter() - start_time) * 1000
         log_node_end(logger, run_id, "WORKFLOW_SUBGRAPH", duration_ms, "success")
@@ -150,9 +184,7 @@ def workflow_subgraph_node(state: AgentState) -> dict:
             "approval_required": result.get("approval_required", state.approval_required),
             "approval_status": result.get("approval_status", state.approval_status),
             "context": result.get("context", state.context),
-            "evidence": result.get("evidence", state.evidence),
-            "errors": result.get("errors", state.errors),
-            "trace": result.get("trace", state.trace),
+            **_subgraph_delta(state, result),
         }
         
     except Exception as e:
@@ -160,99 +192,113 @@ def workflow_subgraph_node(state: AgentState) -> dict:
         log_error(logger, run_id, "SubgraphError", str(e), "WORKFLOW_SUBGRAPH")
         log_node_end(logger, run_id, "WORKFLOW_SUBGRAPH", duration_ms, "error", {"error": str(e)})
         return {
-            "errors": state.errors + [f"Workflow 서브그래프 실행 실패: {str(e)}"],
+            "errors": [f"Workflow 서브그래프 실행 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "workflow_subgraph": {"status": "error", "error": str(e)}
             }
         }
 
 
+# 복합 요청 서브그래프 실행 순서: 분석(compliance, rca)은 서로 독립이라 병렬,
+# workflow는 분석 결과를 컨텍스트로 쓰므로 분석 후 실행
+MIXED_ANALYSIS_SUBGRAPHS = ("compliance", "rca")
+MIXED_LABELS = {"compliance": "Compliance", "rca": "RCA", "workflow": "Workflow"}
+
+
+def _run_mixed_subgraph(name: str, sub_state: dict) -> dict:
+    """복합 요청의 서브그래프 하나 실행"""
+    graph = {
+        "compliance": get_compliance_graph,
+        "rca": get_rca_graph,
+        "workflow": get_workflow_graph,
+    }[name]()
+    return graph.invoke(sub_state)
+
+
 def mixed_subgraph_node(state: AgentState) -> dict:
-    """복합 요청 처리 - 다중 서브그래프 순차 실행 노드"""
+    """복합 요청 처리 - 분류된 capabilities의 서브그래프만 실행 (독립 서브그래프는 병렬) 노드"""
     run_id = state.run_id
-    log_node_start(logger, run_id, "MIXED_SUBGRAPH", {"subgraphs": ["compliance", "rca", "workflow"]})
+    plan = list(state.capabilities) or list(CAPABILITIES)
+    skipped = [name for name in CAPABILITIES if name not in plan]
+    log_node_start(logger, run_id, "MIXED_SUBGRAPH", {"subgraphs": plan, "skipped": skipped})
     start_time = time.perf_counter()
     
     # 결과를 누적할 변수들
     compliance_result = None
     rca_result = None
     workflow_result = None
-    context = dict(state.context)
-    evidence = list(state.evidence)
-    errors = list(state.errors)
-    trace = dict(state.trace)
+    context = state.context
+    evidence = state.evidence
+    errors = []
+    trace = {}
     action_plan = state.action_plan
     approval_required = state.approval_required
     approval_status = state.approval_status
     
-    # 1. Compliance 서브그래프 실행
-    try:
-        log_action(logger, run_id, "mixed_subgraph", "Compliance 서브그래프 실행", {"step": 1})
-        compliance_graph = get_compliance_graph()
-        compliance_state = state.model_dump()
-        compliance_state["context"] = context
-        compliance_state["evidence"] = evidence
-        
-        result = compliance_graph.invoke(compliance_state)
-        
-        compliance_result = result.get("compliance_result")
-        evidence = result.get("evidence", evidence)
-        trace["mixed_compliance"] = {"status": "success"}
-        
-    except Exception as e:
-        log_error(logger, run_id, "MixedSubgraphError", str(e), "MIXED_COMPLIANCE")
-        errors.append(f"Mixed-Compliance 실패: {str(e)}")
-        trace["mixed_compliance"] = {"status": "error", "error": str(e)}
-    
-    # 2. RCA 서브그래프 실행
-    try:
-        log_action(logger, run_id, "mixed_subgraph", "RCA 서브그래프 실행", {"step": 2})
-        rca_graph = get_rca_graph()
-        rca_state = state.model_dump()
-        rca_state["context"] = context
-        rca_state["evidence"] = evidence
-        
-        result = rca_graph.invoke(rca_state)
-        
-        rca_result = result.get("rca_result")
-        context = result.get("context", context)
-        evidence = result.get("evidence", evidence)
-        trace["mixed_rca"] = {"status": "success"}
-        
-    except Exception as e:
-        log_error(logger, run_id, "MixedSubgraphError", str(e), "MIXED_RCA")
-        errors.append(f"Mixed-RCA 실패: {str(e)}")
-        trace["mixed_rca"] = {"status": "error", "error": str(e)}
-    
-    # 3. Workflow 서브그래프 실행 (이전 분석 결과를 컨텍스트로 전달)
-    try:
-        log_action(logger, run_id, "mixed_subgraph", "Workflow 서브그래프 실행", {"step": 3})
-        workflow_graph = get_workflow_graph()
-        workflow_state = state.model_dump()
-        workflow_state["context"] = context
-        workflow_state["evidence"] = evidence
-        
-        # 이전 분석 결과를 Workflow에 전달
-        if compliance_result:
-            workflow_state["compliance_result"] = compliance_result
-        if rca_result:
-            workflow_state["rca_result"] = rca_result
-        
-        result = workflow_graph.invoke(workflow_state)
-        
-        workflow_result = result.get("workflow_result")
-        action_plan = result.get("action_plan", action_plan)
-        approval_required = result.get("approval_required", approval_required)
-        approval_status = result.get("approval_status", approval_status)
-        context = result.get("context", context)
-        evidence = result.get("evidence", evidence)
-        trace["mixed_workflow"] = {"status": "success"}
-        
-    except Exception as e:
-        log_error(logger, run_id, "MixedSubgraphError", str(e), "MIXED_WORKFLOW")
-        errors.append(f"Mixed-Workflow 실패: {str(e)}")
-        trace["mixed_workflow"] = {"status": "error", "error": str(e)}
+    # 1. 분석 서브그래프 실행 (compliance, rca - 둘 다 필요하면 병렬)
+    analysis = [name for name in MIXED_ANALYSIS_SUBGRAPHS if name in plan]
+    parallel = len(analysis) > 1 and get_settings().MIXED_PARALLEL_ENABLED
+    futures = {}
+    if parallel:
+        executor = ThreadPoolExecutor(max_workers=len(analysis), thread_name_prefix="mixed-subgraph")
+        for name in analysis:
+            log_action(logger, run_id, "mixed_subgraph", f"{name} 서브그래프 병렬 실행", {"parallel": analysis})
+            futures[name] = executor.submit(contextvars.copy_context().run, _run_mixed_subgraph, name, state)
+        executor.shutdown(wait=False)
+    
+    for name in analysis:
+        try:
+            if parallel:
+                result = futures[name].result()
+            else:
+                log_action(logger, run_id, "mixed_subgraph", f"{name} 서브그래프 실행")
+                result = _run_mixed_subgraph(name, state)
+            
+            if name == "compliance":
+                compliance_result = result.get("compliance_result")
+            else:
+                rca_result = result.get("rca_result")
+                context = {**context, **result.get("context", {})}
+            # 각 서브그래프가 입력 상태 뒤에 추가한 증거 / 오류 / trace만 병합
+            # (trace는 workflow가 분석 키를 다시 남겨도 덮어쓰지 않도록 mixed_<name> 아래에 둔다)
+            delta = _subgraph_delta(state, result)
+            evidence = evidence + delta["evidence"]
+            errors.extend(delta["errors"])
+            trace[f"mixed_{name}"] = {"status": "success", "trace": delta["trace"]}
+            
+        except Exception as e:
+            log_error(logger, run_id, "MixedSubgraphError", str(e), f"MIXED_{name.upper()}")
+            errors.append(f"Mixed-{MIXED_LABELS[name]} 실패: {str(e)}")
+            trace[f"mixed_{name}"] = {"status": "error", "error": str(e)}
+    
+    # 2. Workflow 서브그래프 실행 (이전 분석 결과를 컨텍스트로 전달)
+    if "workflow" in plan:
+        try:
+            log_action(logger, run_id, "mixed_subgraph", "Workflow 서브그래프 실행", {"after": analysis})
+            # 이전 분석 결과를 Workflow에 전달 (얕은 복사 - 페이로드는 참조 공유)
+            workflow_state = state.model_copy(update={
+                "context": context,
+                "evidence": evidence,
+                "compliance_result": compliance_result or state.compliance_result,
+                "rca_result": rca_result or state.rca_result,
+            })
+            
+            result = _run_mixed_subgraph("workflow", workflow_state)
+            
+            workflow_result = result.get("workflow_result")
+            action_plan = result.get("action_plan", action_plan)
+            approval_required = result.get("approval_required", approval_required)
+            approval_status = result.get("approval_status", approval_status)
+            context = result.get("context", context)
+            delta = _subgraph_delta(workflow_state, result)
+            evidence = evidence + delta["evidence"]
+            errors.extend(delta["errors"])
+            trace["mixed_workflow"] = {"status": "success", "trace": delta["trace"]}
+            
+        except Exception as e:
+            log_error(logger, run_id, "MixedSubgraphError", str(e), "MIXED_WORKFLOW")
+            errors.append(f"Mixed-Workflow 실패: {str(e)}")
+            trace["mixed_workflow"] = {"status": "error", "error": str(e)}
     
     # 실행된 서브그래프 수 계산
     executed_count = sum([
@@ -264,18 +310,23 @@ def mixed_subgraph_node(state: AgentState) -> dict:
     trace["mixed_summary"] = {
         "status": "success" if executed_count > 0 else "partial",
         "executed_subgraphs": executed_count,
-        "total_subgraphs": 3,
+        "total_subgraphs": len(plan),
+        "planned": plan,
+        "skipped": skipped,
+        "parallel": analysis if parallel else [],
     }
     
     duration_ms = (time.perf_counter() - start_time) * 1000
-    log_node_end(logger, run_id, "MIXED_SUBGRAPH", duration_ms, "success", {"executed": executed_count, "total": 3})
+    log_node_end(logger, run_id, "MIXED_SUBGRAPH", duration_ms, "success", {
+        "executed": executed_count, "total": len(plan), "skipped": skipped,
+    })
     
     return {
         "compliance_result": compliance_result,
         "rca_result": rca_result,
         "workflow_result": workflow_result,
         "context": context,
-        "evidence": evidence,
+        "evidence": evidence[len(state.evidence):],
         "action_plan": action_plan,
         "approval_required": approval_required,
         "approval_status": approval_status,
@@ -324,7 +375,6 @@ def check_approval_node(state: AgentState) -> dict:
         "approval_required": approval_required,
         "approval_status": approval_status,
         "trace": {
-            **state.trace,
             "check_approval": {
                 "status": "success",
                 "approval_required": approval_required,
@@ -348,7 +398,7 @@ def route_by_approval(state: AgentState) -> Literal["FINALIZE", "AWAIT_APPROVAL"
 
 
 def await_approval_node(state: AgentState) -> dict:
-    """승인 대기 노드 - 상태를 저장하고 대기 상태로 전환"""
+    """승인 대기 노드 - 대기 상태로 전환 (그래프는 이후 EXECUTE 직전에 중단되고 체크포인트 저장)"""
     run_id = state.run_id
     log_node_start(logger, run_id, "AWAIT_APPROVAL")
     start_time = time.perf_counter()
@@ -371,10 +421,43 @@ def await_approval_node(state: AgentState) -> dict:
     return {
         "approval_status": "pending",
         "trace": {
-            **state.trace,
             "await_approval": {
                 "status": "pending",
                 "approval_reasons": approval_reasons,
+                # run 메모는 중단 시 해제되므로 감사용 집계를 체크포인트에 보존
+                RUN_METRICS_KEY: snapshot_run_metrics(run_id),
+            }
+        }
+    }
+
+
+def execute_node(state: AgentState) -> dict:
+    """승인된 실행 계획 실행 노드 - 승인 후 체크포인트에서 재개될 때 실행"""
+    run_id = state.run_id
+    log_node_start(logger, run_id, "EXECUTE")
+    start_time = time.perf_counter()
+    
+    # 실제 작업 실행은 아직 없음 - 실행 준비 상태만 기록
+    execution_results = [
+        {
+            "step": "approval_granted",
+            "message": "실행 계획이 승인되었습니다.",
+            "status": "ready_for_execution",
+        }
+    ]
+    
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    log_node_end(logger, run_id, "EXECUTE", duration_ms, "success", {
+        "approval_status": state.approval_status,
+        "action_plan_count": len(state.action_plan),
+    })
+    
+    return {
+        "execution_results": execution_results,
+        "trace": {
+            "execute": {
+                "status": "success",
+                "approval_status": state.approval_status,
             }
         }
     }
@@ -471,7 +554,6 @@ def finalize_node(state: AgentState) -> dict:
     return {
         "analysis_results": analysis_results,
         "trace": {
-            **state.trace,
             "finalize": {"status": "success"}
         }
     }
@@ -484,13 +566,14 @@ def build_graph():
     graph = StateGraph(AgentState)
     
     # 노드 추가
-    graph.add_node("CLASSIFY_INTENT", classify_intent_node)
+    graph.add_node("CLASSIFY_INTENT", classify_intent_with_prefetch_node)
     graph.add_node("COMPLIANCE", compliance_subgraph_node)
     graph.add_node("RCA", rca_subgraph_node)
     graph.add_node("WORKFLOW", workflow_subgraph_node)
     graph.add_node("MIXED", mixed_subgraph_node)
     graph.add_node("CHECK_APPROVAL", check_approval_node)
     graph.add_node("AWAIT_APPROVAL", await_approval_node)
+    graph.add_node("EXECUTE", execute_node)
     graph.add_node("FINALIZE", finalize_node)
     
     # 엣지 연결
@@ -525,11 +608,12 @@ def build_graph():
         }
     )
     
-    # 승인 대기 후 종료 (재개 시 별도 처리)
-    graph.add_edge("AWAIT_APPROVAL", END)
+    # 승인 대기 → (EXECUTE 직전 중단, 승인 후 재개) → 실행 → 최종 정리
+    graph.add_edge("AWAIT_APPROVAL", "EXECUTE")
+    graph.add_edge("EXECUTE", "FINALIZE")
     graph.add_edge("FINALIZE", END)
     
-    return graph.compile()
+    return graph.compile(checkpointer=get_checkpointer(), interrupt_before=["EXECUTE"])
 
 
 @lru_cache(maxsize=1)
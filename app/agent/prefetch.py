@@ -0,0 +1,181 @@
+# app/agent/prefetch.py
+"""의도 분류와 병행하는 추측(speculative) 검색 프리페치
+
+user_input은 실행 시작 시점에 이미 정해져 있으므로, 의도 분류 LLM 호출을 기다리지 않고
+쿼리 임베딩과 규정/장애/시스템 저장소 검색을 바로 시작한다. 분류가 끝나면 실행할 서브그래프에
+필요 없는 검색은 취소(시작 전) 또는 폐기(실행 중/완료)하고, 서브그래프 검색 노드는
+take_prefetched()로 미리 받아 둔 결과를 사용한다 (없거나 실패하면 직접 검색).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.agent.retrieval import (
+    INCIDENT_TOP_K,
+    POLICY_TOP_K,
+    RCA_SYSTEM_TOP_K,
+    WORKFLOW_SYSTEM_TOP_K,
+    get_query_embedding,
+)
+from app.core.config import get_settings
+from app.core.run_context import RunMemo, get_run_memo
+from app.schemas.knowledge import SearchResponse, StoreType
+from app.services.knowledge_service import get_knowledge_service
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_KEY = "retrieval_prefetch"
+
+SearchKey = Tuple[StoreType, int]
+
+# 서브그래프별 검색 노드의 (저장소, top_k) - 노드와 같은 상수를 써서 미리 받은 결과가 그대로 쓰이게 함
+CAPABILITY_SEARCHES: Dict[str, List[SearchKey]] = {
+    "compliance": [(StoreType.POLICY, POLICY_TOP_K)],  # RETRIEVE_POLICIES
+    "rca": [(StoreType.INCIDENT, INCIDENT_TOP_K), (StoreType.SYSTEM, RCA_SYSTEM_TOP_K)],  # RETRIEVE_INCIDENTS, RETRIEVE_SYSTEM_INFO
+    "workflow": [(StoreType.SYSTEM, WORKFLOW_SYSTEM_TOP_K)],  # RETRIEVE_SYSTEM_DOCS
+}
+ALL_SEARCHES: List[SearchKey] = list(dict.fromkeys(key for searches in CAPABILITY_SEARCHES.values() for key in searches))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().RETRIEVAL_PREFETCH_WORKERS,
+                thread_name_prefix="retrieval-prefetch",
+            )
+        return _executor
+
+
+class RetrievalPrefetch:
+    """run 하나의 추측 검색 (의도 분류 전 시작, 분류 후 필요한 검색만 유지)"""
+    
+    def __init__(self, run_id: str, query: str, memo: RunMemo):
+        self.run_id = run_id
+        self.query = query
+        self.memo = memo  # run 종료(메모 해제) 후 끝나는 검색도 이 메모에만 기록
+        self.futures: Dict[SearchKey, Future] = {}
+        self.needed: Optional[Set[SearchKey]] = None  # None = 분류 전 (전부 유지)
+        self.closed = False
+        self.cancelled: List[str] = []
+        self.discarded: List[str] = []
+        self.used: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _label(key: SearchKey) -> str:
+        return f"{key[0].value}:{key[1]}"
+    
+    def _wanted(self, key: SearchKey) -> bool:
+        with self._lock:
+            return not self.closed and (self.needed is None or key in self.needed)
+    
+    def _search(self, key: SearchKey) -> Optional[SearchResponse]:
+        """임베딩 → 검색 (단계 사이에 분류 결과를 확인해 불필요하면 중단)"""
+        store_type, top_k = key
+        if not self._wanted(key):
+            return None
+        query_embedding = get_query_embedding(self.run_id, self.query, store_type, memo=self.memo)
+        if not self._wanted(key):
+            return None
+        return asyncio.run(get_knowledge_service().search(
+            query=self.query,
+            store_type=store_type,
+            top_k=top_k,
+            query_embedding=query_embedding,
+        ))
+    
+    def start(self) -> None:
+        executor = _get_executor()
+        for key in ALL_SEARCHES:
+            context = contextvars.copy_context()
+            self.futures[key] = executor.submit(context.run, self._search, key)
+        logger.info(f"[{self.run_id}] Speculative retrieval started: {[self._label(k) for k in self.futures]}")
+    
+    def keep(self, capabilities: List[str]) -> None:
+        """실행할 서브그래프에 필요한 검색만 유지 (나머지는 취소, 이미 실행 중이면 결과 폐기)"""
+        needed = {key for capability in capabilities for key in CAPABILITY_SEARCHES.get(capability, [])}
+        with self._lock:
+            self.needed = needed
+        for key, future in self.futures.items():
+            if key in needed:
+                continue
+            (self.cancelled if future.cancel() else self.discarded).append(self._label(key))
+        logger.info(
+            f"[{self.run_id}] Speculative retrieval for {capabilities}: "
+            f"kept={len(needed)} cancelled={len(self.cancelled)} discarded={len(self.discarded)}"
+        )
+    
+    def close(self) -> None:
+        """run 종료 시 (clear_run_memo) - 시작 전 검색은 취소, 실행 중인 검색은 다음 단계로 넘어가지 않음"""
+        with self._lock:
+            self.closed = True
+        for future in self.futures.values():
+            future.cancel()
+    
+    def take(self, query: str, store_type: StoreType, top_k: int) -> Optional[SearchResponse]:
+        key = (store_type, top_k)
+        future = self.futures.get(key)
+        if future is None or query != self.query or not self._wanted(key) or future.cancelled():
+            return None
+        try:
+            response = future.result()
+        except Exception as e:
+            logger.warning(f"[{self.run_id}] Speculative retrieval {self._label(key)} failed, searching directly: {e}")
+            return None
+        if response is not None:
+            with self._lock:
+                self.used.add(self._label(key))
+        return response
+    
+    def summary(self) -> dict:
+        """분류 노드 trace 기록용"""
+        with self._lock:
+            return {
+                "status": "success",
+                "started": [self._label(k) for k in self.futures],
+                "kept": sorted(self._label(k) for k in self.needed or ()),
+                "cancelled": list(self.cancelled),
+                "discarded": list(self.discarded),
+            }
+
+
+def start_prefetch(run_id: str, query: str) -> Optional[RetrievalPrefetch]:
+    """의도 분류 전에 검색 시작 (RETRIEVAL_PREFETCH_ENABLED=false 이거나 입력이 비면 None)"""
+    if not get_settings().RETRIEVAL_PREFETCH_ENABLED or not query.strip():
+        return None
+    memo = get_run_memo(run_id)
+    prefetch, _ = memo.get_or_compute(PREFETCH_KEY, lambda: RetrievalPrefetch(run_id, query, memo))
+    if not prefetch.futures:
+        prefetch.start()
+    return prefetch
+
+
+def take_prefetched(run_id: str, query: str, store_type: StoreType, top_k: int) -> Optional[SearchResponse]:
+    """검색 노드용 - 같은 질의·저장소·top_k의 프리페치 결과 (없으면 None → 직접 검색)"""
+    prefetch: Optional[RetrievalPrefetch] = get_run_memo(run_id).get(PREFETCH_KEY)
+    if prefetch is None:
+        return None
+    response = prefetch.take(query, store_type, top_k)
+    if response is not None:
+        logger.info(f"[{run_id}] Using prefetched {store_type.value} results")
+    return response
+
+
+def get_prefetch_summary(run_id: str) -> Optional[dict]:
+    """감사 trace_summary 용 - 검색 노드가 실제 사용한 결과 포함 (프리페치하지 않은 run은 None)"""
+    prefetch: Optional[RetrievalPrefetch] = get_run_memo(run_id).get(PREFETCH_KEY)
+    if prefetch is None:
+        return None
+    with prefetch._lock:
+        used = sorted(prefetch.used)
+    return {**prefetch.summary(), "used": used}
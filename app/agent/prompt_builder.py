@@ -0,0 +1,241 @@
+"""토큰 예산 기반 프롬프트 조립
+
+증거(검색 청크)와 첨부 파일을 고정 글자 수로 자르는 대신 로컬 토크나이저로 토큰을 세어
+섹션별 예산(system / evidence / attachments) 안에서 채운다.
+
+- 증거: 관련도 점수 내림차순으로 예산이 찰 때까지 포함하고, 마지막 청크는 남은 예산만큼 자른다.
+- 첨부 파일: 예산을 파일 수로 균등 분배하고, 짧은 파일이 남긴 예산은 나머지 파일에 재분배한다.
+- query 를 주면 증거를 채우기 전에 추출 압축(compression.compress_evidence)으로 질의와
+  무관한 문장을 덜어낸다 (EVIDENCE_COMPRESSION_ENABLED).
+- 섹션별 사용 토큰은 usage() 로 노드 trace 에 기록한다.
+
+토크나이저는 tiktoken(선택 의존성)을 사용하며, 설치되지 않았거나 인코딩을 로드할 수 없으면
+글자 수 기반 추정으로 대체한다.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.agent.compression import compress_evidence
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SECTION_SEPARATOR = "\n\n---\n\n"
+TRUNCATION_MARKER = "\n...(생략)"
+# 이보다 적은 예산이 남으면 청크를 잘라 넣지 않음 (의미 없는 조각 방지)
+MIN_PARTIAL_TOKENS = 32
+# tiktoken 미설치 시 추정 비율 (한글 비중을 고려, rate_limit.estimate_tokens 와 동일)
+ESTIMATE_CHARS_PER_TOKEN = 3
+
+
+class TokenCounter:
+    """로컬 토크나이저 (tiktoken, 없으면 글자 수 추정)"""
+    
+    def __init__(self, encoding: str):
+        self._encoding = None
+        self.name = "estimate"
+        try:
+            import tiktoken
+            
+            self._encoding = tiktoken.get_encoding(encoding)
+            self.name = f"tiktoken:{encoding}"
+        except ImportError:
+            logger.info("[prompt_builder] tiktoken not installed; using character-based token estimate")
+        except Exception as e:
+            logger.warning(f"[prompt_builder] Failed to load tiktoken encoding '{encoding}': {e}")
+    
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        # 추정치는 올림으로 계산해 조각별 합계가 이어 붙인 전체보다 작아지지 않게 함
+        return -(-len(text) // ESTIMATE_CHARS_PER_TOKEN)
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """앞에서부터 max_tokens 토큰까지만 남김"""
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self._encoding.decode(tokens[:max_tokens])
+        if self.count(text) <= max_tokens:
+            return text
+        return text[:max_tokens * ESTIMATE_CHARS_PER_TOKEN]
+
+
+@lru_cache(maxsize=1)
+def get_token_counter() -> TokenCounter:
+    """토큰 카운터 싱글톤"""
+    return TokenCounter(get_settings().PROMPT_TOKENIZER_ENCODING)
+
+
+@dataclass
+class SectionUsage:
+    """섹션 하나의 토큰 사용량"""
+    budget: int
+    tokens: int = 0
+    included: int = 0
+    dropped: int = 0
+    truncated: int = 0
+    original_tokens: int = 0  # 압축·예산 적용 전 전체 증거 토큰 (증거 섹션만)
+
+
+class PromptBuilder:
+    """섹션별 토큰 예산 안에서 프롬프트 조각을 조립"""
+    
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        counter: Optional[TokenCounter] = None,
+        query: Optional[str] = None,
+    ):
+        settings = get_settings()
+        self.query = query if settings.EVIDENCE_COMPRESSION_ENABLED else None
+        self.budgets = budgets or {
+            "system": settings.PROMPT_BUDGET_SYSTEM,
+            "evidence": settings.PROMPT_BUDGET_EVIDENCE,
+            "attachments": settings.PROMPT_BUDGET_ATTACHMENTS,
+        }
+        self.counter = counter or get_token_counter()
+        self.sections: Dict[str, SectionUsage] = {}
+    
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        marker_tokens = self.counter.count(TRUNCATION_MARKER)
+        return self.counter.truncate(text, max_tokens - marker_tokens) + TRUNCATION_MARKER
+    
+    @staticmethod
+    def _evidence_block(e: Dict[str, Any], label: str) -> str:
+        return f"[{label}: {e.get('doc_id', 'unknown')}]\n{e.get('content', '')}"
+    
+    def evidence(
+        self,
+        section: str,
+        items: Sequence[Dict[str, Any]],
+        label: str,
+        empty_text: str,
+        budget: Optional[int] = None,
+    ) -> str:
+        """검색 증거를 관련도 순으로 예산만큼 채움
+        
+        Args:
+            section: trace 에 기록할 섹션 이름
+            items: 증거 목록 (doc_id, content, score)
+            label: 청크 머리말 라벨 (예: "규정")
+            empty_text: 증거가 없을 때 텍스트
+            budget: 섹션 예산 (None이면 evidence 예산)
+        """
+        budget = self.budgets["evidence"] if budget is None else budget
+        usage = self.sections[section] = SectionUsage(budget=budget)
+        if not items:
+            usage.tokens = self.counter.count(empty_text)
+            return empty_text
+        
+        usage.original_tokens = self.counter.count(
+            SECTION_SEPARATOR.join(self._evidence_block(e, label) for e in items)
+        )
+        if self.query:
+            items, _ = compress_evidence(self.query, items)
+        
+        separator_tokens = self.counter.count(SECTION_SEPARATOR)
+        ranked = sorted(items, key=lambda e: e.get("score") or 0.0, reverse=True)
+        parts: List[str] = []
+        remaining = budget
+        for e in ranked:
+            cost = separator_tokens if parts else 0
+            block = self._evidence_block(e, label)
+            tokens = self.counter.count(block)
+            if tokens + cost <= remaining:
+                parts.append(block)
+                remaining -= tokens + cost
+                usage.included += 1
+            elif remaining - cost >= MIN_PARTIAL_TOKENS:
+                block = self._truncate(block, remaining - cost)
+                parts.append(block)
+                remaining -= self.counter.count(block) + cost
+                usage.included += 1
+                usage.truncated += 1
+            else:
+                usage.dropped += 1
+        
+        text = SECTION_SEPARATOR.join(parts) if parts else empty_text
+        usage.tokens = self.counter.count(text)
+        return text
+    
+    def attachments(
+        self,
+        section: str,
+        files: Sequence[Dict[str, Any]],
+        label: str,
+        name_key: str = "name",
+        budget: Optional[int] = None,
+    ) -> str:
+        """첨부 파일을 예산 안에서 균등 분배해 자름 (짧은 파일이 남긴 예산은 재분배)"""
+        budget = self.budgets["attachments"] if budget is None else budget
+        usage = self.sections[section] = SectionUsage(budget=budget)
+        if not files:
+            return ""
+        
+        blocks = [f"[{label}: {f.get(name_key, 'unknown')}]\n{f.get('content', '')}" for f in files]
+        counts = [self.counter.count(block) for block in blocks]
+        
+        # 짧은 파일부터 처리해 남는 예산을 뒤 파일에 넘김
+        allotted: Dict[int, str] = {}
+        remaining = budget
+        order = sorted(range(len(blocks)), key=lambda i: counts[i])
+        for position, i in enumerate(order):
+            share = remaining // (len(order) - position)
+            if counts[i] <= share:
+                allotted[i] = blocks[i]
+                remaining -= counts[i]
+            elif share >= MIN_PARTIAL_TOKENS:
+                allotted[i] = self._truncate(blocks[i], share)
+                remaining -= self.counter.count(allotted[i])
+                usage.truncated += 1
+            else:
+                usage.dropped += 1
+        
+        parts = [allotted[i] for i in range(len(blocks)) if i in allotted]
+        usage.included = len(parts)
+        text = "\n\n".join(parts)
+        usage.tokens = self.counter.count(text)
+        return text
+    
+    def system(self, template: str, **fields: str) -> str:
+        """시스템 프롬프트 조립 (템플릿 자체가 system 예산을 넘으면 경고만 남김)"""
+        usage = self.sections["system"] = SectionUsage(budget=self.budgets["system"])
+        usage.tokens = self.counter.count(template.format(**{key: "" for key in fields}))
+        if usage.tokens > usage.budget:
+            logger.warning(
+                f"[prompt_builder] System prompt template uses {usage.tokens} tokens "
+                f"(budget {usage.budget})"
+            )
+        return template.format(**fields)
+    
+    def count(self, section: str, text: str) -> str:
+        """예산 없는 섹션(사용자 입력 등)의 토큰 수만 기록"""
+        self.sections[section] = SectionUsage(budget=0, tokens=self.counter.count(text))
+        return text
+    
+    def usage(self) -> Dict[str, Any]:
+        """trace 기록용 섹션별 토큰 사용량"""
+        sections = {name: asdict(usage) for name, usage in self.sections.items()}
+        return {
+            "tokenizer": self.counter.name,
+            "sections": sections,
+            "total": sum(usage.tokens for usage in self.sections.values()),
+        }
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 max_tokens 토큰 이내로 자름 (예산 이하이면 그대로)"""
+    counter = get_token_counter()
+    if counter.count(text) <= max_tokens:
+        return text
+    return counter.truncate(text, max_tokens)
@@ -0,0 +1,103 @@
+# app/agent/retrieval.py
+"""서브그래프 공용 검색 헬퍼 - run 단위 쿼리 임베딩 공유 / 증거 기반 분기
+
+mixed 의도에서는 compliance/rca/workflow 서브그래프가 같은 user_input으로
+여러 저장소를 검색한다. 쿼리 임베딩을 run당 (임베딩 제공자별) 한 번만 계산해
+run 메모에 두고 모든 검색 노드가 재사용한다 (호출/재사용 횟수는 감사 trace_summary에 기록).
+
+검색 결과가 없거나 모든 청크가 EVIDENCE_MIN_SCORE(설정 시) 미만이면 서브그래프는 분석 LLM 호출을
+건너뛰고 고정 폴백 결과를 반환한다 (has_relevant_evidence / evidence_skip_trace).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import get_settings
+from app.core.run_context import RunMemo, get_run_memo
+from app.integrations.embeddings.registry import get_embedding_provider
+from app.schemas.knowledge import StoreType
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CALLS = "embedding_calls"
+EMBEDDING_REUSES = "embedding_reuses"
+
+# 서브그래프 검색 노드의 결과 수 (추측 검색 프리페치도 같은 값으로 미리 검색)
+POLICY_TOP_K = 5  # compliance RETRIEVE_POLICIES
+INCIDENT_TOP_K = 5  # rca RETRIEVE_INCIDENTS
+RCA_SYSTEM_TOP_K = 3  # rca RETRIEVE_SYSTEM_INFO
+WORKFLOW_SYSTEM_TOP_K = 5  # workflow RETRIEVE_SYSTEM_DOCS
+
+
+def get_query_embedding(
+    run_id: str, query: str, store_type: StoreType, memo: Optional[RunMemo] = None,
+) -> Optional[List[float]]:
+    """run 범위로 메모된 쿼리 임베딩 (원본 차원)
+    
+    저장소의 임베딩 제공자별로 메모하므로, 같은 제공자를 쓰는 저장소끼리 재사용된다.
+    실패 시 None을 반환하며, 호출 측 검색은 자체 임베딩 경로로 폴백한다.
+    
+    Args:
+        memo: run 메모 (run 종료 후에도 끝날 수 있는 백그라운드 작업은 시작 시점의 메모를 넘겨
+            해제된 메모가 다시 만들어지지 않게 한다)
+    """
+    memo = memo or get_run_memo(run_id)
+    provider = get_embedding_provider(store_type.value)
+    key = f"query_embedding:{provider.model_id}:" + hashlib.sha256(query.encode("utf-8")).hexdigest()
+    
+    def compute() -> List[float]:
+        memo.incr(EMBEDDING_CALLS)
+        return provider.embed_query(query)
+    
+    try:
+        embedding, reused = memo.get_or_compute(key, compute)
+    except Exception as e:
+        logger.error(f"[{run_id}] Failed to create query embedding: {e}")
+        return None
+    
+    if reused:
+        memo.incr(EMBEDDING_REUSES)
+        logger.info(f"[{run_id}] Reusing query embedding")
+    return embedding
+
+
+def get_embedding_counts(run_id: str, carried: Optional[dict] = None) -> dict:
+    """run의 쿼리 임베딩 호출/재사용 횟수 (carried: 승인 대기 중단 전 집계, 재개 후 값과 합산)"""
+    counters = get_run_memo(run_id).counters
+    carried = carried or {}
+    return {
+        "calls": counters.get(EMBEDDING_CALLS, 0) + carried.get("calls", 0),
+        "reused": counters.get(EMBEDDING_REUSES, 0) + carried.get("reused", 0),
+    }
+
+
+def relevant_evidence(evidence: List[Dict[str, Any]], types: Iterable[str]) -> List[Dict[str, Any]]:
+    """지정 유형의 증거 중 점수가 EVIDENCE_MIN_SCORE 이상인 청크"""
+    types = set(types)
+    min_score = get_settings().EVIDENCE_MIN_SCORE
+    return [
+        e for e in evidence
+        if e.get("type") in types and (min_score is None or (e.get("score") or 0.0) >= min_score)
+    ]
+
+
+def has_relevant_evidence(evidence: List[Dict[str, Any]], types: Iterable[str]) -> bool:
+    """분석 LLM을 호출할 만한 증거가 있는지 (EVIDENCE_GATE_ENABLED=false면 항상 True)"""
+    if not get_settings().EVIDENCE_GATE_ENABLED:
+        return True
+    return bool(relevant_evidence(evidence, types))
+
+
+def evidence_skip_trace(evidence: List[Dict[str, Any]], types: Iterable[str]) -> Dict[str, Any]:
+    """증거 부족으로 건너뛴 분석 노드의 trace 항목"""
+    types = set(types)
+    retrieved = [e for e in evidence if e.get("type") in types]
+    return {
+        "status": "skipped",
+        "reason": "low_score_evidence" if retrieved else "no_evidence",
+        "retrieved": len(retrieved),
+        "max_score": round(max((e.get("score") or 0.0) for e in retrieved), 4) if retrieved else None,
+        "min_score": get_settings().EVIDENCE_MIN_SCORE,
+    }
@@ -1,8 +1,22 @@
 # app/agent/state.py
-"""LangGraph 상태 정의"""
+"""LangGraph 상태 정의
+
+노드 입력마다 상태 모델이 다시 만들어지므로, 자유 형식 페이로드(첨부 파일, 증거, 컨텍스트, trace 등)는
+SkipValidation으로 검증·복사 없이 참조로 넘긴다. 노드는 이 객체들을 제자리에서 수정하지 않고
+바뀐 부분만 반환한다 (copy-on-write). trace / evidence / errors는 리듀서가 병합하므로
+노드는 새 항목(델타)만 반환해야 한다.
+"""
 from __future__ import annotations
-from typing import Any, Dict, List, Literal, Optional
-from pydantic import BaseModel, Field
+import operator
+from typing import Annotated, Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, SkipValidation
+
+
+def merge_trace(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """trace 리듀서 - 노드가 반환한 항목을 기존 trace에 병합 (같은 키는 덮어씀)"""
+    if not update:
+        return current
+    return {**current, **update}
 
 
 class ComplianceResult(BaseModel):
@@ -33,11 +47,12 @@ class AgentState(BaseModel):
     # 기본 정보
     run_id: str
     user_input: Optional[str] = None
-    files: List[Dict[str, Any]] = Field(default_factory=list)
-    context: Dict[str, Any] = Field(default_factory=dict)
+    files: SkipValidation[List[Dict[str, Any]]] = Field(default_factory=list)
+    context: SkipValidation[Dict[str, Any]] = Field(default_factory=dict)
     
     # Intent 분류
     intent: Literal["compliance", "rca", "workflow", "mixed", "unknown"] = "unknown"
+    capabilities: List[Literal["compliance", "rca", "workflow"]] = Field(default_factory=list)  # 실행할 서브그래프
     
     # 서브그래프 결과
     compliance_result: Optional[ComplianceResult] = None
@@ -45,17 +60,17 @@ class AgentState(BaseModel):
     workflow_result: Optional[WorkflowResult] = None
     
     # 공통 필드
-    evidence: List[Dict[str, Any]] = Field(default_factory=list)
-    analysis_results: Dict[str, Any] = Field(default_factory=dict)
-    action_plan: List[Dict[str, Any]] = Field(default_factory=list)
+    evidence: Annotated[SkipValidation[List[Dict[str, Any]]], operator.add] = Field(default_factory=list)  # 델타 추가
+    analysis_results: SkipValidation[Dict[str, Any]] = Field(default_factory=dict)
+    action_plan: SkipValidation[List[Dict[str, Any]]] = Field(default_factory=list)
     
     # 승인 관련
     approval_required: bool = False
     approval_status: Literal["pending", "approved", "rejected", "not_required"] = "not_required"
     
     # 실행 및 로그
-    execution_results: List[Dict[str, Any]] = Field(default_factory=list)
-    errors: List[str] = Field(default_factory=list)
+    execution_results: SkipValidation[List[Dict[str, Any]]] = Field(default_factory=list)
+    errors: Annotated[List[str], operator.add] = Field(default_factory=list)  # 델타 추가
     
     # 추적용
-    trace: Dict[str, Any] = Field(default_factory=dict)
+    trace: Annotated[SkipValidation[Dict[str, Any]], merge_trace] = Field(default_factory=dict)  # 노드별 항목 병합
@@ -0,0 +1,59 @@
+"""서브그래프 노드의 JSON 응답 생성 (스트리밍 + 증분 파싱 + 잘린 출력 복구)
+
+LLM_STREAMING_ENABLED 이면 응답을 스트리밍으로 받으며, 가설·위반 사항·실행 단계처럼
+배열 항목이 완성되는 즉시 run 이벤트로 발행해 스트리밍 엔드포인트가 바로 전달할 수 있게 한다.
+응답이 잘린 경우(max_tokens 등) 모델을 다시 호출하지 않고 로컬에서 JSON을 복구한다.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Tuple
+
+from app.core.config import get_settings
+from app.core.run_context import publish_run_event
+from app.integrations.llm.json_stream import IncrementalJSONParser, parse_json_response
+
+logger = logging.getLogger(__name__)
+
+
+def generate_json(
+    client: Any,
+    run_id: str,
+    system_prompt: str,
+    user_message: str,
+    item_events: Dict[str, str],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """LLM 호출 후 JSON 결과 반환
+    
+    Args:
+        client: OpenRouter 클라이언트
+        run_id: 이벤트를 발행할 run
+        system_prompt: 시스템 프롬프트
+        user_message: 사용자 메시지
+        item_events: 완성 즉시 발행할 배열 키 → 이벤트 이름 (예: {"hypotheses": "hypothesis"})
+    
+    Returns:
+        (파싱 결과, trace 기록용 메타: streamed / streamed_items / repaired)
+    
+    Raises:
+        json.JSONDecodeError: 복구해도 파싱할 수 없는 경우
+    """
+    streamed_items = 0
+    if get_settings().LLM_STREAMING_ENABLED:
+        parser = IncrementalJSONParser(item_events)
+        for delta in client.chat_with_system_stream(system_prompt=system_prompt, user_message=user_message):
+            for key, item in parser.feed(delta):
+                publish_run_event(run_id, item_events[key], item)
+                streamed_items += 1
+        response = parser.text
+    else:
+        response = client.chat_with_system(system_prompt=system_prompt, user_message=user_message)
+    
+    result, repaired = parse_json_response(response)
+    if repaired:
+        logger.warning(f"[{run_id}] Repaired truncated LLM JSON response ({len(response)} chars)")
+    return result, {
+        "streamed": get_settings().LLM_STREAMING_ENABLED,
+        "streamed_items": streamed_items,
+        "repaired": repaired,
+    }
@@ -7,11 +7,22 @@ import json
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from langgraph.graph import StateGraph, START, END
 
+from app.agent.prefetch import take_prefetched
+from app.agent.prompt_builder import PromptBuilder
+from app.agent.retrieval import (
+    POLICY_TOP_K,
+    evidence_skip_trace,
+    get_query_embedding,
+    has_relevant_evidence,
+)
 from app.agent.state import AgentState, ComplianceResult
+from app.agent.structured_output import generate_json
+from app.core.config import get_settings
+from app.integrations.llm.json_stream import parse_json_response
 from app.integrations.llm.openrouter_client import get_openrouter_client
 from app.services.knowledge_service import get_knowledge_service
 from app.schemas.knowledge import StoreType
@@ -51,8 +62,7 @@ COMPLIANCE_SYSTEM_PROMPT = """당신은 기업 내부 규정 및 정책 준수 
       "violation_detail": "위반 내용 설명",
       "severity": "high" | "medium" | "low"
     }}
-  ],
-  "recommendations": ["수정 권고사항"],
+  ],{recommendations_format}
   "summary": "분석 요약 (1-2문장)"
 }}
 
@@ -65,6 +75,12 @@ COMPLIANCE_SYSTEM_PROMPT = """당신은 기업 내부 규정 및 정책 준수 
 }}
 """
 
+# 단일 호출 모드에서는 분석 응답에 권고사항까지 포함 (2단계 모드는 GENERATE_RECOMMENDATION 에서 생성)
+RECOMMENDATIONS_FORMAT = """
+  "recommendations": ["위반 사항별 구체적인 수정 권고사항"],"""
+
+RECOMMENDATION_SYSTEM_PROMPT = "당신은 규정 준수 전문가입니다. 위반 사항에 대한 구체적인 수정 권고사항을 제시하세요."
+
 
 # ===== 노드 함수들 =====
 
@@ -85,13 +101,17 @@ def retrieve_policies_node(state: AgentState) -> dict:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        search_response = loop.run_until_complete(
-            service.search(
-                query=user_input,
-                store_type=StoreType.POLICY,
-                top_k=5,
+        # 의도 분류와 병행해 미리 시작한 검색 결과가 있으면 사용
+        search_response = take_prefetched(run_id, user_input, StoreType.POLICY, top_k=POLICY_TOP_K)
+        if search_response is None:
+            search_response = loop.run_until_complete(
+                service.search(
+                    query=user_input,
+                    store_type=StoreType.POLICY,
+                    top_k=POLICY_TOP_K,
+                    query_embedding=get_query_embedding(run_id, user_input, StoreType.POLICY),
+                )
             )
-        )
         
         evidence = []
         for result in search_response.results:
@@ -106,9 +126,8 @@ def retrieve_policies_node(state: AgentState) -> dict:
         logger.info(f"[{run_id}] Found {len(evidence)} policy chunks")
         
         return {
-            "evidence": state.evidence + evidence,
+            "evidence": evidence,
             "trace": {
-                **state.trace,
                 "retrieve_policies": {
                     "status": "success",
                     "count": len(evidence),
@@ -119,9 +138,8 @@ def retrieve_policies_node(state: AgentState) -> dict:
     except Exception as e:
         logger.error(f"[{run_id}] Policy retrieval failed: {e}")
         return {
-            "errors": state.errors + [f"규정 검색 실패: {str(e)}"],
+            "errors": [f"규정 검색 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "retrieve_policies": {"status": "error", "error": str(e)}
             }
         }
@@ -137,43 +155,31 @@ def analyze_compliance_node(state: AgentState) -> dict:
     # 규정 증거 수집
     policy_evidence = [e for e in state.evidence if e.get("type") == "policy"]
     
-    if not policy_evidence:
-        policies_text = "관련 규정이 없습니다."
-    else:
-        policies_text = "\n\n---\n\n".join([
-            f"[규정: {e.get('doc_id', 'unknown')}]\n{e.get('content', '')}"
-            for e in policy_evidence
-        ])
-    
-    # 프롬프트 구성
-    system_prompt = COMPLIANCE_SYSTEM_PROMPT.format(policies=policies_text)
+    # 프롬프트 구성 (섹션별 토큰 예산, 규정은 관련도 순으로 채움)
+    builder = PromptBuilder(query=user_input)
+    policies_text = builder.evidence("policies", policy_evidence, "규정", "관련 규정이 없습니다.")
+    single_pass = get_settings().COMPLIANCE_MODE == "single_pass"
+    system_prompt = builder.system(
+        COMPLIANCE_SYSTEM_PROMPT,
+        policies=policies_text,
+        recommendations_format=RECOMMENDATIONS_FORMAT if single_pass else "",
+    )
     
     # 첨부 파일이 있으면 사용자 메시지에 추가
-    user_message = user_input
+    user_message = builder.count("user", user_input)
     if state.files:
-        file_contents = "\n\n".join([
-            f"[첨부파일: {f.get('name', 'unknown')}]\n{f.get('content', '')[:2000]}"
-            for f in state.files
-        ])
+        file_contents = builder.attachments("attachments", state.files, "첨부파일")
         user_message = f"{user_input}\n\n### 첨부 파일\n{file_contents}"
+    prompt_tokens = builder.usage()
     
     client = get_openrouter_client()
     
     try:
-        response = client.chat_with_system(
-            system_prompt=system_prompt,
-            user_message=user_message,
+        # 스트리밍 응답에서 항목이 완성되는 즉시 run 이벤트로 발행, 잘린 JSON은 로컬 복구
+        result, llm_meta = generate_json(
+            client, run_id, system_prompt, user_message, item_events={"violations": "violation"},
         )
         
-        # JSON 파싱
-        # 마크다운 코드 블록 제거
-        response = response.strip()
-        if response.startswith("```"):
-            lines = response.split("\n")
-            response = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-        
-        result = json.loads(response)
-        
         compliance_result = ComplianceResult(
             status=result.get("status", "no_violation"),
             violations=result.get("violations", []),
@@ -182,16 +188,27 @@ def analyze_compliance_node(state: AgentState) -> dict:
             summary=result.get("summary", ""),
         )
         
-        logger.info(f"[{run_id}] Compliance analysis: {compliance_result.status}")
+        # 단일 호출 응답이 불완전하면(권고사항 누락, 잘린 응답 복구) 후속 권고사항 생성
+        needs_recommendation = compliance_result.status != "no_violation" and (
+            not single_pass or not compliance_result.recommendations or llm_meta["repaired"]
+        )
+        
+        logger.info(
+            f"[{run_id}] Compliance analysis: {compliance_result.status} "
+            f"(mode={get_settings().COMPLIANCE_MODE}, follow_up={needs_recommendation})"
+        )
         
         return {
             "compliance_result": compliance_result,
             "trace": {
-                **state.trace,
                 "analyze_compliance": {
                     "status": "success",
                     "result_status": compliance_result.status,
                     "violation_count": len(compliance_result.violations),
+                    "mode": get_settings().COMPLIANCE_MODE,
+                    "needs_recommendation": needs_recommendation,
+                    "llm": llm_meta,
+                    "prompt_tokens": prompt_tokens,
                 }
             }
         }
@@ -209,10 +226,9 @@ def analyze_compliance_node(state: AgentState) -> dict:
         
         return {
             "compliance_result": compliance_result,
-            "errors": state.errors + [f"규정 분석 파싱 실패: {str(e)}"],
+            "errors": [f"규정 분석 파싱 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "analyze_compliance": {"status": "parse_error", "error": str(e)}
+                "analyze_compliance": {"status": "parse_error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
         
@@ -228,10 +244,9 @@ def analyze_compliance_node(state: AgentState) -> dict:
         
         return {
             "compliance_result": compliance_result,
-            "errors": state.errors + [f"규정 분석 실패: {str(e)}"],
+            "errors": [f"규정 분석 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "analyze_compliance": {"status": "error", "error": str(e)}
+                "analyze_compliance": {"status": "error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
 
@@ -250,17 +265,18 @@ def generate_recommendation_node(state: AgentState) -> dict:
         logger.info(f"[{run_id}] No violation, skipping recommendation generation")
         return {
             "trace": {
-                **state.trace,
                 "generate_recommendation": {"status": "skipped", "reason": "no_violation"}
             }
         }
     
-    # 이미 권고사항이 있으면 스킵
-    if compliance_result.recommendations:
+    # 분석 응답에 권고사항이 온전히 포함되어 있으면 스킵
+    if (
+        compliance_result.recommendations
+        and not state.trace.get("analyze_compliance", {}).get("needs_recommendation")
+    ):
         logger.info(f"[{run_id}] Recommendations already exist")
         return {
             "trace": {
-                **state.trace,
                 "generate_recommendation": {"status": "already_exists"}
             }
         }
@@ -274,11 +290,15 @@ def generate_recommendation_node(state: AgentState) -> dict:
     
     try:
         response = client.chat_with_system(
-            system_prompt="당신은 규정 준수 전문가입니다. 위반 사항에 대한 구체적인 수정 권고사항을 제시하세요.",
+            system_prompt=RECOMMENDATION_SYSTEM_PROMPT,
             user_message=f"다음 위반 사항에 대한 수정 권고사항을 JSON 배열로 제시하세요:\n\n{violations_text}\n\n형식: [\"권고사항1\", \"권고사항2\", ...]",
         )
         
-        recommendations = json.loads(response)
+        recommendations, _ = parse_json_response(response)
+        if isinstance(recommendations, dict):
+            recommendations = recommendations.get("recommendations")
+        if not isinstance(recommendations, list):
+            raise ValueError(f"Expected a JSON array of recommendations, got {type(recommendations).__name__}")
         
         # ComplianceResult 업데이트
         updated_result = ComplianceResult(
@@ -292,7 +312,6 @@ def generate_recommendation_node(state: AgentState) -> dict:
         return {
             "compliance_result": updated_result,
             "trace": {
-                **state.trace,
                 "generate_recommendation": {
                     "status": "success",
                     "count": len(recommendations),
@@ -304,12 +323,50 @@ def generate_recommendation_node(state: AgentState) -> dict:
         logger.error(f"[{run_id}] Recommendation generation failed: {e}")
         return {
             "trace": {
-                **state.trace,
                 "generate_recommendation": {"status": "error", "error": str(e)}
             }
         }
 
 
+def no_policy_fallback_node(state: AgentState) -> dict:
+    """관련 규정이 없을 때 LLM 호출 없이 고정 결과를 반환하는 노드"""
+    run_id = state.run_id
+    skip = evidence_skip_trace(state.evidence, ["policy"])
+    
+    logger.info(f"[{run_id}] Skipping compliance analysis: {skip['reason']} (retrieved={skip['retrieved']})")
+    
+    compliance_result = ComplianceResult(
+        status="no_violation",
+        violations=[],
+        recommendations=["관련 규정을 찾지 못했습니다. 담당자에게 문의하세요."],
+        evidence=[],
+        summary="관련 규정이 없어 위반 여부를 판단할 수 없습니다.",
+    )
+    
+    return {
+        "compliance_result": compliance_result,
+        "trace": {
+            "analyze_compliance": skip,
+        }
+    }
+
+
+# ===== 라우터 함수 =====
+
+def route_after_retrieval(state: AgentState) -> Literal["ANALYZE_COMPLIANCE", "NO_POLICY_FALLBACK"]:
+    """관련 규정이 있을 때만 LLM 분석"""
+    if has_relevant_evidence(state.evidence, ["policy"]):
+        return "ANALYZE_COMPLIANCE"
+    return "NO_POLICY_FALLBACK"
+
+
+def route_after_analysis(state: AgentState) -> Literal["GENERATE_RECOMMENDATION", "END"]:
+    """권고사항 후속 호출 여부 (2단계 모드이거나 단일 호출 응답이 불완전할 때만)"""
+    if state.trace.get("analyze_compliance", {}).get("needs_recommendation"):
+        return "GENERATE_RECOMMENDATION"
+    return "END"
+
+
 # ===== 서브그래프 빌드 =====
 
 def build_compliance_graph():
@@ -320,14 +377,30 @@ def build_compliance_graph():
     graph.add_node("RETRIEVE_POLICIES", retrieve_policies_node)
     graph.add_node("ANALYZE_COMPLIANCE", analyze_compliance_node)
     graph.add_node("GENERATE_RECOMMENDATION", generate_recommendation_node)
+    graph.add_node("NO_POLICY_FALLBACK", no_policy_fallback_node)
     
     # 엣지 연결
     graph.add_edge(START, "RETRIEVE_POLICIES")
-    graph.add_edge("RETRIEVE_POLICIES", "ANALYZE_COMPLIANCE")
-    graph.add_edge("ANALYZE_COMPLIANCE", "GENERATE_RECOMMENDATION")
+    graph.add_conditional_edges(
+        "RETRIEVE_POLICIES",
+        route_after_retrieval,
+        {
+            "ANALYZE_COMPLIANCE": "ANALYZE_COMPLIANCE",
+            "NO_POLICY_FALLBACK": "NO_POLICY_FALLBACK",
+        }
+    )
+    graph.add_conditional_edges(
+        "ANALYZE_COMPLIANCE",
+        route_after_analysis,
+        {
+            "GENERATE_RECOMMENDATION": "GENERATE_RECOMMENDATION",
+            "END": END,
+        }
+    )
     graph.add_edge("GENERATE_RECOMMENDATION", END)
+    graph.add_edge("NO_POLICY_FALLBACK", END)
     
-    return graph.compile()
+    return graph.compile(checkpointer=False)  # 부모 그래프 노드 단위로만 체크포인트
 
 
 @lru_cache(maxsize=1)
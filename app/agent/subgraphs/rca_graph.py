@@ -7,11 +7,22 @@ import json
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from langgraph.graph import StateGraph, START, END
 
+from app.agent.prefetch import take_prefetched
+from app.agent.prompt_builder import PromptBuilder, truncate_tokens
+from app.agent.retrieval import (
+    INCIDENT_TOP_K,
+    RCA_SYSTEM_TOP_K,
+    evidence_skip_trace,
+    get_query_embedding,
+    has_relevant_evidence,
+)
 from app.agent.state import AgentState, RCAResult
+from app.agent.structured_output import generate_json
+from app.core.config import get_settings
 from app.integrations.llm.openrouter_client import get_openrouter_client
 from app.services.knowledge_service import get_knowledge_service
 from app.schemas.knowledge import StoreType
@@ -68,6 +79,9 @@ RCA_SYSTEM_PROMPT = """당신은 IT 시스템 장애 분석 전문가입니다.
 """
 
 
+RCA_EVIDENCE_TYPES = ["incident", "system"]
+
+
 # ===== 노드 함수들 =====
 
 def parse_logs_node(state: AgentState) -> dict:
@@ -88,12 +102,14 @@ def parse_logs_node(state: AgentState) -> dict:
     }
     
     # 첨부 파일에서 로그 추출
+    settings = get_settings()
     file_logs = []
     for f in state.files:
         if f.get("name", "").endswith((".log", ".txt")):
             file_logs.append({
                 "filename": f.get("name", "unknown"),
-                "content": f.get("content", "")[:5000],  # 최대 5000자
+                # 가설 생성 시 첨부 예산 이상은 쓰이지 않으므로 미리 자름
+                "content": truncate_tokens(f.get("content", ""), settings.PROMPT_BUDGET_ATTACHMENTS),
             })
     
     context = dict(state.context)
@@ -105,7 +121,6 @@ def parse_logs_node(state: AgentState) -> dict:
     return {
         "context": context,
         "trace": {
-            **state.trace,
             "parse_logs": {
                 "status": "success",
                 "has_error_keywords": log_info["has_error_keywords"],
@@ -132,13 +147,17 @@ def retrieve_incidents_node(state: AgentState) -> dict:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        search_response = loop.run_until_complete(
-            service.search(
-                query=user_input,
-                store_type=StoreType.INCIDENT,
-                top_k=5,
+        # 의도 분류와 병행해 미리 시작한 검색 결과가 있으면 사용
+        search_response = take_prefetched(run_id, user_input, StoreType.INCIDENT, top_k=INCIDENT_TOP_K)
+        if search_response is None:
+            search_response = loop.run_until_complete(
+                service.search(
+                    query=user_input,
+                    store_type=StoreType.INCIDENT,
+                    top_k=INCIDENT_TOP_K,
+                    query_embedding=get_query_embedding(run_id, user_input, StoreType.INCIDENT),
+                )
             )
-        )
         
         evidence = []
         for result in search_response.results:
@@ -153,9 +172,8 @@ def retrieve_incidents_node(state: AgentState) -> dict:
         logger.info(f"[{run_id}] Found {len(evidence)} incident cases")
         
         return {
-            "evidence": state.evidence + evidence,
+            "evidence": evidence,
             "trace": {
-                **state.trace,
                 "retrieve_incidents": {
                     "status": "success",
                     "count": len(evidence),
@@ -166,9 +184,8 @@ def retrieve_incidents_node(state: AgentState) -> dict:
     except Exception as e:
         logger.error(f"[{run_id}] Incident retrieval failed: {e}")
         return {
-            "errors": state.errors + [f"장애 사례 검색 실패: {str(e)}"],
+            "errors": [f"장애 사례 검색 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "retrieve_incidents": {"status": "error", "error": str(e)}
             }
         }
@@ -191,13 +208,17 @@ def retrieve_system_info_node(state: AgentState) -> dict:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        search_response = loop.run_until_complete(
-            service.search(
-                query=user_input,
-                store_type=StoreType.SYSTEM,
-                top_k=3,
+        # 의도 분류와 병행해 미리 시작한 검색 결과가 있으면 사용
+        search_response = take_prefetched(run_id, user_input, StoreType.SYSTEM, top_k=RCA_SYSTEM_TOP_K)
+        if search_response is None:
+            search_response = loop.run_until_complete(
+                service.search(
+                    query=user_input,
+                    store_type=StoreType.SYSTEM,
+                    top_k=RCA_SYSTEM_TOP_K,
+                    query_embedding=get_query_embedding(run_id, user_input, StoreType.SYSTEM),
+                )
             )
-        )
         
         evidence = []
         for result in search_response.results:
@@ -212,9 +233,8 @@ def retrieve_system_info_node(state: AgentState) -> dict:
         logger.info(f"[{run_id}] Found {len(evidence)} system info chunks")
         
         return {
-            "evidence": state.evidence + evidence,
+            "evidence": evidence,
             "trace": {
-                **state.trace,
                 "retrieve_system_info": {
                     "status": "success",
                     "count": len(evidence),
@@ -225,9 +245,8 @@ def retrieve_system_info_node(state: AgentState) -> dict:
     except Exception as e:
         logger.error(f"[{run_id}] System info retrieval failed: {e}")
         return {
-            "errors": state.errors + [f"시스템 정보 검색 실패: {str(e)}"],
+            "errors": [f"시스템 정보 검색 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "retrieve_system_info": {"status": "error", "error": str(e)}
             }
         }
@@ -244,56 +263,43 @@ def generate_hypotheses_node(state: AgentState) -> dict:
     incident_evidence = [e for e in state.evidence if e.get("type") == "incident"]
     system_evidence = [e for e in state.evidence if e.get("type") == "system"]
     
-    # 프롬프트 구성
-    if not incident_evidence:
-        incidents_text = "유사 장애 사례가 없습니다."
-    else:
-        incidents_text = "\n\n---\n\n".join([
-            f"[사례: {e.get('doc_id', 'unknown')}]\n{e.get('content', '')}"
-            for e in incident_evidence
-        ])
-    
-    if not system_evidence:
-        system_text = "시스템 정보가 없습니다."
-    else:
-        system_text = "\n\n---\n\n".join([
-            f"[시스템: {e.get('doc_id', 'unknown')}]\n{e.get('content', '')}"
-            for e in system_evidence
-        ])
-    
-    system_prompt = RCA_SYSTEM_PROMPT.format(
+    # 프롬프트 구성 (증거 예산의 2/3를 유사 사례에, 남은 예산을 시스템 정보에 배분)
+    builder = PromptBuilder(query=user_input)
+    evidence_budget = builder.budgets["evidence"]
+    incidents_text = builder.evidence(
+        "incidents", incident_evidence, "사례", "유사 장애 사례가 없습니다.",
+        budget=evidence_budget * 2 // 3,
+    )
+    system_text = builder.evidence(
+        "system_info", system_evidence, "시스템", "시스템 정보가 없습니다.",
+        budget=evidence_budget - builder.sections["incidents"].tokens,
+    )
+    system_prompt = builder.system(
+        RCA_SYSTEM_PROMPT,
         incidents=incidents_text,
         system_info=system_text,
     )
     
     # 사용자 메시지 구성
-    user_message = f"다음 장애/로그를 분석하고 원인 가설을 제시해주세요:\n\n{user_input}"
+    user_message = builder.count(
+        "user", f"다음 장애/로그를 분석하고 원인 가설을 제시해주세요:\n\n{user_input}"
+    )
     
     # 첨부 파일 로그 추가
     file_logs = state.context.get("file_logs", [])
     if file_logs:
-        file_content = "\n\n".join([
-            f"[파일: {f.get('filename', 'unknown')}]\n{f.get('content', '')[:2000]}"
-            for f in file_logs
-        ])
+        file_content = builder.attachments("attachments", file_logs, "파일", name_key="filename")
         user_message += f"\n\n### 첨부 로그 파일\n{file_content}"
+    prompt_tokens = builder.usage()
     
     client = get_openrouter_client()
     
     try:
-        response = client.chat_with_system(
-            system_prompt=system_prompt,
-            user_message=user_message,
+        # 스트리밍 응답에서 항목이 완성되는 즉시 run 이벤트로 발행, 잘린 JSON은 로컬 복구
+        result, llm_meta = generate_json(
+            client, run_id, system_prompt, user_message, item_events={"hypotheses": "hypothesis"},
         )
         
-        # JSON 파싱
-        response = response.strip()
-        if response.startswith("```"):
-            lines = response.split("\n")
-            response = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-        
-        result = json.loads(response)
-        
         # 가설 정렬 (rank 기준)
         hypotheses = result.get("hypotheses", [])
         hypotheses.sort(key=lambda x: x.get("rank", 999))
@@ -309,10 +315,11 @@ def generate_hypotheses_node(state: AgentState) -> dict:
         return {
             "rca_result": rca_result,
             "trace": {
-                **state.trace,
                 "generate_hypotheses": {
                     "status": "success",
                     "hypothesis_count": len(hypotheses),
+                    "llm": llm_meta,
+                    "prompt_tokens": prompt_tokens,
                 }
             }
         }
@@ -335,10 +342,9 @@ def generate_hypotheses_node(state: AgentState) -> dict:
         
         return {
             "rca_result": rca_result,
-            "errors": state.errors + [f"RCA 결과 파싱 실패: {str(e)}"],
+            "errors": [f"RCA 결과 파싱 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "generate_hypotheses": {"status": "parse_error", "error": str(e)}
+                "generate_hypotheses": {"status": "parse_error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
         
@@ -360,10 +366,9 @@ def generate_hypotheses_node(state: AgentState) -> dict:
         
         return {
             "rca_result": rca_result,
-            "errors": state.errors + [f"RCA 분석 실패: {str(e)}"],
+            "errors": [f"RCA 분석 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "generate_hypotheses": {"status": "error", "error": str(e)}
+                "generate_hypotheses": {"status": "error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
 
@@ -406,7 +411,6 @@ def prioritize_hypotheses_node(state: AgentState) -> dict:
     return {
         "rca_result": updated_result,
         "trace": {
-            **state.trace,
             "prioritize_hypotheses": {
                 "status": "success",
                 "top_count": len(top_hypotheses),
@@ -415,6 +419,47 @@ def prioritize_hypotheses_node(state: AgentState) -> dict:
     }
 
 
+def no_evidence_fallback_node(state: AgentState) -> dict:
+    """유사 사례·시스템 정보·로그가 모두 없을 때 LLM 호출 없이 고정 결과를 반환하는 노드"""
+    run_id = state.run_id
+    skip = evidence_skip_trace(state.evidence, RCA_EVIDENCE_TYPES)
+    
+    logger.info(f"[{run_id}] Skipping hypothesis generation: {skip['reason']} (retrieved={skip['retrieved']})")
+    
+    rca_result = RCAResult(
+        hypotheses=[{
+            "rank": 1,
+            "title": "일반적인 분석",
+            "description": "유사 장애 사례와 시스템 정보, 로그가 없어 원인을 특정할 수 없습니다.",
+            "evidence": ["입력된 장애 설명"],
+            "confidence": "low",
+            "verification_steps": ["추가 로그 확인", "시스템 상태 점검"],
+        }],
+        evidence=[],
+        summary="유사 사례가 없어 일반적인 분석을 수행했습니다.",
+    )
+    
+    return {
+        "rca_result": rca_result,
+        "trace": {
+            "generate_hypotheses": skip,
+        }
+    }
+
+
+# ===== 라우터 함수 =====
+
+def route_after_retrieval(state: AgentState) -> Literal["GENERATE_HYPOTHESES", "NO_EVIDENCE_FALLBACK"]:
+    """분석할 근거(검색 증거, 첨부 로그, 입력 로그)가 있을 때만 LLM 가설 생성"""
+    if (
+        has_relevant_evidence(state.evidence, RCA_EVIDENCE_TYPES)
+        or state.context.get("file_logs")
+        or state.context.get("log_info", {}).get("has_log_format")
+    ):
+        return "GENERATE_HYPOTHESES"
+    return "NO_EVIDENCE_FALLBACK"
+
+
 # ===== 서브그래프 빌드 =====
 
 def build_rca_graph():
@@ -427,16 +472,25 @@ def build_rca_graph():
     graph.add_node("RETRIEVE_SYSTEM_INFO", retrieve_system_info_node)
     graph.add_node("GENERATE_HYPOTHESES", generate_hypotheses_node)
     graph.add_node("PRIORITIZE_HYPOTHESES", prioritize_hypotheses_node)
+    graph.add_node("NO_EVIDENCE_FALLBACK", no_evidence_fallback_node)
     
     # 엣지 연결
     graph.add_edge(START, "PARSE_LOGS")
     graph.add_edge("PARSE_LOGS", "RETRIEVE_INCIDENTS")
     graph.add_edge("RETRIEVE_INCIDENTS", "RETRIEVE_SYSTEM_INFO")
-    graph.add_edge("RETRIEVE_SYSTEM_INFO", "GENERATE_HYPOTHESES")
+    graph.add_conditional_edges(
+        "RETRIEVE_SYSTEM_INFO",
+        route_after_retrieval,
+        {
+            "GENERATE_HYPOTHESES": "GENERATE_HYPOTHESES",
+            "NO_EVIDENCE_FALLBACK": "NO_EVIDENCE_FALLBACK",
+        }
+    )
     graph.add_edge("GENERATE_HYPOTHESES", "PRIORITIZE_HYPOTHESES")
     graph.add_edge("PRIORITIZE_HYPOTHESES", END)
+    graph.add_edge("NO_EVIDENCE_FALLBACK", END)
     
-    return graph.compile()
+    return graph.compile(checkpointer=False)  # 부모 그래프 노드 단위로만 체크포인트
 
 
 @lru_cache(maxsize=1)
@@ -7,17 +7,29 @@ import json
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from langgraph.graph import StateGraph, START, END
 
+from app.agent.prefetch import take_prefetched
+from app.agent.prompt_builder import PromptBuilder
+from app.agent.retrieval import (
+    WORKFLOW_SYSTEM_TOP_K,
+    evidence_skip_trace,
+    get_query_embedding,
+    has_relevant_evidence,
+)
 from app.agent.state import AgentState, WorkflowResult
+from app.agent.structured_output import generate_json
 from app.integrations.llm.openrouter_client import get_openrouter_client
 from app.services.knowledge_service import get_knowledge_service
 from app.schemas.knowledge import StoreType
 
 logger = logging.getLogger(__name__)
 
+# 잘린 LLM 응답을 복구한 계획에 붙는 승인 사유
+TRUNCATED_PLAN_APPROVAL = "응답이 잘려 일부 단계가 누락되었을 수 있음 - 수동 검토 필요"
+
 
 WORKFLOW_SYSTEM_PROMPT = """당신은 IT 운영 업무 계획 전문가입니다.
 사용자의 요청을 분석하여 구체적인 실행 계획(Action Plan)을 수립합니다.
@@ -101,7 +113,6 @@ def analyze_request_node(state: AgentState) -> dict:
     return {
         "context": context,
         "trace": {
-            **state.trace,
             "analyze_request": {
                 "status": "success",
                 "has_action_keywords": request_info["has_action_keywords"],
@@ -128,13 +139,17 @@ def retrieve_system_docs_node(state: AgentState) -> dict:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        search_response = loop.run_until_complete(
-            service.search(
-                query=user_input,
-                store_type=StoreType.SYSTEM,
-                top_k=5,
+        # 의도 분류와 병행해 미리 시작한 검색 결과가 있으면 사용
+        search_response = take_prefetched(run_id, user_input, StoreType.SYSTEM, top_k=WORKFLOW_SYSTEM_TOP_K)
+        if search_response is None:
+            search_response = loop.run_until_complete(
+                service.search(
+                    query=user_input,
+                    store_type=StoreType.SYSTEM,
+                    top_k=WORKFLOW_SYSTEM_TOP_K,
+                    query_embedding=get_query_embedding(run_id, user_input, StoreType.SYSTEM),
+                )
             )
-        )
         
         evidence = []
         for result in search_response.results:
@@ -149,9 +164,8 @@ def retrieve_system_docs_node(state: AgentState) -> dict:
         logger.info(f"[{run_id}] Found {len(evidence)} system doc chunks")
         
         return {
-            "evidence": state.evidence + evidence,
+            "evidence": evidence,
             "trace": {
-                **state.trace,
                 "retrieve_system_docs": {
                     "status": "success",
                     "count": len(evidence),
@@ -162,9 +176,8 @@ def retrieve_system_docs_node(state: AgentState) -> dict:
     except Exception as e:
         logger.error(f"[{run_id}] System docs retrieval failed: {e}")
         return {
-            "errors": state.errors + [f"시스템 문서 검색 실패: {str(e)}"],
+            "errors": [f"시스템 문서 검색 실패: {str(e)}"],
             "trace": {
-                **state.trace,
                 "retrieve_system_docs": {"status": "error", "error": str(e)}
             }
         }
@@ -180,13 +193,11 @@ def generate_action_plan_node(state: AgentState) -> dict:
     # 시스템 문서 증거 수집
     system_evidence = [e for e in state.evidence if e.get("type") == "system_doc"]
     
-    if not system_evidence:
-        system_docs_text = "참고할 시스템 문서가 없습니다."
-    else:
-        system_docs_text = "\n\n---\n\n".join([
-            f"[문서: {e.get('doc_id', 'unknown')}]\n{e.get('content', '')}"
-            for e in system_evidence
-        ])
+    # 프롬프트 구성 (섹션별 토큰 예산, 문서는 관련도 순으로 채움)
+    builder = PromptBuilder(query=user_input)
+    system_docs_text = builder.evidence(
+        "system_docs", system_evidence, "문서", "참고할 시스템 문서가 없습니다."
+    )
     
     # 이전 분석 컨텍스트
     analysis_context = state.context.get("analysis_context", {})
@@ -194,32 +205,27 @@ def generate_action_plan_node(state: AgentState) -> dict:
         analysis_text = json.dumps(analysis_context, ensure_ascii=False, indent=2)
     else:
         analysis_text = "이전 분석 결과가 없습니다."
+    builder.count("analysis_context", analysis_text)
     
     # 프롬프트 구성
-    system_prompt = WORKFLOW_SYSTEM_PROMPT.format(
+    system_prompt = builder.system(
+        WORKFLOW_SYSTEM_PROMPT,
         system_docs=system_docs_text,
         analysis_context=analysis_text,
     )
     
     # 사용자 메시지 구성
-    user_message = f"다음 요청에 대한 실행 계획을 수립해주세요:\n\n{user_input}"
+    user_message = builder.count("user", f"다음 요청에 대한 실행 계획을 수립해주세요:\n\n{user_input}")
+    prompt_tokens = builder.usage()
     
     client = get_openrouter_client()
     
     try:
-        response = client.chat_with_system(
-            system_prompt=system_prompt,
-            user_message=user_message,
+        # 스트리밍 응답에서 항목이 완성되는 즉시 run 이벤트로 발행, 잘린 JSON은 로컬 복구
+        result, llm_meta = generate_json(
+            client, run_id, system_prompt, user_message, item_events={"action_plan": "action_step"},
         )
         
-        # JSON 파싱
-        response = response.strip()
-        if response.startswith("```"):
-            lines = response.split("\n")
-            response = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-        
-        result = json.loads(response)
-        
         # Action Plan 추출
         action_plan = result.get("action_plan", [])
         approvals_required = result.get("approvals_required", [])
@@ -227,6 +233,11 @@ def generate_action_plan_node(state: AgentState) -> dict:
         
         # 승인 필요 여부 결정
         approval_required = len(approvals_required) > 0 or overall_risk == "high"
+        if llm_meta["repaired"]:
+            # 잘린 응답은 action_plan 뒤의 approvals_required/overall_risk와 잘린 단계가 유실되므로
+            # 파싱 실패 때와 같이 승인 강제
+            approvals_required = [*approvals_required, TRUNCATED_PLAN_APPROVAL]
+            approval_required = True
         
         workflow_result = WorkflowResult(
             action_plan=action_plan,
@@ -242,12 +253,13 @@ def generate_action_plan_node(state: AgentState) -> dict:
             "approval_required": approval_required,
             "approval_status": "pending" if approval_required else "not_required",
             "trace": {
-                **state.trace,
                 "generate_action_plan": {
                     "status": "success",
                     "step_count": len(action_plan),
                     "overall_risk": overall_risk,
                     "approval_required": approval_required,
+                    "llm": llm_meta,
+                    "prompt_tokens": prompt_tokens,
                 }
             }
         }
@@ -273,10 +285,9 @@ def generate_action_plan_node(state: AgentState) -> dict:
             "workflow_result": workflow_result,
             "approval_required": True,
             "approval_status": "pending",
-            "errors": state.errors + [f"실행 계획 파싱 실패: {str(e)}"],
+            "errors": [f"실행 계획 파싱 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "generate_action_plan": {"status": "parse_error", "error": str(e)}
+                "generate_action_plan": {"status": "parse_error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
         
@@ -291,14 +302,46 @@ def generate_action_plan_node(state: AgentState) -> dict:
         
         return {
             "workflow_result": workflow_result,
-            "errors": state.errors + [f"실행 계획 생성 실패: {str(e)}"],
+            "errors": [f"실행 계획 생성 실패: {str(e)}"],
             "trace": {
-                **state.trace,
-                "generate_action_plan": {"status": "error", "error": str(e)}
+                "generate_action_plan": {"status": "error", "error": str(e), "prompt_tokens": prompt_tokens}
             }
         }
 
 
+def no_docs_fallback_node(state: AgentState) -> dict:
+    """참고 문서와 이전 분석 결과가 모두 없을 때 LLM 호출 없이 수동 검토 계획을 반환하는 노드"""
+    run_id = state.run_id
+    skip = evidence_skip_trace(state.evidence, ["system_doc"])
+    
+    logger.info(f"[{run_id}] Skipping action plan generation: {skip['reason']} (retrieved={skip['retrieved']})")
+    
+    action_plan = [{
+        "step": 1,
+        "title": "수동 검토 필요",
+        "description": "참고할 시스템 문서가 없어 자동 계획을 수립하지 않았습니다. 담당자가 직접 검토해주세요.",
+        "risk_level": "medium",
+        "requires_approval": True,
+        "estimated_duration": "미정",
+        "rollback_plan": None,
+    }]
+    workflow_result = WorkflowResult(
+        action_plan=action_plan,
+        approvals_required=["수동 검토 필요"],
+        summary="참고 문서가 없어 수동 검토가 필요합니다.",
+    )
+    
+    return {
+        "workflow_result": workflow_result,
+        "action_plan": action_plan,
+        "approval_required": True,
+        "approval_status": "pending",
+        "trace": {
+            "generate_action_plan": skip,
+        }
+    }
+
+
 def assess_risk_node(state: AgentState) -> dict:
     """위험도를 평가하는 노드"""
     run_id = state.run_id
@@ -334,8 +377,12 @@ def assess_risk_node(state: AgentState) -> dict:
     else:
         overall_risk = "low"
     
-    # 승인 필요 여부 업데이트
-    approval_required = overall_risk in ["high", "medium"] or len(high_risk_steps) > 0
+    # 승인 필요 여부 업데이트 (계획 생성 단계에서 승인 사유가 지정된 경우 유지)
+    approval_required = (
+        overall_risk in ["high", "medium"]
+        or len(high_risk_steps) > 0
+        or len(workflow_result.approvals_required) > 0
+    )
     
     logger.info(f"[{run_id}] Risk assessment: overall={overall_risk}, high_risk_steps={len(high_risk_steps)}")
     
@@ -352,7 +399,6 @@ def assess_risk_node(state: AgentState) -> dict:
         "approval_required": approval_required,
         "approval_status": "pending" if approval_required else "not_required",
         "trace": {
-            **state.trace,
             "assess_risk": {
                 "status": "success",
                 "overall_risk": overall_risk,
@@ -373,7 +419,6 @@ def finalize_plan_node(state: AgentState) -> dict:
     if not workflow_result:
         return {
             "trace": {
-                **state.trace,
                 "finalize_plan": {"status": "skipped", "reason": "no_workflow_result"}
             }
         }
@@ -397,7 +442,6 @@ def finalize_plan_node(state: AgentState) -> dict:
         "workflow_result": updated_result,
         "action_plan": action_plan,
         "trace": {
-            **state.trace,
             "finalize_plan": {
                 "status": "success",
                 "final_step_count": len(action_plan),
@@ -406,6 +450,15 @@ def finalize_plan_node(state: AgentState) -> dict:
     }
 
 
+# ===== 라우터 함수 =====
+
+def route_after_retrieval(state: AgentState) -> Literal["GENERATE_ACTION_PLAN", "NO_DOCS_FALLBACK"]:
+    """참고 문서나 이전 분석 결과가 있을 때만 LLM 계획 생성"""
+    if has_relevant_evidence(state.evidence, ["system_doc"]) or state.context.get("analysis_context"):
+        return "GENERATE_ACTION_PLAN"
+    return "NO_DOCS_FALLBACK"
+
+
 # ===== 서브그래프 빌드 =====
 
 def build_workflow_graph():
@@ -418,16 +471,25 @@ def build_workflow_graph():
     graph.add_node("GENERATE_ACTION_PLAN", generate_action_plan_node)
     graph.add_node("ASSESS_RISK", assess_risk_node)
     graph.add_node("FINALIZE_PLAN", finalize_plan_node)
+    graph.add_node("NO_DOCS_FALLBACK", no_docs_fallback_node)
     
     # 엣지 연결
     graph.add_edge(START, "ANALYZE_REQUEST")
     graph.add_edge("ANALYZE_REQUEST", "RETRIEVE_SYSTEM_DOCS")
-    graph.add_edge("RETRIEVE_SYSTEM_DOCS", "GENERATE_ACTION_PLAN")
+    graph.add_conditional_edges(
+        "RETRIEVE_SYSTEM_DOCS",
+        route_after_retrieval,
+        {
+            "GENERATE_ACTION_PLAN": "GENERATE_ACTION_PLAN",
+            "NO_DOCS_FALLBACK": "NO_DOCS_FALLBACK",
+        }
+    )
     graph.add_edge("GENERATE_ACTION_PLAN", "ASSESS_RISK")
+    graph.add_edge("NO_DOCS_FALLBACK", "ASSESS_RISK")
     graph.add_edge("ASSESS_RISK", "FINALIZE_PLAN")
     graph.add_edge("FINALIZE_PLAN", END)
     
-    return graph.compile()
+    return graph.compile(checkpointer=False)  # 부모 그래프 노드 단위로만 체크포인트
 
 
 @lru_cache(maxsize=1)
@@ -3,21 +3,33 @@
 from __future__ import annotations
 
 import logging
+import tempfile
+import time
+from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile, status
+from fastapi import APIRouter, File, Form, Header, HTTPException, Query, UploadFile, status
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 
 from app.core.config import get_settings
+from app.integrations.storage.uploads import SpooledUpload, UploadTooLargeError, spool_upload
 from app.schemas.knowledge import (
     StoreType,
     IngestResponse,
     SearchRequest,
     SearchResponse,
+    MultiSearchRequest,
+    MultiSearchResponse,
     DocumentListResponse,
     DeleteResponse,
     StoreStatsResponse,
+    SearchCacheStatsResponse,
+    SnapshotImportResponse,
 )
 from app.services.knowledge_service import get_knowledge_service
+from app.services.search_cache import get_search_cache
+from app.services.snapshot_service import SnapshotError, export_snapshot, import_snapshot
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin/knowledge-store", tags=["Knowledge Store (Admin)"])
@@ -46,6 +58,8 @@ async def ingest_documents(
     지원 파일 형식:
     - PDF (.pdf)
     - 텍스트 (.txt, .md)
+    
+    파일당 MAX_UPLOAD_BYTES 초과 시 413을 반환합니다.
     """
     verify_admin_token(x_admin_token)
     
@@ -58,21 +72,37 @@ async def ingest_documents(
     # 태그 파싱
     tag_list = [t.strip() for t in tags.split(",")] if tags else None
     
-    # 파일 읽기
-    file_data = []
-    for file in files:
-        content = await file.read()
-        file_data.append((file.filename, content))
-        logger.info(f"[api] Received file: {file.filename} ({len(content)} bytes)")
-    
-    # 적재 실행
-    service = get_knowledge_service()
-    result = await service.ingest_documents(
-        files=file_data,
-        store_type=store_type,
-        tags=tag_list,
-        version=version,
-    )
+    # 파일을 디스크로 스풀링 (청크 단위 복사 + sha256, 메모리에 전체를 올리지 않음)
+    settings = get_settings()
+    spooled: List[SpooledUpload] = []
+    try:
+        for file in files:
+            try:
+                upload = await spool_upload(
+                    file,
+                    max_bytes=settings.MAX_UPLOAD_BYTES,
+                    spool_dir=settings.UPLOAD_SPOOL_DIR,
+                    chunk_size=settings.UPLOAD_CHUNK_BYTES,
+                )
+            except UploadTooLargeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                    detail=str(e)
+                )
+            spooled.append(upload)
+            logger.info(f"[api] Received file: {upload.filename} ({upload.size} bytes, sha256={upload.sha256[:12]})")
+        
+        # 적재 실행 (파서는 스풀 파일을 직접 읽음)
+        service = get_knowledge_service()
+        result = await service.ingest_documents(
+            files=spooled,
+            store_type=store_type,
+            tags=tag_list,
+            version=version,
+        )
+    finally:
+        for upload in spooled:
+            upload.cleanup()
     
     return result
 
@@ -85,6 +115,7 @@ async def search_knowledge(
     """지식 저장소 검색
     
     쿼리를 임베딩하여 유사한 문서 청크를 검색합니다.
+    mmr / max_per_doc 지정 시 인접 청크 중복을 줄여 다양한 결과를 반환합니다.
     """
     verify_admin_token(x_admin_token)
     
@@ -94,6 +125,33 @@ async def search_knowledge(
         store_type=request.store_type,
         top_k=request.top_k,
         filter_tags=request.filter_tags,
+        mmr=request.mmr,
+        max_per_doc=request.max_per_doc,
+    )
+    
+    return result
+
+
+@router.post("/search-all", response_model=MultiSearchResponse)
+async def search_knowledge_all(
+    request: MultiSearchRequest,
+    x_admin_token: Optional[str] = Header(None),
+):
+    """다중 저장소 통합 검색
+    
+    쿼리를 한 번 임베딩하여 여러 저장소를 병렬 검색하고, 저장소별 보정을 거친 원점수로 병합합니다.
+    """
+    verify_admin_token(x_admin_token)
+    
+    service = get_knowledge_service()
+    result = await service.search_all(
+        query=request.query,
+        stores=request.store_types,
+        top_k=request.top_k,
+        store_quotas=request.store_quotas,
+        filter_tags=request.filter_tags,
+        mmr=request.mmr,
+        max_per_doc=request.max_per_doc,
     )
     
     return result
@@ -102,18 +160,24 @@ async def search_knowledge(
 @router.get("/docs", response_model=DocumentListResponse)
 async def list_documents(
     store_type: StoreType,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="페이지 크기 (미지정 시 전체)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
     x_admin_token: Optional[str] = Header(None),
 ):
-    """문서 목록 조회"""
+    """문서 목록 조회 (커서 페이지네이션)"""
     verify_admin_token(x_admin_token)
     
     service = get_knowledge_service()
-    documents = service.list_documents(store_type)
+    try:
+        documents, next_cursor = service.list_documents_page(store_type, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return DocumentListResponse(
         store_type=store_type,
         documents=documents,
-        total_count=len(documents),
+        total_count=service.get_store_stats(store_type)["document_count"],
+        next_cursor=next_cursor,
     )
 
 
@@ -155,3 +219,78 @@ async def get_store_stats(
     stats = service.get_store_stats(store_type)
     
     return StoreStatsResponse(**stats)
+
+
+@router.get("/cache/stats", response_model=SearchCacheStatsResponse)
+async def get_search_cache_stats(
+    x_admin_token: Optional[str] = Header(None),
+):
+    """검색 결과 캐시 적중률 조회"""
+    verify_admin_token(x_admin_token)
+    
+    return SearchCacheStatsResponse(**get_search_cache().stats())
+
+
+@router.get("/snapshot/export")
+def export_knowledge_snapshot(
+    store_types: Optional[List[StoreType]] = Query(None, description="대상 저장소 (미지정 시 전체)"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """지식 저장소 스냅샷 내보내기
+    
+    FAISS 인덱스, 청크 메타데이터, 문서 카탈로그를 체크섬이 포함된
+    하나의 tar.gz 아카이브로 내려받습니다.
+    """
+    verify_admin_token(x_admin_token)
+    
+    tmp = tempfile.NamedTemporaryFile(prefix="trace_snapshot_", suffix=".tar.gz", delete=False)
+    tmp.close()
+    archive_path = Path(tmp.name)
+    
+    try:
+        manifest = export_snapshot(archive_path, store_types)
+    except SnapshotError as e:
+        archive_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Snapshot export failed: {e}"
+        )
+    except Exception:
+        archive_path.unlink(missing_ok=True)
+        raise
+    filename = f"knowledge_snapshot_{manifest.created_at[:19].replace(':', '').replace('-', '')}.tar.gz"
+    
+    return FileResponse(
+        archive_path,
+        media_type="application/gzip",
+        filename=filename,
+        background=BackgroundTask(archive_path.unlink, missing_ok=True),
+    )
+
+
+@router.post("/snapshot/import", response_model=SnapshotImportResponse)
+def import_knowledge_snapshot(
+    file: UploadFile = File(..., description="스냅샷 아카이브 (.tar.gz)"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """지식 저장소 스냅샷 가져오기
+    
+    아카이브를 스트리밍으로 읽으며 파일별 체크섬을 검증하고,
+    모두 통과한 경우에만 저장소를 교체합니다 (재임베딩 없음).
+    """
+    verify_admin_token(x_admin_token)
+    
+    start_time = time.perf_counter()
+    try:
+        manifest = import_snapshot(file.file)
+    except (SnapshotError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid snapshot: {e}"
+        )
+    
+    return SnapshotImportResponse(
+        restored=True,
+        manifest=manifest,
+        duration_ms=(time.perf_counter() - start_time) * 1000,
+    )
@@ -1,8 +1,16 @@
 # app/api/v1/agent.py
 from __future__ import annotations
 
+import contextvars
+import json
 import logging
+import threading
+from typing import Any, Dict, Iterator
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.core.run_context import get_run_id, subscribe_run_events, unsubscribe_run_events
 from app.schemas.agent import AgentRunRequest, AgentRunResponse
 from app.services.agent_service import run_agent
 
@@ -10,11 +18,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/agent", tags=["agent"])
 
 
-@router.post("/run", response_model=AgentRunResponse)
-def agent_run(req: AgentRunRequest):
-    logger.info(f"[agent_run] req: {req}")
-    result = run_agent(req.query, req.context)
-
+def _build_response(result: Dict[str, Any]) -> AgentRunResponse:
+    """Agent 실행 결과 → API 응답"""
     run_id = result.get("run_id", "UNKNOWN_RUN_ID")
     approval_status = result.get("approval_status", "not_required")
     
@@ -51,4 +56,55 @@ def agent_run(req: AgentRunRequest):
         run_id=run_id,
         status="COMPLETED",
         result=result,
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/run", response_model=AgentRunResponse)
+def agent_run(req: AgentRunRequest):
+    logger.info(f"[agent_run] req: {req}")
+    result = run_agent(req.query, req.context)
+    return _build_response(result)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/run/stream")
+def agent_run_stream(req: AgentRunRequest):
+    """Agent 실행 (Server-Sent Events)
+    
+    분석 노드가 위반 사항(violation)·가설(hypothesis)·실행 단계(action_step)를 완성하는 즉시
+    이벤트로 전달하고, 마지막에 /run 과 같은 응답을 result 이벤트로 보낸다.
+    """
+    logger.info(f"[agent_run_stream] req: {req}")
+    run_id = get_run_id() or "UNKNOWN"
+    events = subscribe_run_events(run_id)
+    # run_id contextvar 를 실행 스레드로 전달
+    context = contextvars.copy_context()
+    
+    def worker() -> None:
+        try:
+            result = context.run(run_agent, req.query, req.context)
+            events.put(("result", _build_response(result).model_dump(mode="json")))
+        except Exception as e:
+            logger.error(f"[agent_run_stream] run failed: {e}", exc_info=True)
+            events.put(("error", {"run_id": run_id, "detail": str(e)}))
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=worker, name=f"agent-run-{run_id}", daemon=True).start()
+    
+    def stream() -> Iterator[str]:
+        try:
+            yield _sse("start", {"run_id": run_id})
+            while (item := events.get()) is not None:
+                yield _sse(*item)
+        finally:
+            unsubscribe_run_events(run_id, events)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -17,7 +17,7 @@ from app.services.approval_store import (
     reject_run,
     list_pending_approvals,
 )
-from app.services.agent_service import resume_after_approval
+from app.services.agent_service import discard_paused_run, resume_after_approval
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/approval", tags=["approval"])
@@ -47,7 +47,7 @@ def approve_execution(req: ApprovalRequest):
     
     # 승인 후 실행 재개
     try:
-        execution_result = resume_after_approval(req.run_id, pending.state_snapshot)
+        execution_result = resume_after_approval(req.run_id)
         return ApprovalResponse(
             run_id=req.run_id,
             status="approved",
@@ -85,6 +85,9 @@ def reject_execution(req: ApprovalRequest):
             message=f"이미 처리된 요청입니다. 상태: {pending.status}",
         )
     
+    # 재개하지 않으므로 체크포인트 삭제
+    discard_paused_run(req.run_id)
+    
     return ApprovalResponse(
         run_id=req.run_id,
         status="rejected",
@@ -1,8 +1,31 @@
 # app/api/v1/health.py
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.services.warmup_service import get_warmup_state
 
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health(request: Request):
-    return {"status": "ok", "run_id": getattr(request.state, "run_id", None)}
\ No newline at end of file
+    """준비 상태 (워밍업 완료 전이면 503 + 구성 요소별 초기화 시간)"""
+    warmup = get_warmup_state()
+    body = {
+        "status": "ok" if warmup.ready else warmup.status,
+        "ready": warmup.ready,
+        "run_id": getattr(request.state, "run_id", None),
+        "warmup": warmup.model_dump(mode="json"),
+    }
+    return JSONResponse(body, status_code=200 if warmup.ready else 503)
+
+@router.get("/health/live")
+def liveness(request: Request):
+    """프로세스 생존 여부 (워밍업과 무관)"""
+    return {"status": "ok", "run_id": getattr(request.state, "run_id", None)}
+
+@router.get("/health/llm")
+def llm_stats():
+    """LLM 클라이언트 지표 (single-flight로 절감된 업스트림 호출 수 등)"""
+    from app.integrations.llm.openrouter_client import get_openrouter_client
+
+    return get_openrouter_client().stats()
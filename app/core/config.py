@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -23,20 +24,143 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "openai/text-embedding-3-small"
     EMBEDDING_DIMENSION: int = 1536
     
+    # 저장소별 축소 차원 (예: {"incident": 512}, 미지정 저장소는 EMBEDDING_DIMENSION)
+    EMBEDDING_STORE_DIMENSIONS: Dict[str, int] = {}
+    # 저장소별 축소 방식 (matryoshka | pca, 미지정 시 matryoshka)
+    # - matryoshka: 적재 시 API dimensions 파라미터, 쿼리는 앞부분 절단 후 재정규화
+    # - pca: 인덱스 옆 projection.npz 로 투영 (scripts/reproject_store.py 로 학습)
+    EMBEDDING_STORE_REDUCTION: Dict[str, str] = {}
+    
+    # 임베딩 제공자 (openrouter | hashing | onnx)
+    # - hashing / onnx 는 로컬 CPU에서 실행되어 오프라인 적재/검색 가능
+    EMBEDDING_PROVIDER: str = "openrouter"
+    # 저장소별 제공자 (예: {"incident": "onnx"}, 미지정 저장소는 EMBEDDING_PROVIDER)
+    EMBEDDING_STORE_PROVIDERS: Dict[str, str] = {}
+    EMBEDDING_HASHING_DIMENSION: int = 1024
+    EMBEDDING_ONNX_MODEL_DIR: Optional[Path] = None  # model.onnx + tokenizer.json
+    EMBEDDING_ONNX_MAX_LENGTH: int = 256
+    
     # LLM 모델 (채팅/추론용)
     LLM_MODEL: str = "openai/gpt-4o-mini"
     LLM_TEMPERATURE: float = 0.3
     LLM_MAX_TOKENS: int = 2000
+    # 노드별 모델/최대 토큰 (키: 노드 이름 'CLASSIFY_INTENT' 또는 경로 'MIXED/ANALYZE_COMPLIANCE')
+    LLM_NODE_MODELS: Dict[str, str] = {}
+    LLM_NODE_MAX_TOKENS: Dict[str, int] = {}
+    
+    # 헤지 요청 (기본 모델이 SLO 안에 응답하지 않으면 대체 모델로 동시 요청, 먼저 온 응답 사용)
+    LLM_HEDGE_MODEL: str = ""  # 대체 모델 (빈 값 = 헤지 비활성화)
+    LLM_NODE_HEDGE_MODELS: Dict[str, str] = {}  # 노드별 대체 모델
+    LLM_NODE_SLO_MS: Dict[str, float] = {}  # 노드별 고정 SLO (없으면 최근 지연 백분위)
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # 백분위 계산 최소 표본 (부족하면 기본 SLO)
+    LLM_HEDGE_DEFAULT_SLO_MS: float = 15000.0  # 일반 호출 (응답 완료까지)
+    LLM_HEDGE_DEFAULT_TTFT_MS: float = 3000.0  # 스트리밍 호출 (첫 토큰까지)
+    
+    # 동일 요청 합치기 (동시에 진행 중인 같은 임베딩/채팅 요청은 업스트림 1회 후 결과 공유)
+    LLM_COALESCE_ENABLED: bool = True
+    LLM_COALESCE_TIMEOUT: float = 30.0  # 후속 호출 최대 대기(초), 초과 시 직접 호출
+    
+    # 스트리밍 응답 (분석 노드가 항목 완성 즉시 이벤트 발행, 잘린 JSON 로컬 복구)
+    LLM_STREAMING_ENABLED: bool = True
+    
+    # 레이트 리밋 / 동시성 / 재시도 (429 폭주 시 재시도 증폭 방지)
+    LLM_RATE_LIMIT_RPM: int = 0  # 분당 요청 수 (0 = 제한 없음)
+    LLM_RATE_LIMIT_TPM: int = 0  # 분당 토큰 수 (0 = 제한 없음)
+    LLM_MAX_CONCURRENCY: int = 16  # 동시 요청 상한 (AIMD: 429 시 절반, 성공 시 점진 증가)
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_RATE_LIMIT_TIMEOUT: float = 60.0  # 허가 대기 최대 시간(초)
+    LLM_MAX_RETRIES: int = 2  # 재시도 가능한 오류(429/408/5xx/연결)만 재시도
+    LLM_RETRY_MAX_WAIT: float = 30.0  # 재시도 대기 상한(초, Retry-After 포함)
+    
+    # 모델 단가 (USD / 1M 토큰, 사용량 비용 추정용. 미등록 모델은 0으로 집계)
+    LLM_PRICING: Dict[str, Dict[str, float]] = {
+        "openai/gpt-4o-mini": {"prompt": 0.15, "completion": 0.60},
+        "openai/text-embedding-3-small": {"prompt": 0.02},
+    }
     
     # ===== 지식 저장소 =====
     DATA_DIR: Path = Path("app/data")
     KNOWLEDGE_STORE_DIR: Path = Path("app/data/knowledge")
     FAISS_INDEX_DIR: Path = Path("app/data/faiss_index")
+    DOC_CATALOG_PATH: Optional[Path] = None  # 문서 카탈로그 SQLite (None이면 KNOWLEDGE_STORE_DIR/catalog.db)
+    
+    # 벡터 저장소 백엔드 (faiss | milvus)
+    VECTORSTORE_BACKEND: str = "faiss"
+    # (pymilvus가 MILVUS_URI 환경변수를 직접 읽으므로 별도 이름 사용)
+    VECTORSTORE_MILVUS_URI: str = "app/data/milvus/trace_ai.db"  # Milvus Lite 로컬 파일 (또는 http://host:19530)
+    VECTORSTORE_MILVUS_COLLECTION: str = "trace_knowledge"  # 컬렉션 접두사 (저장소 유형별 {prefix}_{store})
+    VECTORSTORE_MILVUS_PARTITIONS: int = 16  # doc_id 파티션 키 파티션 수 (새 컬렉션 생성 시에만 적용)
     
     # 청킹 설정
     CHUNK_SIZE: int = 500  # 문자 기준
     CHUNK_OVERLAP: int = 50
     
+    # 업로드 (임시 파일로 청크 단위 스풀링 후 파싱)
+    MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024  # 파일당 최대 크기 (초과 시 413, 0 = 제한 없음)
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024  # 스풀링 읽기 단위
+    UPLOAD_SPOOL_DIR: Optional[Path] = None  # 스풀 디렉터리 (None이면 시스템 임시 디렉터리)
+    
+    # ===== 검색 (Retrieval) =====
+    # MMR 다양화 (인접 청크가 top-k를 독점하는 문제 완화)
+    SEARCH_MMR_ENABLED: bool = False
+    SEARCH_MMR_LAMBDA: float = 0.7  # 1.0 = 관련도만, 0.0 = 다양성만
+    SEARCH_MMR_FETCH_MULTIPLIER: int = 4  # 후보 수 = top_k * multiplier
+    SEARCH_DUPLICATE_THRESHOLD: float = 0.95  # 선택된 청크와 이 이상 유사하면 근접 중복으로 제외
+    SEARCH_MAX_CHUNKS_PER_DOC: int = 0  # 문서당 최대 청크 수 (0 = 제한 없음)
+    # 통합 검색 저장소별 점수 보정값 (원점수에 더함, 예: {"system": -0.05})
+    SEARCH_STORE_SCORE_OFFSETS: Dict[str, float] = {}
+    # 검색 결과 LRU 캐시 (저장소 generation 변경 시 자동 무효화)
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024  # 0 = 캐시 비활성화
+    
+    # ===== 증거 추출 압축 =====
+    EVIDENCE_COMPRESSION_ENABLED: bool = True  # 질의와 관련 높은 문장만 프롬프트에 포함
+    EVIDENCE_COMPRESSION_RATIO: float = 0.3  # 청크당 남길 문장 비율
+    EVIDENCE_COMPRESSION_MIN_SENTENCES: int = 2  # 청크당 최소 문장 수
+    EVIDENCE_COMPRESSION_MIN_CHARS: int = 200  # 이보다 짧은 청크는 압축하지 않음
+    
+    # ===== 복합 요청 실행 =====
+    # mixed 의도는 분류된 capabilities의 서브그래프만 실행, 독립 분석(compliance/rca)은 병렬 실행
+    MIXED_PARALLEL_ENABLED: bool = True
+    
+    # ===== 추측 검색 프리페치 =====
+    # 의도 분류 LLM 호출과 병행해 쿼리 임베딩·저장소 검색을 시작 (필요 없는 검색은 분류 후 취소)
+    RETRIEVAL_PREFETCH_ENABLED: bool = True
+    RETRIEVAL_PREFETCH_WORKERS: int = 4
+    
+    # ===== 증거 기반 분기 =====
+    # 검색 증거가 없거나 모두 기준 점수 미만이면 분석 LLM 호출 없이 고정 폴백 결과 반환
+    EVIDENCE_GATE_ENABLED: bool = True
+    # 검색 원점수(코사인 유사도) 기준, 이 미만 청크는 근거로 보지 않음 (None이면 검색 결과가 비었을 때만)
+    # 임베딩 제공자마다 점수 분포가 달라 기본은 비활성 (hashing 임베딩은 관련 청크도 0 근처)
+    EVIDENCE_MIN_SCORE: Optional[float] = None
+    
+    # ===== 규정 준수 분석 =====
+    # single_pass: 분석 1회 호출로 위반 사항+권고사항 생성 (응답이 불완전할 때만 후속 호출)
+    # two_pass: 분석 후 권고사항을 별도 호출로 생성
+    COMPLIANCE_MODE: Literal["single_pass", "two_pass"] = "single_pass"
+    
+    # ===== 실행 체크포인트 (승인 대기/재개) =====
+    # 승인이 필요한 run은 EXECUTE 직전에 중단·저장되고, 승인 후 체크포인트에서 이어서 실행
+    CHECKPOINT_BACKEND: Literal["sqlite", "memory"] = "sqlite"  # memory는 재시작 시 승인 대기 run 유실
+    CHECKPOINT_DB_PATH: Optional[Path] = None  # None이면 DATA_DIR/checkpoints.sqlite
+    # exit: run 종료/중단 시에만 저장 (승인 재개에 충분), async: 매 단계 백그라운드 저장 (중간 실패 지점부터 재시도용)
+    # sync는 지원하지 않음 - 체크포인트 없이 컴파일된 서브그래프가 모드를 물려받아 실행 중 실패함
+    CHECKPOINT_DURABILITY: Literal["exit", "async"] = "exit"
+    CHECKPOINT_RETENTION_HOURS: float = 72  # 마지막 저장 후 이 시간이 지난 체크포인트 삭제 (승인 대기는 expired)
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS: int = 3600  # 정리 주기 (0 = 비활성화)
+    
+    # ===== 프롬프트 토큰 예산 =====
+    PROMPT_TOKENIZER_ENCODING: str = "o200k_base"  # tiktoken 인코딩 (미설치 시 글자 수 추정)
+    PROMPT_BUDGET_SYSTEM: int = 1500  # 시스템 프롬프트 템플릿 (초과 시 경고만)
+    PROMPT_BUDGET_EVIDENCE: int = 6000  # 검색 증거 (관련도 순으로 채움)
+    PROMPT_BUDGET_ATTACHMENTS: int = 3000  # 첨부 파일/로그 (파일 간 균등 분배)
+    
+    # ===== 시작 워밍업 =====
+    WARMUP_ON_STARTUP: bool = True  # 인덱스/그래프/클라이언트 사전 초기화
+    WARMUP_BLOCKING: bool = False  # True면 워밍업 완료 후 요청 수신 시작
+    WARMUP_SEARCHES: int = 3  # 저장소별 합성 워밍업 검색 횟수 (0 = 생략)
+    
     # ===== Admin =====
     ADMIN_TOKEN: str = "dev-admin-token"  # MVP용 간단 토큰
 
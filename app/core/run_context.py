@@ -1,9 +1,12 @@
 # app/core/run_context.py
 from __future__ import annotations
 
+import queue
+import threading
 import uuid
+from concurrent.futures import Future
 from contextvars import ContextVar
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 _run_id_ctx: ContextVar[Optional[str]] = ContextVar("run_id", default=None)
 
@@ -15,3 +18,122 @@ def set_run_id(run_id: str) -> None:
 
 def get_run_id() -> Optional[str]:
     return _run_id_ctx.get()
+
+# ===== run 범위 메모 =====
+class RunMemo:
+    """한 run 안에서 노드/서브그래프/스레드가 공유하는 계산 결과 캐시
+    
+    (예: 쿼리 임베딩을 run당 1회만 계산)
+    """
+    
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.counters: Dict[str, int] = {}
+        self._pending: Dict[str, Future] = {}  # 계산 중인 key (같은 key 호출자는 이 Future를 기다림)
+        self._lock = threading.RLock()
+    
+    def get_or_compute(self, key: str, factory: Callable[[], Any]) -> Tuple[Any, bool]:
+        """key 값이 없으면 계산하여 저장 (동시 호출 시 1회만 계산)
+        
+        계산(네트워크 임베딩 호출 등)은 락 밖에서 하므로 다른 key의 조회/계산은 막히지 않고,
+        같은 key의 동시 호출자만 계산이 끝나길 기다린다 (계산 실패 시 같은 예외를 받음).
+        
+        Returns:
+            (값, 재사용 여부)
+        """
+        with self._lock:
+            if key in self.values:
+                return self.values[key], True
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = Future()
+        
+        if not owner:
+            return pending.result(), True
+        
+        try:
+            value = factory()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self.values[key] = value
+            self._pending.pop(key, None)
+        pending.set_result(value)
+        return value, False
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.values.get(key, default)
+    
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def append(self, key: str, item: Any) -> None:
+        """key 목록에 항목 추가 (예: LLM 사용량 기록)"""
+        with self._lock:
+            self.values.setdefault(key, []).append(item)
+    
+    def items(self, key: str) -> list:
+        with self._lock:
+            return list(self.values.get(key, []))
+
+_run_memos: Dict[str, RunMemo] = {}
+_run_memos_lock = threading.Lock()
+
+def get_run_memo(run_id: Optional[str] = None) -> RunMemo:
+    """run_id별 메모 (없으면 생성)"""
+    run_id = run_id or get_run_id() or "UNKNOWN"
+    with _run_memos_lock:
+        if run_id not in _run_memos:
+            _run_memos[run_id] = RunMemo()
+        return _run_memos[run_id]
+
+def find_run_memo(run_id: Optional[str]) -> Optional[RunMemo]:
+    """run_id의 메모 (없거나 이미 해제되었으면 None - 새로 만들지 않음)
+    
+    run 종료 후에도 끝날 수 있는 백그라운드 작업(추측 검색 등)의 기록용.
+    """
+    with _run_memos_lock:
+        return _run_memos.get(run_id or "")
+
+def clear_run_memo(run_id: str) -> None:
+    """run 종료 시 메모 해제 (close()가 있는 값은 닫음 - 예: 진행 중인 추측 검색 중단)"""
+    with _run_memos_lock:
+        memo = _run_memos.pop(run_id, None)
+    if memo is None:
+        return
+    for value in list(memo.values.values()):
+        close = getattr(value, "close", None)
+        if callable(close):
+            close()
+
+# ===== run 이벤트 (스트리밍 엔드포인트) =====
+_run_subscribers: Dict[str, List["queue.Queue"]] = {}
+_run_subscribers_lock = threading.Lock()
+
+def subscribe_run_events(run_id: str) -> "queue.Queue":
+    """run 진행 이벤트 구독 (큐에 (event, data) 튜플이 들어옴)"""
+    events: queue.Queue = queue.Queue()
+    with _run_subscribers_lock:
+        _run_subscribers.setdefault(run_id, []).append(events)
+    return events
+
+def unsubscribe_run_events(run_id: str, events: "queue.Queue") -> None:
+    with _run_subscribers_lock:
+        subscribers = _run_subscribers.get(run_id, [])
+        if events in subscribers:
+            subscribers.remove(events)
+        if not subscribers:
+            _run_subscribers.pop(run_id, None)
+
+def publish_run_event(run_id: Optional[str], event: str, data: Any) -> None:
+    """run 진행 이벤트 발행 (구독자가 없으면 무시)"""
+    with _run_subscribers_lock:
+        subscribers = list(_run_subscribers.get(run_id or "", []))
+    for events in subscribers:
+        events.put((event, data))
@@ -0,0 +1,41 @@
+"""임베딩 제공자 인터페이스"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class EmbeddingProvider(ABC):
+    """텍스트 임베딩 제공자
+    
+    저장소마다 다른 제공자를 쓸 수 있으며, 같은 저장소의 적재와 검색은
+    반드시 같은 제공자(같은 벡터 공간)를 사용해야 한다.
+    """
+    
+    name: str = "base"
+    # 제공자가 출력 차원 축소(dimensions 파라미터)를 직접 지원하는지 여부
+    supports_dimensions: bool = False
+    
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """기본 출력 차원"""
+        pass
+    
+    @property
+    def model_id(self) -> str:
+        """벡터 공간 식별자 (스냅샷 호환성 검사용)"""
+        return self.name
+    
+    @abstractmethod
+    def embed(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        """배치 임베딩
+        
+        Args:
+            dimensions: 출력 차원 축소 (supports_dimensions 인 제공자만 사용)
+        """
+        pass
+    
+    def embed_query(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        """단일 쿼리 임베딩"""
+        return self.embed([text], dimensions=dimensions)[0]
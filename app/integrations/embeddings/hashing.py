@@ -0,0 +1,66 @@
+"""결정적 해싱 임베딩 제공자 (로컬 CPU, 외부 의존성 없음)
+
+단어 unigram과 단어 내부 문자 3-gram을 blake2b로 해싱해 고정 차원에 누적한다
+(부호 해싱으로 충돌 편향 상쇄, 서브리니어 TF 가중치, L2 정규화).
+모델 파일·네트워크 없이 같은 입력에 항상 같은 벡터를 만들므로
+오프라인 적재/검색과 재현 가능한 벤치마크에 사용한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from typing import List, Optional
+
+from app.integrations.embeddings.base import EmbeddingProvider
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _features(text: str, ngram: int) -> Counter:
+    """단어 및 문자 n-gram 특징 빈도"""
+    features: Counter = Counter()
+    for word in _TOKEN.findall(text.lower()):
+        features["w:" + word] += 1
+        if ngram > 0 and len(word) > ngram:
+            padded = f"<{word}>"
+            for i in range(len(padded) - ngram + 1):
+                features["c:" + padded[i:i + ngram]] += 1
+    return features
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """특징 해싱 벡터화 (학습 불필요)"""
+    
+    name = "hashing"
+    
+    def __init__(self, dimension: int, ngram: int = 3):
+        if dimension <= 0:
+            raise ValueError(f"Hashing dimension must be positive: {dimension}")
+        self._dimension = dimension
+        self.ngram = ngram
+    
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+    
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self._dimension}:ngram{self.ngram}"
+    
+    def _hash(self, feature: str) -> tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self._dimension, 1.0 if (digest >> 63) & 1 else -1.0
+    
+    def embed(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        import numpy as np
+        
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in _features(text, self.ngram).items():
+                index, sign = self._hash(feature)
+                vectors[row, index] += sign * (1.0 + np.log(count))
+        
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (vectors / norms).tolist()
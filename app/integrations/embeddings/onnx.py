@@ -0,0 +1,116 @@
+"""로컬 ONNX 문장 임베딩 제공자
+
+디스크의 모델 디렉터리(model.onnx + tokenizer.json)를 onnxruntime(CPU)으로 실행한다.
+sentence-transformers 모델을 ONNX로 내보낸 형식을 가정하며,
+출력이 토큰 임베딩(batch, seq, hidden)이면 attention mask 평균 풀링 후 L2 정규화한다.
+
+필요 패키지: onnxruntime, tokenizers (EMBEDDING_PROVIDER=onnx 선택 시에만 import)
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from app.integrations.embeddings.base import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "model.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """onnxruntime CPU 추론 (모델은 첫 사용 시 로드)"""
+    
+    name = "onnx"
+    
+    def __init__(self, model_dir: Path, max_length: int = 256, batch_size: int = 32):
+        self.model_dir = Path(model_dir)
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self._session = None
+        self._tokenizer = None
+        self._dimension: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def _load(self) -> None:
+        if self._session is not None:
+            return
+        with self._lock:
+            if self._session is not None:
+                return
+            try:
+                import onnxruntime
+                from tokenizers import Tokenizer
+            except ImportError as e:
+                raise RuntimeError(
+                    "EMBEDDING_PROVIDER=onnx requires onnxruntime and tokenizers "
+                    "(pip install onnxruntime tokenizers)"
+                ) from e
+            
+            model_path = self.model_dir / MODEL_FILENAME
+            tokenizer_path = self.model_dir / TOKENIZER_FILENAME
+            for path in (model_path, tokenizer_path):
+                if not path.exists():
+                    raise FileNotFoundError(f"ONNX embedding model file not found: {path}")
+            
+            tokenizer = Tokenizer.from_file(str(tokenizer_path))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+            
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = onnxruntime.InferenceSession(
+                str(model_path), options, providers=["CPUExecutionProvider"]
+            )
+            
+            self._tokenizer = tokenizer
+            self._input_names = {i.name for i in session.get_inputs()}
+            hidden = session.get_outputs()[0].shape[-1]
+            self._dimension = hidden if isinstance(hidden, int) else None
+            self._session = session
+            logger.info(f"[embeddings] Loaded ONNX model: {model_path}")
+    
+    @property
+    def dimension(self) -> int:
+        self._load()
+        if self._dimension is None:
+            # 출력 차원이 동적이면 한 번 실행해 확인
+            self._dimension = len(self._embed_batch(["dimension probe"])[0])
+        return self._dimension
+    
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_dir.name}"
+    
+    def _embed_batch(self, texts: List[str]):
+        import numpy as np
+        
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        
+        output = self._session.run(None, feeds)[0]
+        if output.ndim == 3:
+            # 토큰 임베딩 → attention mask 평균 풀링
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (output / norms).astype(np.float32)
+    
+    def embed(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        if not texts:
+            return []
+        self._load()
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_batch(texts[start:start + self.batch_size]).tolist())
+        return vectors
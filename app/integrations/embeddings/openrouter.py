@@ -0,0 +1,29 @@
+"""OpenRouter 원격 임베딩 제공자 (기본값)"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+from app.core.config import get_settings
+from app.integrations.embeddings.base import EmbeddingProvider
+from app.integrations.llm import openrouter_client
+
+
+class OpenRouterEmbeddingProvider(EmbeddingProvider):
+    """OpenRouterClient 임베딩 API 위임"""
+    
+    name = "openrouter"
+    supports_dimensions = True
+    
+    @property
+    def dimension(self) -> int:
+        return get_settings().EMBEDDING_DIMENSION
+    
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{get_settings().EMBEDDING_MODEL}"
+    
+    def embed(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        return openrouter_client.get_openrouter_client().create_embeddings(texts, dimensions=dimensions)
+    
+    def embed_query(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        return openrouter_client.get_openrouter_client().create_embedding(text, dimensions=dimensions)
@@ -0,0 +1,91 @@
+"""임베딩 제공자 레지스트리
+
+설정(EMBEDDING_PROVIDER, 저장소별 EMBEDDING_STORE_PROVIDERS)에 따라 제공자를 선택한다.
+- openrouter: 원격 API (기본값)
+- hashing: 결정적 해싱 벡터화 (오프라인/재현 가능한 벤치마크)
+- onnx: 디스크의 ONNX 문장 임베딩 모델 (onnxruntime CPU)
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict
+
+from app.core.config import get_settings
+from app.integrations.embeddings.base import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+ProviderFactory = Callable[[], EmbeddingProvider]
+
+
+def _openrouter_factory() -> EmbeddingProvider:
+    from app.integrations.embeddings.openrouter import OpenRouterEmbeddingProvider
+    return OpenRouterEmbeddingProvider()
+
+
+def _hashing_factory() -> EmbeddingProvider:
+    from app.integrations.embeddings.hashing import HashingEmbeddingProvider
+    return HashingEmbeddingProvider(get_settings().EMBEDDING_HASHING_DIMENSION)
+
+
+def _onnx_factory() -> EmbeddingProvider:
+    from app.integrations.embeddings.onnx import OnnxEmbeddingProvider
+    
+    settings = get_settings()
+    if settings.EMBEDDING_ONNX_MODEL_DIR is None:
+        raise RuntimeError("EMBEDDING_PROVIDER=onnx requires EMBEDDING_ONNX_MODEL_DIR")
+    return OnnxEmbeddingProvider(
+        settings.EMBEDDING_ONNX_MODEL_DIR,
+        max_length=settings.EMBEDDING_ONNX_MAX_LENGTH,
+    )
+
+
+_factories: Dict[str, ProviderFactory] = {
+    "openrouter": _openrouter_factory,
+    "hashing": _hashing_factory,
+    "onnx": _onnx_factory,
+}
+
+# 제공자 이름별 인스턴스 캐시 (모델 로드는 1회)
+_providers: Dict[str, EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: ProviderFactory) -> None:
+    """제공자 등록"""
+    _factories[name] = factory
+    _providers.pop(name, None)
+    logger.info(f"[embeddings] Registered provider '{name}'")
+
+
+def list_providers() -> list[str]:
+    """등록된 제공자 이름 목록"""
+    return sorted(_factories)
+
+
+def provider_name_for(store_type: str = None) -> str:
+    """저장소에 설정된 제공자 이름 (미지정 저장소는 EMBEDDING_PROVIDER)"""
+    settings = get_settings()
+    if store_type is not None and store_type in settings.EMBEDDING_STORE_PROVIDERS:
+        return settings.EMBEDDING_STORE_PROVIDERS[store_type].lower()
+    return settings.EMBEDDING_PROVIDER.lower()
+
+
+def get_embedding_provider(store_type: str = None, provider: str = None) -> EmbeddingProvider:
+    """저장소 유형별 임베딩 제공자 반환
+    
+    Args:
+        store_type: policy, incident, system (None이면 기본 제공자)
+        provider: 제공자 이름 (지정 시 설정 무시)
+    """
+    name = (provider or provider_name_for(store_type)).lower()
+    if name not in _providers:
+        factory = _factories.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown embedding provider: {name} (available: {list_providers()})")
+        with _providers_lock:
+            if name not in _providers:
+                _providers[name] = factory()
+                logger.info(f"[embeddings] Created provider '{name}'")
+    return _providers[name]
@@ -0,0 +1,173 @@
+"""LLM JSON 응답 증분 파싱 / 잘린 출력 복구
+
+- IncrementalJSONParser: 스트리밍 조각을 받아, 최상위 객체의 지정된 배열(예: hypotheses,
+  violations, action_plan) 안의 객체가 닫히는 즉시 하나씩 반환한다.
+- repair_json: max_tokens 등으로 잘린 JSON을 마지막 완성 항목 경계에서 잘라 괄호를 닫고,
+  불완전한 마지막 항목(잘린 문자열·객체)은 버려 파싱 가능한 형태로 복구한다 (모델 재호출 없이 로컬에서 처리).
+- parse_json_response: 코드 블록 제거 → 파싱 → 실패 시 복구 후 재파싱.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+def strip_code_fence(text: str) -> str:
+    """마크다운 코드 블록(```json ... ```) 제거 (닫는 펜스가 잘려도 처리)"""
+    text = text.strip()
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    return text
+
+
+class IncrementalJSONParser:
+    """최상위 객체의 지정 배열 항목을 완성되는 대로 반환하는 증분 파서"""
+    
+    def __init__(self, array_keys: Iterable[str]):
+        self.array_keys = set(array_keys)
+        self._text = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None  # 깊이 1에서 마지막으로 닫힌 문자열 (키)
+        self._active: Optional[str] = None  # 현재 안에 있는 감시 대상 배열 키
+        self._item_start: Optional[int] = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """조각 추가 후 새로 완성된 (배열 키, 항목) 목록 반환"""
+        self._text += chunk
+        items: List[Tuple[str, Any]] = []
+        text = self._text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            
+            if not self._started:
+                # 코드 블록 펜스 등 첫 '{' 이전 내용은 무시
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+            
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if self._depth == 1 and ch == "[":
+                    self._active = self._last_key if self._last_key in self.array_keys else None
+                elif self._depth == 2 and self._active and ch == "{":
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None and ch == "}":
+                    try:
+                        items.append((self._active, json.loads(text[self._item_start:i + 1])))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif self._depth == 1:
+                    self._active = None
+        return items
+    
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 텍스트"""
+        return self._text
+
+
+def repair_json(text: str) -> Optional[str]:
+    """잘린 JSON 복구 (실패 시 None)
+    
+    항목 경계(배열 항목 사이, 최상위 객체의 키 사이)에서만 잘라 괄호를 닫는다.
+    닫히지 않은 중첩 객체나 문자열은 값이 잘렸을 수 있으므로 통째로 버린다
+    (예: "severity": "hi → 해당 위반 항목 전체 제외).
+    """
+    start = min((p for p in (text.find("{"), text.find("[")) if p >= 0), default=-1)
+    if start < 0:
+        return None
+    text = text[start:]
+    
+    def at_boundary(stack: List[str]) -> bool:
+        # 최상위 값 외에 열린 객체가 없어야 함 (열린 배열 안에서만 자를 수 있음)
+        return all(closer == "]" for closer in stack[1:])
+    
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []  # (자를 위치, 그 시점의 닫는 괄호)
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == "{":
+            # 미완성 객체는 통째로 버림 (빈 객체 항목이 남지 않도록 여는 괄호 앞에서 자름)
+            if at_boundary(stack):
+                cuts.append((i, "".join(reversed(stack))))
+            stack.append("}")
+        elif ch == "[":
+            stack.append("]")
+            if at_boundary(stack):
+                cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch in "}]":
+            if not stack:
+                # 최상위 값이 이미 닫힘 (뒤에 덧붙은 텍스트 제거)
+                return text[:i]
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+            if at_boundary(stack):
+                # 방금 닫힌 값 뒤 (예: 마지막 완성 항목 직후에 잘린 경우)
+                cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == "," and at_boundary(stack):
+            cuts.append((i, "".join(reversed(stack))))
+    
+    for position, suffix in reversed(cuts):
+        candidate = text[:position].rstrip().rstrip(",") + suffix
+        try:
+            json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        return candidate
+    return None
+
+
+def parse_json_response(text: str) -> Tuple[Any, bool]:
+    """LLM 응답 JSON 파싱 (잘린 출력은 로컬 복구)
+    
+    Returns:
+        (파싱 결과, 복구 여부)
+    
+    Raises:
+        json.JSONDecodeError: 복구해도 파싱할 수 없는 경우
+    """
+    text = strip_code_fence(text)
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        repaired = repair_json(text)
+        if repaired is None:
+            raise e
+        return json.loads(repaired), True
@@ -3,25 +3,45 @@
 from __future__ import annotations
 
 import logging
+import time
+from contextlib import ExitStack
 from functools import lru_cache
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
 
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryCallState, Retrying, retry_if_exception, stop_after_attempt
 
 from app.core.config import get_settings
+from app.integrations.llm.rate_limit import (
+    Permit,
+    RateLimiter,
+    backoff_seconds,
+    estimate_tokens,
+    is_rate_limited,
+    is_retryable,
+    retry_after_seconds,
+)
+from app.integrations.llm.routing import Hedger, resolve_route
+from app.integrations.llm.singleflight import SingleFlight, make_key
+from app.integrations.llm.usage import CallKind, current_node, get_usage_metrics, record_usage
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class OpenRouterClient:
     """OpenRouter를 통한 임베딩 생성 및 LLM 호출 클라이언트"""
     
     def __init__(self):
+        # openai SDK는 import 비용이 커서 클라이언트 생성 시점에 로드
+        from openai import OpenAI
+        
         settings = get_settings()
         self.client = OpenAI(
             api_key=settings.OPENROUTER_API_KEY,
             base_url=settings.OPENROUTER_BASE_URL,
+            max_retries=0,  # 재시도는 _request 에서 오류 유형별로 수행 (SDK 자체 재시도와 중첩 방지)
         )
         # 임베딩 설정
         self.embedding_model = settings.EMBEDDING_MODEL
@@ -33,32 +53,140 @@ class OpenRouterClient:
         
         # 하위 호환성
         self.model = self.embedding_model
+        
+        # 동일 요청 합치기 (동시 실행 중인 같은 임베딩/채팅 요청은 업스트림 1회)
+        self.coalesce = settings.LLM_COALESCE_ENABLED
+        self.singleflight = SingleFlight("openrouter", timeout=settings.LLM_COALESCE_TIMEOUT)
+        
+        # 레이트 리밋 (RPM/TPM 토큰 버킷 + AIMD 동시성) 및 재시도 정책
+        self.limiter = RateLimiter(
+            rpm=settings.LLM_RATE_LIMIT_RPM,
+            tpm=settings.LLM_RATE_LIMIT_TPM,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            min_concurrency=settings.LLM_MIN_CONCURRENCY,
+            acquire_timeout=settings.LLM_RATE_LIMIT_TIMEOUT,
+        )
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.retry_max_wait = settings.LLM_RETRY_MAX_WAIT
+        
+        # 노드별 모델 라우팅 + 지연 SLO 초과 시 대체 모델 헤지
+        self.hedger = Hedger(max_workers=settings.LLM_MAX_CONCURRENCY * 2)
+    
+    def _coalesced(self, func: Callable[[], T], *key_parts) -> T:
+        """동일 인자의 동시 호출을 하나의 업스트림 요청으로 합침"""
+        if not self.coalesce:
+            return func()
+        return self.singleflight.do(make_key(*key_parts), func)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-    )
-    def create_embedding(self, text: str) -> List[float]:
-        """단일 텍스트 임베딩 생성"""
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=text,
+    def _attempt(self, func: Callable[[], Any], estimated_tokens: int) -> Any:
+        """레이트 리밋 허가를 받아 업스트림 요청 1회 실행"""
+        with self.limiter.permit(estimated_tokens) as permit:
+            try:
+                response = func()
+            except Exception as e:
+                if is_rate_limited(e):
+                    permit.throttle(retry_after_seconds(e))
+                raise
+            usage = getattr(response, "usage", None)
+            permit.record_usage(getattr(usage, "total_tokens", None))
+            return response
+    
+    def _retry_wait(self, retry_state: RetryCallState) -> float:
+        return backoff_seconds(
+            retry_state.attempt_number,
+            retry_state.outcome.exception(),
+            max_wait=self.retry_max_wait,
+        )
+    
+    def _before_retry(self, retry_state: RetryCallState) -> None:
+        self.limiter.record_retry()
+        logger.warning(
+            f"[openrouter] Retrying after {retry_state.outcome.exception()!r} "
+            f"(attempt {retry_state.attempt_number}/{self.max_retries + 1}, "
+            f"wait {retry_state.next_action.sleep:.1f}s)"
+        )
+    
+    def _retrying(self) -> Retrying:
+        return Retrying(
+            stop=stop_after_attempt(self.max_retries + 1),
+            retry=retry_if_exception(is_retryable),
+            wait=self._retry_wait,
+            before_sleep=self._before_retry,
+            reraise=True,
+        )
+    
+    def _request(self, func: Callable[[], Any], estimated_tokens: int, kind: CallKind, model: str) -> Any:
+        """레이트 리밋 + 재시도 정책 적용 (재시도 가능한 오류만, Retry-After 준수)
+        
+        호출 결과(토큰, 재시도 포함 지연, 추정 비용)는 현재 run/노드에 귀속해 기록한다.
+        """
+        start = time.perf_counter()
+        try:
+            response = self._retrying()(self._attempt, func, estimated_tokens)
+        except Exception:
+            record_usage(kind, model, (time.perf_counter() - start) * 1000, status="error")
+            raise
+        record_usage(kind, model, (time.perf_counter() - start) * 1000, response)
+        return response
+    
+    def stats(self) -> dict:
+        """클라이언트 지표"""
+        return {
+            "singleflight": self.singleflight.stats(),
+            "rate_limit": self.limiter.stats(),
+            "routing": self.hedger.stats(),
+            "usage": get_usage_metrics().snapshot(),
+        }
+    
+    def create_embedding(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        """단일 텍스트 임베딩 생성
+        
+        Args:
+            dimensions: 출력 차원 축소 (text-embedding-3 계열, None이면 모델 기본 차원)
+        """
+        return self._coalesced(
+            lambda: self._create_embedding(text, dimensions),
+            "embedding", self.model, dimensions, text,
+        )
+    
+    def _create_embedding(self, text: str, dimensions: Optional[int]) -> List[float]:
+        response = self._request(
+            lambda: self.client.embeddings.create(
+                model=self.model,
+                input=text,
+                **({"dimensions": dimensions} if dimensions else {}),
+            ),
+            estimate_tokens(text),
+            "embedding",
+            self.model,
         )
         return response.data[0].embedding
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-    )
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """배치 임베딩 생성"""
+    def create_embeddings(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        """배치 임베딩 생성
+        
+        Args:
+            dimensions: 출력 차원 축소 (text-embedding-3 계열, None이면 모델 기본 차원)
+        """
         if not texts:
             return []
         
+        return self._coalesced(
+            lambda: self._create_embeddings(texts, dimensions),
+            "embeddings", self.model, dimensions, texts,
+        )
+    
+    def _create_embeddings(self, texts: List[str], dimensions: Optional[int]) -> List[List[float]]:
         # OpenAI API는 배치 처리 지원
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=texts,
+        response = self._request(
+            lambda: self.client.embeddings.create(
+                model=self.model,
+                input=texts,
+                **({"dimensions": dimensions} if dimensions else {}),
+            ),
+            sum(estimate_tokens(text) for text in texts),
+            "embedding",
+            self.model,
         )
         
         # 인덱스 순서대로 정렬하여 반환
@@ -68,10 +196,6 @@ class OpenRouterClient:
         
         return embeddings
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-    )
     def chat(
         self,
         messages: List[dict],
@@ -81,21 +205,40 @@ class OpenRouterClient:
     ) -> str:
         """LLM 채팅 완성
         
+        모델·최대 토큰은 현재 노드 설정(LLM_NODE_MODELS 등)을 따르며, 모델을 명시하지 않은
+        호출은 지연 SLO를 넘기면 대체 모델로 헤지한다.
+        
         Args:
             messages: OpenAI 형식의 메시지 리스트
                 [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}]
-            model: 모델 이름 (기본값: 설정 파일)
+            model: 모델 이름 (기본값: 노드 설정 → 설정 파일)
             temperature: 온도 (기본값: 설정 파일)
-            max_tokens: 최대 토큰 (기본값: 설정 파일)
+            max_tokens: 최대 토큰 (기본값: 노드 설정 → 설정 파일)
             
         Returns:
             LLM 응답 텍스트
         """
-        response = self.client.chat.completions.create(
-            model=model or self.llm_model,
-            messages=messages,
-            temperature=temperature if temperature is not None else self.temperature,
-            max_tokens=max_tokens or self.max_tokens,
+        route = resolve_route(current_node(), model, max_tokens)
+        temperature = temperature if temperature is not None else self.temperature
+        return self._coalesced(
+            lambda: self.hedger.call(
+                route, lambda routed: self._chat(messages, routed, temperature, route.max_tokens)
+            ),
+            "chat", route.model, temperature, route.max_tokens, messages,
+        )
+    
+    def _chat(self, messages: List[dict], model: str, temperature: float, max_tokens: int) -> str:
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        response = self._request(
+            lambda: self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ),
+            prompt_tokens + max_tokens,
+            "chat",
+            model,
         )
         return response.choices[0].message.content
     
@@ -111,6 +254,96 @@ class OpenRouterClient:
             {"role": "user", "content": user_message},
         ]
         return self.chat(messages, model=model)
+    
+    def chat_stream(
+        self,
+        messages: List[dict],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """LLM 채팅 완성 스트리밍 - 응답 조각(delta)을 도착하는 대로 반환
+        
+        스트림은 호출자마다 따로 소비하므로 동일 요청 합치기는 적용하지 않는다.
+        모델 라우팅은 chat 과 같고, 헤지는 첫 토큰까지의 지연을 SLO 기준으로 한다.
+        """
+        route = resolve_route(current_node(), model, max_tokens)
+        temperature = temperature if temperature is not None else self.temperature
+        yield from self.hedger.stream(
+            route, lambda routed: self._chat_stream(messages, routed, temperature, route.max_tokens)
+        )
+    
+    def _open_stream(self, func: Callable[[], Any], estimated_tokens: int) -> Tuple[Any, Permit, ExitStack]:
+        """레이트 리밋 허가를 받아 스트림 연결 1회 시도
+        
+        연결에 성공하면 허가를 쥔 채 반환하고, 호출자가 스트림을 다 읽은 뒤 해제한다
+        (동시성 슬롯이 응답 생성 내내 유지되도록).
+        """
+        held = ExitStack()
+        permit = held.enter_context(self.limiter.permit(estimated_tokens))
+        try:
+            return func(), permit, held
+        except Exception as e:
+            if is_rate_limited(e):
+                permit.throttle(retry_after_seconds(e))
+            held.close()
+            raise
+    
+    def _chat_stream(self, messages: List[dict], model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """스트림 1개 - 재시도는 연결 수립까지만, 허가는 스트림을 다 읽을 때까지 유지"""
+        estimated_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages) + max_tokens
+        
+        start = time.perf_counter()
+        usage = None
+        status = "error"
+        try:
+            stream, permit, held = self._retrying()(
+                self._open_stream,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+                estimated_tokens,
+            )
+            with held:
+                try:
+                    for chunk in stream:
+                        if getattr(chunk, "usage", None):
+                            usage = chunk.usage
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                    status = "ok"
+                except Exception as e:
+                    if is_rate_limited(e):
+                        permit.throttle(retry_after_seconds(e))
+                    raise
+                finally:
+                    # 소비 중단(헤지에서 진 스트림 등) 시 연결을 닫아 생성 중단
+                    if hasattr(stream, "close"):
+                        stream.close()
+                    permit.record_usage(getattr(usage, "total_tokens", None))
+        finally:
+            record_usage(
+                "chat", model, (time.perf_counter() - start) * 1000,
+                SimpleNamespace(usage=usage), status=status,
+            )
+    
+    def chat_with_system_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        model: Optional[str] = None,
+    ) -> Iterator[str]:
+        """시스템 프롬프트와 사용자 메시지로 스트리밍 호출"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message},
+        ]
+        return self.chat_stream(messages, model=model)
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,277 @@
+"""OpenRouter 호출 레이트 리밋 / 동시성 제어 / 재시도 정책
+
+- TokenBucket: 분당 요청 수(RPM), 분당 토큰 수(TPM) 제한. 요청 전 추정 토큰을 차감하고
+  응답의 실제 사용량으로 보정한다.
+- AIMDLimiter: 동시 요청 수 상한을 성공 시 가산 증가, 429 시 승산 감소 (TCP 혼잡 제어 방식).
+- 재시도는 재시도 가능한 오류(429, 408, 5xx, 연결/타임아웃)만 수행하며
+  Retry-After 헤더가 있으면 그 시간을 따른다. 429 시에는 모든 요청을 일시 정지해
+  다른 스레드의 요청도 함께 물러나게 한다 (재시도 증폭 방지).
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimitTimeout(RuntimeError):
+    """레이트 리밋 대기 시간 초과"""
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """요청 토큰 수 대략 추정 (한글 비중을 고려해 3자 = 1토큰, 실제 사용량으로 사후 보정)"""
+    return max(1, len(text) // 3)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return _status_code(exc) == 429
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """재시도 가능한 오류 여부 (4xx 요청 오류·인증 오류는 재시도하지 않음)"""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    try:
+        import openai
+    except ImportError:
+        return False
+    # 연결 실패/타임아웃 (응답 없음)
+    return isinstance(exc, openai.APIConnectionError)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Retry-After / retry-after-ms 헤더 (초 또는 HTTP-date)"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int, exc: BaseException, base: float = 1.0, max_wait: float = 30.0) -> float:
+    """재시도 대기 시간 (Retry-After 우선, 없으면 full-jitter 지수 백오프)"""
+    retry_after = retry_after_seconds(exc)
+    if retry_after is not None:
+        return min(retry_after, max_wait)
+    return random.uniform(0, min(max_wait, base * (2 ** (attempt - 1))))
+
+
+class TokenBucket:
+    """분당 용량 토큰 버킷 (스레드 안전, 블로킹 획득)"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, amount: float, timeout: Optional[float] = None) -> float:
+        """amount 만큼 차감 (부족하면 대기). 반환: 대기 시간(초)
+        
+        용량보다 큰 요청은 용량만큼만 기다린 뒤 음수 잔량으로 통과시킨다 (영구 대기 방지).
+        """
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return now - start
+                
+                wait = (amount - self._tokens) / self.rate
+                if deadline is not None:
+                    if now + wait > deadline:
+                        raise RateLimitTimeout(f"Rate limit wait exceeds {timeout}s")
+                self._cond.wait(wait)
+    
+    def adjust(self, delta: float) -> None:
+        """사후 보정 (양수 = 추가 차감, 음수 = 환급)"""
+        if not self.enabled:
+            return
+        with self._cond:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - delta)
+            self._cond.notify_all()
+    
+    def available(self) -> float:
+        with self._cond:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class AIMDLimiter:
+    """가산 증가 / 승산 감소 동시성 상한"""
+    
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """슬롯 획득 (상한 도달 시 대기). 반환: 대기 시간(초)"""
+        start = time.monotonic()
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    raise RateLimitTimeout(f"Concurrency wait exceeds {timeout}s")
+                self._cond.wait(remaining)
+            self.in_flight += 1
+        return time.monotonic() - start
+    
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+            else:
+                # 상한 1회분 성공마다 +1 (RTT당 가산 증가)
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """RPM/TPM 버킷 + AIMD 동시성 제어 조합"""
+    
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        acquire_timeout: Optional[float] = None,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AIMDLimiter(max_concurrency, min_concurrency, max_concurrency)
+        self.acquire_timeout = acquire_timeout
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+    
+    @contextmanager
+    def permit(self, estimated_tokens: int) -> Iterator["Permit"]:
+        """요청 1건 허가 (429 정지 대기 + 버킷 차감 + 동시성 슬롯)"""
+        waited = self._wait_pause()
+        waited += self.requests.acquire(1, self.acquire_timeout)
+        waited += self.tokens.acquire(estimated_tokens, self.acquire_timeout)
+        waited += self.concurrency.acquire(self.acquire_timeout)
+        with self._lock:
+            self.wait_seconds += waited
+        
+        permit = Permit(self, estimated_tokens)
+        try:
+            yield permit
+        finally:
+            self.concurrency.release(throttled=permit.was_throttled)
+    
+    def _wait_pause(self) -> float:
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause <= 0:
+            return 0.0
+        if self.acquire_timeout is not None and pause > self.acquire_timeout:
+            raise RateLimitTimeout(f"Upstream throttling pause exceeds {self.acquire_timeout}s")
+        time.sleep(pause)
+        return pause
+    
+    def pause(self, seconds: float) -> None:
+        """429 수신 시 모든 요청 일시 정지"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "concurrency_limit": int(self.concurrency.limit),
+                "in_flight": self.concurrency.in_flight,
+                "rpm_available": self.requests.available() if self.requests.enabled else None,
+                "tpm_available": self.tokens.available() if self.tokens.enabled else None,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+class Permit:
+    """허가된 요청의 결과 기록"""
+    
+    def __init__(self, limiter: RateLimiter, estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.was_throttled = False
+    
+    def record_usage(self, actual_tokens: Optional[int]) -> None:
+        """응답의 실제 토큰 사용량으로 TPM 버킷 보정"""
+        if actual_tokens is not None:
+            self.limiter.tokens.adjust(actual_tokens - self.estimated_tokens)
+    
+    def throttle(self, retry_after: Optional[float]) -> None:
+        """429 수신: 동시성 상한 감소 + Retry-After 동안 요청 버킷 정지"""
+        self.was_throttled = True
+        with self.limiter._lock:
+            self.limiter.throttled += 1
+        if retry_after:
+            self.limiter.pause(retry_after)
+        logger.warning(f"[rate_limit] Upstream throttled (retry_after={retry_after})")
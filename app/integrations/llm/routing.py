@@ -0,0 +1,292 @@
+"""노드별 모델 라우팅 / 지연 SLO / 헤지(hedged) 요청
+
+- resolve_route: LLM_NODE_MODELS / LLM_NODE_MAX_TOKENS / LLM_NODE_HEDGE_MODELS 에서 노드 설정을 찾는다.
+  키는 노드 경로('MIXED/ANALYZE_COMPLIANCE')가 우선이고, 없으면 노드 이름('ANALYZE_COMPLIANCE').
+- LatencyTracker: (호출 유형, 노드, 모델)별 최근 지연 분포. SLO는 노드별 고정값(LLM_NODE_SLO_MS)
+  또는 최근 p95이며, 표본이 부족하면 기본값을 쓴다. 스트리밍 호출은 첫 토큰까지의 지연이 기준이다.
+- Hedger: 기본 모델이 SLO 안에 응답하지 않으면 대체 모델로 같은 요청을 보내 먼저 온 응답을 쓴다.
+  스트리밍은 먼저 첫 토큰을 보낸 쪽을 채택하고 다른 쪽 스트림은 닫는다. 일반 호출의 진 쪽 요청은
+  취소할 수 없어 끝까지 실행되며 사용량도 기록된다.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Literal, Optional, Tuple, TypeVar
+
+from app.core.config import get_settings
+from app.core.run_context import find_run_memo, get_run_id
+from app.integrations.llm.usage import HEDGE_RECORDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LatencyKind = Literal["chat", "ttft"]
+
+
+def _lookup(mapping: Dict[str, Any], node: Optional[str]) -> Any:
+    """노드 경로 → 노드 이름 순으로 설정 조회 (대소문자 무시)"""
+    if not node or not mapping:
+        return None
+    normalized = {key.upper(): value for key, value in mapping.items()}
+    node = node.upper()
+    if node in normalized:
+        return normalized[node]
+    return normalized.get(node.rsplit("/", 1)[-1])
+
+
+@dataclass
+class ModelRoute:
+    """호출 1건의 모델 선택"""
+    node: Optional[str]
+    model: str
+    max_tokens: int
+    hedge_model: Optional[str] = None
+    slo_ms: Optional[float] = None  # 노드별 고정 SLO (None이면 p95)
+
+
+def resolve_route(
+    node: Optional[str],
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> ModelRoute:
+    """노드 설정으로 모델/최대 토큰/헤지 모델 결정 (명시 인자가 우선, 모델을 명시하면 헤지 안 함)"""
+    settings = get_settings()
+    hedge_model = None
+    if model is None:
+        hedge_model = _lookup(settings.LLM_NODE_HEDGE_MODELS, node) or settings.LLM_HEDGE_MODEL or None
+    model = model or _lookup(settings.LLM_NODE_MODELS, node) or settings.LLM_MODEL
+    return ModelRoute(
+        node=node,
+        model=model,
+        max_tokens=max_tokens or _lookup(settings.LLM_NODE_MAX_TOKENS, node) or settings.LLM_MAX_TOKENS,
+        hedge_model=hedge_model if hedge_model != model else None,
+        slo_ms=_lookup(settings.LLM_NODE_SLO_MS, node),
+    )
+
+
+class LatencyTracker:
+    """(호출 유형, 노드, 모델)별 최근 지연 분포"""
+    
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, kind: LatencyKind, node: Optional[str], model: str, latency_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault((kind, node or "", model), deque(maxlen=self.window))
+            samples.append(latency_ms)
+    
+    def percentile(self, kind: LatencyKind, node: Optional[str], model: str, pct: float) -> Tuple[Optional[float], int]:
+        """(백분위 지연, 표본 수)"""
+        with self._lock:
+            samples = sorted(self._samples.get((kind, node or "", model), ()))
+        if not samples:
+            return None, 0
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index], len(samples)
+    
+    def snapshot(self, pct: float) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            keys = list(self._samples)
+        result = {}
+        for kind, node, model in keys:
+            value, count = self.percentile(kind, node, model, pct)
+            result[f"{kind}:{node or '(outside graph)'}:{model}"] = {
+                f"p{pct:g}_ms": round(value, 1), "samples": count,
+            }
+        return result
+
+
+class Hedger:
+    """SLO 초과 시 대체 모델로 헤지 요청"""
+    
+    def __init__(self, max_workers: int):
+        settings = get_settings()
+        self.percentile = settings.LLM_HEDGE_PERCENTILE
+        self.min_samples = settings.LLM_HEDGE_MIN_SAMPLES
+        self.default_slo_ms: Dict[LatencyKind, float] = {
+            "chat": settings.LLM_HEDGE_DEFAULT_SLO_MS,
+            "ttft": settings.LLM_HEDGE_DEFAULT_TTFT_MS,
+        }
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+        self._by_node: Dict[str, Dict[str, int]] = {}
+    
+    def slo_ms(self, route: ModelRoute, kind: LatencyKind) -> float:
+        """헤지 시작 지연 (노드 고정 SLO > 최근 p95 > 기본값)"""
+        if route.slo_ms is not None:
+            return route.slo_ms
+        value, count = self.latency.percentile(kind, route.node, route.model, self.percentile)
+        if value is None or count < self.min_samples:
+            return self.default_slo_ms[kind]
+        return value
+    
+    def _finish(self, route: ModelRoute, winner: str, started: float, hedged: bool, slo_ms: Optional[float]) -> None:
+        """노드별 모델 선택·헤지 결과 기록"""
+        outcome = "hedge_won" if winner != route.model else ("primary_won" if hedged else "primary")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        node = route.node or "(outside graph)"
+        with self._lock:
+            counters = self._by_node.setdefault(node, {"calls": 0, "hedged": 0, "primary_won": 0, "hedge_won": 0})
+            counters["calls"] += 1
+            counters["hedged"] += hedged
+            if hedged:
+                counters[outcome] += 1
+        
+        if hedged:
+            logger.warning(
+                f"[routing] node={node} model={route.model} exceeded SLO {slo_ms:.0f}ms; "
+                f"hedged to {route.hedge_model}, {outcome} with {winner} ({elapsed_ms:.0f}ms)"
+            )
+            memo = find_run_memo(get_run_id()) if route.node else None
+            if memo is not None:
+                memo.append(HEDGE_RECORDS, {
+                    "node": route.node, "primary": route.model, "hedge": route.hedge_model,
+                    "winner": winner, "slo_ms": round(slo_ms, 1), "latency_ms": round(elapsed_ms, 1),
+                })
+        else:
+            logger.info(f"[routing] node={node} model={winner} ({elapsed_ms:.0f}ms)")
+    
+    def _submit(self, route: ModelRoute, func: Callable[[str], T], model: str) -> "Future[T]":
+        context = contextvars.copy_context()
+        
+        def run() -> T:
+            start = time.perf_counter()
+            result = context.run(func, model)
+            self.latency.record("chat", route.node, model, (time.perf_counter() - start) * 1000)
+            return result
+        return self._executor.submit(run)
+    
+    def call(self, route: ModelRoute, func: Callable[[str], T]) -> T:
+        """func(model) 실행 - 기본 모델이 SLO 안에 끝나지 않으면 대체 모델로 헤지"""
+        started = time.perf_counter()
+        if not route.hedge_model:
+            result = func(route.model)
+            self.latency.record("chat", route.node, route.model, (time.perf_counter() - started) * 1000)
+            self._finish(route, route.model, started, hedged=False, slo_ms=None)
+            return result
+        
+        slo_ms = self.slo_ms(route, "chat")
+        primary = self._submit(route, func, route.model)
+        done, _ = wait([primary], timeout=slo_ms / 1000)
+        if done:
+            result = primary.result()
+            self._finish(route, route.model, started, hedged=False, slo_ms=slo_ms)
+            return result
+        
+        pending = {primary: route.model, self._submit(route, func, route.hedge_model): route.hedge_model}
+        error: Optional[BaseException] = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = pending.pop(future)
+                if future.exception() is None:
+                    self._finish(route, model, started, hedged=True, slo_ms=slo_ms)
+                    return future.result()
+                error = future.exception()
+        raise error
+    
+    def _produce(
+        self,
+        route: ModelRoute,
+        open_stream: Callable[[str], Iterator[str]],
+        model: str,
+        events: "queue.Queue",
+        cancel: threading.Event,
+        started: float,
+    ) -> None:
+        """스트림 하나를 읽어 (모델, 종류, 값)을 큐에 넣음 (cancel 시 스트림 닫기)"""
+        stream = open_stream(model)
+        first = True
+        try:
+            for delta in stream:
+                if cancel.is_set():
+                    break
+                if first:
+                    self.latency.record("ttft", route.node, model, (time.perf_counter() - started) * 1000)
+                    first = False
+                events.put((model, "delta", delta))
+            events.put((model, "end", None))
+        except Exception as e:
+            events.put((model, "error", e))
+        finally:
+            stream.close()
+    
+    def stream(self, route: ModelRoute, open_stream: Callable[[str], Iterator[str]]) -> Iterator[str]:
+        """스트리밍 헤지 - 기본 모델의 첫 토큰이 SLO 안에 오지 않으면 대체 모델 스트림도 시작"""
+        started = time.perf_counter()
+        if not route.hedge_model:
+            first = True
+            for delta in open_stream(route.model):
+                if first:
+                    self.latency.record("ttft", route.node, route.model, (time.perf_counter() - started) * 1000)
+                    first = False
+                yield delta
+            self._finish(route, route.model, started, hedged=False, slo_ms=None)
+            return
+        
+        slo_ms = self.slo_ms(route, "ttft")
+        events: queue.Queue = queue.Queue()
+        cancels: Dict[str, threading.Event] = {}
+        
+        def start(model: str) -> None:
+            cancels[model] = threading.Event()
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run,
+                args=(self._produce, route, open_stream, model, events, cancels[model], time.perf_counter()),
+                name=f"llm-stream-{model}",
+                daemon=True,
+            ).start()
+        
+        start(route.model)
+        winner: Optional[str] = None
+        errors: Dict[str, BaseException] = {}
+        try:
+            # 첫 응답(토큰/종료)을 먼저 보낸 모델을 채택
+            while winner is None:
+                try:
+                    model, kind, value = events.get(timeout=None if len(cancels) > 1 else slo_ms / 1000)
+                except queue.Empty:
+                    start(route.hedge_model)
+                    continue
+                if kind == "error":
+                    errors[model] = value
+                    if len(errors) == len(cancels):
+                        raise value
+                    continue
+                winner = model
+                for other, cancel in cancels.items():
+                    if other != winner:
+                        cancel.set()
+                if kind == "end":
+                    break
+                yield value
+            
+            while kind != "end":
+                model, kind, value = events.get()
+                if model != winner:
+                    continue
+                if kind == "error":
+                    raise value
+                if kind == "delta":
+                    yield value
+            self._finish(route, winner, started, hedged=len(cancels) > 1, slo_ms=slo_ms)
+        finally:
+            for cancel in cancels.values():
+                cancel.set()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_node = {node: dict(counters) for node, counters in self._by_node.items()}
+        return {"by_node": by_node, "latency": self.latency.snapshot(self.percentile)}
@@ -0,0 +1,109 @@
+"""동일 요청 합치기 (single-flight)
+
+같은 키의 호출이 진행 중이면 후속 호출은 새 업스트림 요청을 보내지 않고
+선행 호출(leader)의 결과를 기다려 공유한다. 여러 사용자가 같은 장애를 동시에
+조회할 때 반복되는 임베딩/채팅 요청을 1회로 줄인다.
+
+- 선행 호출이 예외로 끝나면 대기 중인 호출도 같은 예외를 받는다.
+- 대기 시간이 키별 timeout을 넘으면 대기를 포기하고 직접 호출한다.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def make_key(*parts: Any) -> str:
+    """요청 인자로 합치기 키 생성 (JSON 직렬화 후 sha256)"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """진행 중인 호출"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """스레드 안전 single-flight 그룹"""
+    
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        """
+        Args:
+            name: 로깅/지표용 이름
+            timeout: 후속 호출의 최대 대기 시간(초, None이면 무제한)
+        """
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.shared_calls = 0
+        self.timeouts = 0
+    
+    def do(self, key: str, func: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """key 기준으로 func 실행을 합쳐 결과 반환
+        
+        Args:
+            timeout: 이 호출의 대기 시간 (None이면 그룹 기본값)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.upstream_calls += 1
+            else:
+                call.waiters += 1
+        
+        if leader:
+            try:
+                call.result = func()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+        
+        wait = self.timeout if timeout is None else timeout
+        if not call.done.wait(wait):
+            # 선행 호출이 오래 걸리면 직접 호출 (합치기보다 지연 상한 우선)
+            with self._lock:
+                self.timeouts += 1
+                self.upstream_calls += 1
+            logger.warning(f"[singleflight] {self.name}: waited {wait}s for in-flight call, calling directly")
+            return func()
+        
+        with self._lock:
+            self.shared_calls += 1
+        if call.error is not None:
+            raise call.error
+        # 공유 결과를 호출 측이 변경해도 다른 호출에 영향이 없도록 얕은 복사
+        return copy.copy(call.result)
+    
+    def stats(self) -> Dict[str, Any]:
+        """절감 지표 (shared_calls = 업스트림 요청 없이 공유된 호출 수)"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "upstream_calls": self.upstream_calls,
+                "shared_calls": self.shared_calls,
+                "timeouts": self.timeouts,
+            }
@@ -0,0 +1,192 @@
+"""LLM/임베딩 호출 사용량 기록 - 토큰, 지연, 추정 비용
+
+모든 업스트림 호출을 모델·토큰·지연·비용과 함께 기록하고,
+현재 run_id와 LangGraph 노드(서브그래프 경로 포함, 예: MIXED/ANALYZE_COMPLIANCE)에 귀속시킨다.
+- run 단위 기록은 run 메모에 쌓여 감사 요약(AuditSummary.usage)으로 집계된다.
+- 프로세스 누적 지표는 모델/노드별로 집계되어 /health/llm 에 노출된다.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.core.logging import log_llm_call
+from app.core.run_context import find_run_memo, get_run_id, get_run_memo
+
+logger = logging.getLogger(__name__)
+
+USAGE_RECORDS = "llm_usage"
+HEDGE_RECORDS = "llm_hedges"  # routing.Hedger 가 헤지 발생 시 기록
+
+CallKind = Literal["chat", "embedding"]
+
+
+class UsageRecord(BaseModel):
+    """업스트림 호출 1건"""
+    kind: CallKind
+    model: str
+    node: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    cost_usd: float = 0.0
+    status: Literal["ok", "error"] = "ok"
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def current_node() -> Optional[str]:
+    """실행 중인 LangGraph 노드 경로 (그래프 밖이면 None)
+    
+    checkpoint_ns 'MIXED:<id>|1|ANALYZE_COMPLIANCE:<id>' → 'MIXED/ANALYZE_COMPLIANCE'
+    """
+    # 그래프가 로드되지 않았다면 노드 안일 수 없음 (langgraph import 비용 회피)
+    if "langgraph.config" not in sys.modules:
+        return None
+    from langgraph.config import get_config
+    
+    try:
+        metadata = get_config().get("metadata", {})
+    except RuntimeError:
+        return None
+    
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    parts = [part.split(":", 1)[0] for part in namespace.split("|") if ":" in part]
+    return "/".join(parts) or metadata.get("langgraph_node")
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """모델 단가(LLM_PRICING, USD / 1M 토큰)로 비용 추정 (단가 미등록 모델은 0)"""
+    price = get_settings().LLM_PRICING.get(model)
+    if not price:
+        return 0.0
+    return (
+        prompt_tokens * price.get("prompt", 0.0)
+        + completion_tokens * price.get("completion", 0.0)
+    ) / 1_000_000
+
+
+class UsageMetrics:
+    """프로세스 누적 사용량 (모델별/노드별)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_model: Dict[str, Dict[str, float]] = {}
+        self._by_node: Dict[str, Dict[str, float]] = {}
+    
+    @staticmethod
+    def _add(bucket: Dict[str, Dict[str, float]], key: str, record: UsageRecord) -> None:
+        totals = bucket.setdefault(key, {
+            "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_ms": 0.0, "cost_usd": 0.0,
+        })
+        totals["calls"] += 1
+        totals["errors"] += record.status == "error"
+        totals["prompt_tokens"] += record.prompt_tokens
+        totals["completion_tokens"] += record.completion_tokens
+        totals["latency_ms"] += record.latency_ms
+        totals["cost_usd"] += record.cost_usd
+    
+    def add(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._add(self._by_model, record.model, record)
+            self._add(self._by_node, record.node or "(outside graph)", record)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "by_model": {k: dict(v) for k, v in self._by_model.items()},
+                "by_node": {k: dict(v) for k, v in self._by_node.items()},
+            }
+
+
+_metrics = UsageMetrics()
+
+
+def get_usage_metrics() -> UsageMetrics:
+    return _metrics
+
+
+def record_usage(
+    kind: CallKind,
+    model: str,
+    latency_ms: float,
+    response: Any = None,
+    status: Literal["ok", "error"] = "ok",
+) -> UsageRecord:
+    """업스트림 호출 기록 (response.usage 에서 토큰 추출)"""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    
+    record = UsageRecord(
+        kind=kind,
+        model=model,
+        node=current_node(),
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency_ms=latency_ms,
+        cost_usd=estimate_cost(model, prompt_tokens, completion_tokens),
+        status=status,
+    )
+    _metrics.add(record)
+    
+    run_id = get_run_id()
+    # run 단위 기록은 그래프 실행 중일 때만 (run 종료 후 끝난 추측 검색 등은 해제된 메모를 다시 만들지 않음)
+    memo = find_run_memo(run_id) if record.node is not None else None
+    if memo is not None:
+        memo.append(USAGE_RECORDS, record)
+    
+    log_llm_call(
+        logger, run_id or "unknown", model, record.node or kind, latency_ms,
+        tokens={"prompt": prompt_tokens, "completion": completion_tokens, "cost_usd": record.cost_usd},
+    )
+    return record
+
+
+def snapshot_run_usage(run_id: str) -> Dict[str, list]:
+    """run 메모의 사용량 기록 (승인 대기로 중단될 때 체크포인트 trace에 보존)"""
+    memo = get_run_memo(run_id)
+    return {
+        "records": [r.model_dump() for r in memo.items(USAGE_RECORDS)],
+        "hedges": memo.items(HEDGE_RECORDS),
+    }
+
+
+def summarize_run_usage(run_id: str, carried: Optional[Dict[str, list]] = None) -> Dict[str, Any]:
+    """run 사용량 요약 (감사 요약용)
+    
+    Args:
+        carried: 승인 대기 중단 전 snapshot_run_usage() 결과 (재개 후 기록과 합산)
+    """
+    carried = carried or {}
+    memo = get_run_memo(run_id)
+    records: List[UsageRecord] = [UsageRecord(**r) for r in carried.get("records", [])] + memo.items(USAGE_RECORDS)
+    summary: Dict[str, Any] = {
+        "calls": len(records),
+        "prompt_tokens": sum(r.prompt_tokens for r in records),
+        "completion_tokens": sum(r.completion_tokens for r in records),
+        "latency_ms": round(sum(r.latency_ms for r in records), 2),
+        "cost_usd": round(sum(r.cost_usd for r in records), 8),
+        "by_node": {},
+        "hedges": list(carried.get("hedges", [])) + memo.items(HEDGE_RECORDS),
+    }
+    for r in records:
+        node = summary["by_node"].setdefault(r.node, {
+            "calls": 0, "models": [], "prompt_tokens": 0, "completion_tokens": 0, "latency_ms": 0.0, "cost_usd": 0.0,
+        })
+        node["calls"] += 1
+        if r.model not in node["models"]:
+            node["models"].append(r.model)
+        node["prompt_tokens"] += r.prompt_tokens
+        node["completion_tokens"] += r.completion_tokens
+        node["latency_ms"] = round(node["latency_ms"] + r.latency_ms, 2)
+        node["cost_usd"] = round(node["cost_usd"] + r.cost_usd, 8)
+    return summary
@@ -5,15 +5,19 @@ from __future__ import annotations
 import io
 import logging
 from pathlib import Path
-from typing import List, Optional
-
-import pdfplumber
+from typing import List, Optional, Union
 
 from app.integrations.parsers.text_parser import chunk_text
 
 logger = logging.getLogger(__name__)
 
 
+def _open_pdf(source: Union[Path, io.BytesIO]):
+    """pdfplumber는 무거우므로 실제 파싱 시점에 import (API 시작 시간 단축)"""
+    import pdfplumber
+    return pdfplumber.open(source)
+
+
 def parse_pdf_file(file_path: Path) -> str:
     """PDF 파일에서 텍스트 추출
     
@@ -24,7 +28,7 @@ def parse_pdf_file(file_path: Path) -> str:
         추출된 텍스트
     """
     try:
-        with pdfplumber.open(file_path) as pdf:
+        with _open_pdf(file_path) as pdf:
             texts = []
             for i, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
@@ -51,7 +55,7 @@ def parse_pdf_bytes(content: bytes, filename: str = "unknown.pdf") -> str:
         추출된 텍스트
     """
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
+        with _open_pdf(io.BytesIO(content)) as pdf:
             texts = []
             for i, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
@@ -76,7 +80,7 @@ def extract_pdf_metadata(file_path: Path) -> dict:
         메타데이터 딕셔너리
     """
     try:
-        with pdfplumber.open(file_path) as pdf:
+        with _open_pdf(file_path) as pdf:
             metadata = pdf.metadata or {}
             return {
                 "title": metadata.get("Title", ""),
@@ -94,7 +98,7 @@ def extract_pdf_metadata(file_path: Path) -> dict:
 def extract_pdf_metadata_bytes(content: bytes) -> dict:
     """PDF 바이트에서 메타데이터 추출"""
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
+        with _open_pdf(io.BytesIO(content)) as pdf:
             metadata = pdf.metadata or {}
             return {
                 "title": metadata.get("Title", ""),
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import logging
+import mmap
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Union
 
 from app.core.config import get_settings
 
@@ -14,32 +16,26 @@ logger = logging.getLogger(__name__)
 def parse_text_file(file_path: Path) -> str:
     """텍스트 파일에서 내용 추출
     
+    파일을 mmap으로 열어 바이트 사본 없이 디코딩한다 (업로드 스풀 파일 포함).
+    
     Args:
         file_path: 파일 경로
         
     Returns:
         추출된 텍스트
     """
-    encodings = ["utf-8", "cp949", "euc-kr", "latin-1"]
-    
-    for encoding in encodings:
-        try:
-            content = file_path.read_text(encoding=encoding)
-            logger.debug(f"[text_parser] Parsed {file_path.name} with {encoding}")
-            return content
-        except UnicodeDecodeError:
-            continue
-    
-    # 모든 인코딩 실패 시 바이너리로 읽어서 최대한 복구
-    logger.warning(f"[text_parser] Fallback to binary read for {file_path.name}")
-    return file_path.read_bytes().decode("utf-8", errors="replace")
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_text_bytes(mapped, file_path.name)
 
 
-def parse_text_bytes(content: bytes, filename: str = "unknown") -> str:
+def parse_text_bytes(content: Union[bytes, memoryview, mmap.mmap], filename: str = "unknown") -> str:
     """바이트 데이터에서 텍스트 추출
     
     Args:
-        content: 파일 바이트 내용
+        content: 파일 바이트 내용 (bytes-like, mmap 포함)
         filename: 파일명 (로깅용)
         
     Returns:
@@ -49,14 +45,14 @@ def parse_text_bytes(content: bytes, filename: str = "unknown") -> str:
     
     for encoding in encodings:
         try:
-            text = content.decode(encoding)
+            text = str(content, encoding)
             logger.debug(f"[text_parser] Parsed {filename} with {encoding}")
             return text
         except UnicodeDecodeError:
             continue
     
     logger.warning(f"[text_parser] Fallback decode for {filename}")
-    return content.decode("utf-8", errors="replace")
+    return str(content, "utf-8", errors="replace")
 
 
 def chunk_text(text: str, chunk_size: int = None, overlap: int = None) -> List[str]:
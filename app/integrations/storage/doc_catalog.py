@@ -0,0 +1,351 @@
+"""문서 카탈로그 - SQLite 기반 문서 메타데이터 저장소
+
+{store}_docs.json 을 호출마다 전체 파싱/재작성하던 방식을 대체한다.
+
+- 문서 단위 INSERT/DELETE 트랜잭션 (동시 적재 시 갱신 유실 없음)
+- 저장소별 통계 카운터(document_count, chunk_count, generation)를 같은 트랜잭션에서 갱신 → O(1) 통계
+- WAL 모드로 여러 프로세스가 같은 DB를 공유, PRAGMA data_version 으로 타 프로세스 변경 감지 후 캐시 무효화
+- seq 기반 커서 페이지네이션
+- 기존 {store}_docs.json 은 최초 접근 시 한 번 가져온 뒤 .migrated 로 이름 변경
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    store_type TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    tags TEXT NOT NULL DEFAULT '[]',
+    version TEXT,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (store_type, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_store_seq ON documents (store_type, seq);
+CREATE TABLE IF NOT EXISTS store_stats (
+    store_type TEXT PRIMARY KEY,
+    document_count INTEGER NOT NULL DEFAULT 0,
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_COLUMNS = "seq, doc_id, filename, store_type, status, chunk_count, tags, version, created_at, metadata"
+
+
+def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+    """DB 행 → 문서 레코드 ({store}_docs.json 항목과 같은 형태)"""
+    return {
+        "doc_id": row["doc_id"],
+        "filename": row["filename"],
+        "store_type": row["store_type"],
+        "status": row["status"],
+        "chunk_count": row["chunk_count"],
+        "tags": json.loads(row["tags"]),
+        "version": row["version"],
+        "created_at": row["created_at"],
+        "metadata": json.loads(row["metadata"]),
+    }
+
+
+class DocumentCatalog:
+    """저장소별 문서 메타데이터 카탈로그"""
+    
+    def __init__(self, db_path: Path, legacy_dir: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite 파일 경로 (프로세스 간 공유)
+            legacy_dir: 기존 {store}_docs.json 위치 (최초 접근 시 마이그레이션)
+        """
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 연결 1개를 락으로 직렬화 (쓰기는 SQLite가 어차피 직렬화)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(db_path),
+            timeout=30,
+            isolation_level=None,  # 트랜잭션은 _transaction()에서 명시적으로
+            check_same_thread=False,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        
+        # 캐시 (타 프로세스 커밋 시 data_version 변경으로 무효화)
+        self._data_version = self._read_data_version()
+        self._stats_cache: Dict[str, Dict[str, int]] = {}
+        self._doc_cache: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        self._checked_legacy: set = set()
+        
+        logger.info(f"[catalog] Opened document catalog: {db_path}")
+    
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _invalidate(self) -> None:
+        self._stats_cache.clear()
+        self._doc_cache.clear()
+    
+    def _sync(self, store_type: str) -> None:
+        """타 프로세스 변경 감지 및 레거시 JSON 마이그레이션 (락 보유 상태에서 호출)"""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._invalidate()
+        
+        if store_type not in self._checked_legacy:
+            self._checked_legacy.add(store_type)
+            self._migrate_legacy_json(store_type)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE로 쓰기 락을 먼저 획득)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                # 자신의 커밋은 data_version을 바꾸지 않으므로 직접 무효화
+                self._invalidate()
+    
+    @staticmethod
+    def _bump_stats(conn: sqlite3.Connection, store_type: str, documents: int, chunks: int) -> None:
+        conn.execute(
+            """
+            INSERT INTO store_stats (store_type, document_count, chunk_count, generation)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (store_type) DO UPDATE SET
+                document_count = document_count + excluded.document_count,
+                chunk_count = chunk_count + excluded.chunk_count,
+                generation = generation + 1
+            """,
+            (store_type, documents, chunks),
+        )
+    
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, store_type: str, record: Dict[str, Any]) -> None:
+        conn.execute(
+            """
+            INSERT INTO documents
+                (store_type, doc_id, filename, status, chunk_count, tags, version, created_at, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                store_type,
+                record["doc_id"],
+                record.get("filename", ""),
+                record.get("status", "completed"),
+                int(record.get("chunk_count", 0)),
+                json.dumps(record.get("tags") or [], ensure_ascii=False),
+                record.get("version"),
+                str(record.get("created_at", "")),
+                json.dumps(record.get("metadata") or {}, ensure_ascii=False, default=str),
+            ),
+        )
+    
+    def _migrate_legacy_json(self, store_type: str) -> None:
+        """기존 {store}_docs.json 1회 가져오기"""
+        if self.legacy_dir is None:
+            return
+        path = self.legacy_dir / f"{store_type}_docs.json"
+        if not path.exists():
+            return
+        
+        docs = json.loads(path.read_text(encoding="utf-8"))
+        with self._transaction() as conn:
+            key = f"migrated:{store_type}"
+            if conn.execute("SELECT 1 FROM catalog_meta WHERE key = ?", (key,)).fetchone():
+                return  # 다른 프로세스가 이미 가져옴
+            self._replace_store_rows(conn, store_type, docs)
+            conn.execute("INSERT INTO catalog_meta (key, value) VALUES (?, ?)", (key, str(path)))
+        
+        try:
+            path.rename(path.with_name(path.name + ".migrated"))
+        except OSError as e:
+            logger.warning(f"[catalog] Could not rename legacy file {path}: {e}")
+        logger.info(f"[catalog] Migrated {len(docs)} documents from {path.name}")
+    
+    def _replace_store_rows(self, conn: sqlite3.Connection, store_type: str, docs: Dict[str, Dict[str, Any]]) -> None:
+        conn.execute("DELETE FROM documents WHERE store_type = ?", (store_type,))
+        for doc_id, record in docs.items():
+            self._insert(conn, store_type, {**record, "doc_id": record.get("doc_id", doc_id)})
+        conn.execute(
+            """
+            INSERT INTO store_stats (store_type, document_count, chunk_count, generation)
+            SELECT ?, COUNT(*), COALESCE(SUM(chunk_count), 0), 1 FROM documents WHERE store_type = ?
+            ON CONFLICT (store_type) DO UPDATE SET
+                document_count = excluded.document_count,
+                chunk_count = excluded.chunk_count,
+                generation = generation + 1
+            """,
+            (store_type, store_type),
+        )
+    
+    # ===== 쓰기 =====
+    
+    def add(self, store_type: str, record: Dict[str, Any]) -> None:
+        """문서 추가 (같은 doc_id가 있으면 교체)"""
+        with self._lock:
+            self._sync(store_type)
+            with self._transaction() as conn:
+                old = conn.execute(
+                    "SELECT chunk_count FROM documents WHERE store_type = ? AND doc_id = ?",
+                    (store_type, record["doc_id"]),
+                ).fetchone()
+                if old is not None:
+                    conn.execute(
+                        "DELETE FROM documents WHERE store_type = ? AND doc_id = ?",
+                        (store_type, record["doc_id"]),
+                    )
+                self._insert(conn, store_type, record)
+                self._bump_stats(
+                    conn,
+                    store_type,
+                    documents=0 if old is not None else 1,
+                    chunks=int(record.get("chunk_count", 0)) - (old["chunk_count"] if old is not None else 0),
+                )
+    
+    def delete(self, store_type: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """문서 삭제
+        
+        Returns:
+            삭제된 레코드 (없으면 None)
+        """
+        with self._lock:
+            self._sync(store_type)
+            with self._transaction() as conn:
+                row = conn.execute(
+                    f"SELECT {_COLUMNS} FROM documents WHERE store_type = ? AND doc_id = ?",
+                    (store_type, doc_id),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("DELETE FROM documents WHERE seq = ?", (row["seq"],))
+                self._bump_stats(conn, store_type, documents=-1, chunks=-row["chunk_count"])
+                return _row_to_record(row)
+    
+    def replace_store(self, store_type: str, docs: Dict[str, Dict[str, Any]]) -> None:
+        """저장소 문서 전체 교체 (스냅샷 복원용)"""
+        with self._lock:
+            self._checked_legacy.add(store_type)  # 복원 내용을 레거시 파일로 덮어쓰지 않도록
+            with self._transaction() as conn:
+                self._replace_store_rows(conn, store_type, docs)
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+                    (f"migrated:{store_type}", "snapshot"),
+                )
+    
+    # ===== 읽기 =====
+    
+    def get(self, store_type: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """문서 단건 조회"""
+        with self._lock:
+            self._sync(store_type)
+            key = (store_type, doc_id)
+            if key not in self._doc_cache:
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM documents WHERE store_type = ? AND doc_id = ?",
+                    (store_type, doc_id),
+                ).fetchone()
+                self._doc_cache[key] = _row_to_record(row) if row is not None else None
+            return self._doc_cache[key]
+    
+    def list_records(
+        self,
+        store_type: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """문서 목록 (적재 순서, 커서 페이지네이션)
+        
+        Args:
+            limit: 페이지 크기 (None이면 전체)
+            cursor: 이전 페이지의 next_cursor
+        
+        Returns:
+            (레코드 목록, 다음 페이지 커서 또는 None)
+        """
+        try:
+            after = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        
+        with self._lock:
+            self._sync(store_type)
+            query = f"SELECT {_COLUMNS} FROM documents WHERE store_type = ? AND seq > ? ORDER BY seq"
+            params: list = [store_type, after]
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit + 1)  # 다음 페이지 존재 여부 확인용 1건 추가
+            rows = self._conn.execute(query, params).fetchall()
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1]["seq"])
+        return [_row_to_record(row) for row in rows], next_cursor
+    
+    def stats(self, store_type: str) -> Dict[str, int]:
+        """저장소 통계 (document_count, chunk_count, generation)"""
+        with self._lock:
+            self._sync(store_type)
+            if store_type not in self._stats_cache:
+                row = self._conn.execute(
+                    "SELECT document_count, chunk_count, generation FROM store_stats WHERE store_type = ?",
+                    (store_type,),
+                ).fetchone()
+                self._stats_cache[store_type] = (
+                    dict(row) if row is not None
+                    else {"document_count": 0, "chunk_count": 0, "generation": 0}
+                )
+            return dict(self._stats_cache[store_type])
+    
+    def export_store(self, store_type: str) -> Dict[str, Dict[str, Any]]:
+        """저장소 문서 전체 ({store}_docs.json 형식, 스냅샷용)"""
+        records, _ = self.list_records(store_type)
+        return {record["doc_id"]: record for record in records}
+
+
+# 카탈로그 싱글톤
+_catalog: Optional[DocumentCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_doc_catalog() -> DocumentCatalog:
+    """DocumentCatalog 싱글톤"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                settings = get_settings()
+                _catalog = DocumentCatalog(
+                    db_path=settings.DOC_CATALOG_PATH or settings.KNOWLEDGE_STORE_DIR / "catalog.db",
+                    legacy_dir=settings.KNOWLEDGE_STORE_DIR / "metadata",
+                )
+    return _catalog
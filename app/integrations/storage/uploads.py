@@ -0,0 +1,97 @@
+"""업로드 파일 디스크 스풀링 - 청크 단위 복사, 증분 해시, 크기 상한
+
+UploadFile 전체를 메모리로 읽지 않고 임시 파일로 청크 단위 복사하면서
+sha256을 계산한다. 파서는 스풀된 파일 경로(또는 mmap)를 직접 읽으므로
+동시에 큰 파일이 여러 개 올라와도 워커 메모리는 청크 크기 수준으로 유지된다.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """업로드 파일이 크기 상한을 초과"""
+    
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"File too large: {filename} (limit {max_bytes} bytes)")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class SpooledUpload:
+    """디스크에 스풀된 업로드 파일"""
+    filename: str
+    path: Path
+    size: int
+    sha256: str
+    
+    def cleanup(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def sha256_file(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """파일 sha256 (청크 단위)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def spool_upload(
+    upload,
+    max_bytes: int,
+    spool_dir: Optional[Path] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """UploadFile을 임시 파일로 스풀링
+    
+    Args:
+        upload: FastAPI/Starlette UploadFile
+        max_bytes: 파일당 최대 크기 (0 = 제한 없음)
+        spool_dir: 임시 파일 디렉터리 (None이면 시스템 임시 디렉터리)
+    
+    Raises:
+        UploadTooLargeError: 크기 상한 초과 (임시 파일은 삭제됨)
+    """
+    filename = upload.filename or "unknown"
+    
+    # 멀티파트 파서가 알려준 크기로 먼저 거절 (복사 생략)
+    if max_bytes and upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(filename, max_bytes)
+    
+    if spool_dir is not None:
+        spool_dir.mkdir(parents=True, exist_ok=True)
+    suffix = Path(filename).suffix
+    fd, tmp_name = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=spool_dir)
+    path = Path(tmp_name)
+    
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                block = await upload.read(chunk_size)
+                if not block:
+                    break
+                size += len(block)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(filename, max_bytes)
+                digest.update(block)
+                f.write(block)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    
+    return SpooledUpload(filename=filename, path=path, size=size, sha256=digest.hexdigest())
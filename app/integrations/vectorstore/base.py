@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class VectorStoreBase(ABC):
@@ -37,13 +40,26 @@ class VectorStoreBase(ABC):
         Args:
             query_embedding: 쿼리 임베딩 벡터
             top_k: 반환할 결과 수
-            filter_metadata: 메타데이터 필터 (선택)
+            filter_metadata: 메타데이터 필터 (선택, 키별 AND 조건)
+                리스트 값은 '하나라도 포함' 조건 (예: {"tags": ["보안", "배포"]})
             
         Returns:
             (id, score, metadata) 튜플 리스트
         """
         pass
     
+    @abstractmethod
+    def get_vectors(self, ids: List[str]) -> "np.ndarray":
+        """저장된 벡터 조회 (MMR 등 재순위화용)
+        
+        Args:
+            ids: 조회할 ID 리스트
+            
+        Returns:
+            (len(ids), dimension) float32 배열 (정규화된 벡터)
+        """
+        pass
+    
     @abstractmethod
     def delete(self, ids: List[str]) -> None:
         """ID로 벡터 삭제
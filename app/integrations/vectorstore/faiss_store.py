@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -12,10 +13,19 @@ import numpy as np
 
 from app.core.config import get_settings
 from app.integrations.vectorstore.base import VectorStoreBase
+from app.integrations.vectorstore.projection import get_store_projection
 
 logger = logging.getLogger(__name__)
 
 
+def _matches(value: Any, expected: Any) -> bool:
+    """메타데이터 필터 조건 (리스트 조건은 '하나라도 포함', Milvus 구현과 동일)"""
+    if isinstance(expected, list):
+        values = value if isinstance(value, list) else [value]
+        return any(item in values for item in expected)
+    return value == expected
+
+
 class FAISSVectorStore(VectorStoreBase):
     """FAISS 벡터 저장소
     
@@ -27,11 +37,11 @@ class FAISSVectorStore(VectorStoreBase):
         """
         Args:
             store_type: 저장소 유형 (policy, incident, system)
-            dimension: 임베딩 차원
+            dimension: 임베딩 차원 (None이면 저장소별 축소 차원)
         """
         settings = get_settings()
         self.store_type = store_type
-        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.dimension = dimension or get_store_projection(store_type).dimension
         
         # 저장 경로
         self.base_dir = settings.FAISS_INDEX_DIR / store_type
@@ -58,6 +68,12 @@ class FAISSVectorStore(VectorStoreBase):
         self.metadatas = {}
         logger.info(f"[faiss] Initialized new index for '{self.store_type}' (dim={self.dimension})")
     
+    def reset(self, dimension: int = None) -> None:
+        """인덱스 비우기 (재투영 시 차원 변경)"""
+        if dimension:
+            self.dimension = dimension
+        self._init_index()
+    
     def _normalize(self, vectors: np.ndarray) -> np.ndarray:
         """L2 정규화 (코사인 유사도 계산용)"""
         norms = np.linalg.norm(vectors, axis=1, keepdims=True)
@@ -129,7 +145,7 @@ class FAISSVectorStore(VectorStoreBase):
             # 메타데이터 필터링
             if filter_metadata:
                 match = all(
-                    metadata.get(k) == v 
+                    _matches(metadata.get(k), v)
                     for k, v in filter_metadata.items()
                 )
                 if not match:
@@ -142,6 +158,14 @@ class FAISSVectorStore(VectorStoreBase):
         
         return results
     
+    def get_vectors(self, ids: List[str]) -> np.ndarray:
+        """저장된 벡터 조회 (add 시 정규화된 상태 그대로 반환)"""
+        if self.index is None or not ids:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        indices = np.array([self.id_to_idx[doc_id] for doc_id in ids], dtype=np.int64)
+        return self.index.reconstruct_batch(indices)
+    
     def delete(self, ids: List[str]) -> None:
         """ID로 벡터 삭제
         
@@ -209,6 +233,13 @@ class FAISSVectorStore(VectorStoreBase):
         try:
             # FAISS 인덱스 로드
             self.index = faiss.read_index(str(self.index_path))
+            if self.index.d != self.dimension:
+                # 설정과 다른 차원으로 저장된 인덱스 (재투영 전후 설정 불일치)
+                logger.warning(
+                    f"[faiss] Index for '{self.store_type}' has dim={self.index.d}, "
+                    f"expected {self.dimension}; run scripts/reproject_store.py or fix settings"
+                )
+                self.dimension = self.index.d
             
             # 메타데이터 로드
             metadata_dump = json.loads(self.metadata_path.read_text(encoding="utf-8"))
@@ -232,6 +263,7 @@ class FAISSVectorStore(VectorStoreBase):
 
 # 저장소 유형별 싱글톤 캐시
 _stores: Dict[str, FAISSVectorStore] = {}
+_stores_lock = threading.Lock()
 
 
 def get_faiss_store(store_type: str) -> FAISSVectorStore:
@@ -244,5 +276,7 @@ def get_faiss_store(store_type: str) -> FAISSVectorStore:
         FAISSVectorStore 인스턴스
     """
     if store_type not in _stores:
-        _stores[store_type] = FAISSVectorStore(store_type)
+        with _stores_lock:  # 시작 워밍업 스레드와 요청 스레드의 동시 초기화 방지
+            if store_type not in _stores:
+                _stores[store_type] = FAISSVectorStore(store_type)
     return _stores[store_type]
@@ -0,0 +1,215 @@
+"""Milvus (Lite) 기반 벡터 저장소 구현"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymilvus import DataType, MilvusClient
+
+from app.core.config import get_settings
+from app.integrations.vectorstore.base import VectorStoreBase
+from app.integrations.vectorstore.projection import get_store_projection
+
+logger = logging.getLogger(__name__)
+
+# 스칼라 필드 길이 제한
+_ID_MAX_LENGTH = 256
+_DOC_ID_MAX_LENGTH = 128
+
+
+@lru_cache(maxsize=None)
+def _get_client(uri: str) -> MilvusClient:
+    """URI별 Milvus 클라이언트 (프로세스 내 공유)
+    
+    로컬 파일 경로면 Milvus Lite(임베디드)로, http(s) URI면 서버로 연결한다.
+    """
+    if not uri.startswith(("http://", "https://", "tcp://")):
+        Path(uri).parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"[milvus] Connecting to {uri}")
+    return MilvusClient(uri)
+
+
+class MilvusVectorStore(VectorStoreBase):
+    """Milvus 벡터 저장소
+    
+    - 저장소 유형(policy, incident, system)별 컬렉션 (저장소마다 차원이 다를 수 있음)
+    - 메타데이터는 JSON 필드로 저장하여 서버 측 필터링
+    - doc_id 파티션 키로 문서 단위 조회 범위 축소
+    - 쓰기 동시성/영속화는 Milvus가 담당
+    """
+    
+    def __init__(self, store_type: str, dimension: int = None):
+        """
+        Args:
+            store_type: 저장소 유형 (policy, incident, system)
+            dimension: 임베딩 차원 (None이면 저장소별 축소 차원)
+        """
+        settings = get_settings()
+        self.store_type = store_type
+        self.dimension = dimension or get_store_projection(store_type).dimension
+        self.collection = f"{settings.VECTORSTORE_MILVUS_COLLECTION}_{store_type}"
+        self.client = _get_client(str(settings.VECTORSTORE_MILVUS_URI))
+        
+        self.load()
+    
+    def _ensure_collection(self) -> None:
+        """컬렉션이 없으면 생성"""
+        if not self.client.has_collection(self.collection):
+            schema = self.client.create_schema(auto_id=False, enable_dynamic_field=False)
+            schema.add_field("id", DataType.VARCHAR, is_primary=True, max_length=_ID_MAX_LENGTH)
+            # doc_id를 파티션 키로 사용 (문서 단위 필터/삭제 시 해당 파티션만 탐색)
+            schema.add_field("doc_id", DataType.VARCHAR, max_length=_DOC_ID_MAX_LENGTH, is_partition_key=True)
+            schema.add_field("vector", DataType.FLOAT_VECTOR, dim=self.dimension)
+            schema.add_field("metadata", DataType.JSON)
+            
+            # 정규화된 벡터 + Inner Product = 코사인 유사도 (FAISS 구현과 동일)
+            index_params = self.client.prepare_index_params()
+            index_params.add_index("vector", index_type="FLAT", metric_type="IP")
+            
+            self.client.create_collection(
+                self.collection,
+                schema=schema,
+                index_params=index_params,
+                num_partitions=get_settings().VECTORSTORE_MILVUS_PARTITIONS,
+            )
+            logger.info(f"[milvus] Created collection '{self.collection}' (dim={self.dimension})")
+    
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        """L2 정규화 (코사인 유사도 계산용)"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+    
+    @staticmethod
+    def _build_filter(filter_metadata: Optional[Dict[str, Any]]) -> str:
+        """메타데이터 필터 → Milvus 불리언 표현식"""
+        if not filter_metadata:
+            return ""
+        
+        clauses = []
+        for key, value in filter_metadata.items():
+            if key == "doc_id":
+                clauses.append(f"doc_id == {json.dumps(value)}")
+            elif isinstance(value, list):
+                # 리스트 값은 '하나라도 포함' 조건 (예: tags)
+                clauses.append(f"json_contains_any(metadata[{json.dumps(key)}], {json.dumps(value, ensure_ascii=False)})")
+            else:
+                clauses.append(f"metadata[{json.dumps(key)}] == {json.dumps(value, ensure_ascii=False)}")
+        return " and ".join(clauses)
+    
+    def add(
+        self,
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+    ) -> None:
+        """벡터 및 메타데이터 추가 (동일 ID는 덮어쓰기)"""
+        if not embeddings:
+            return
+        
+        vectors = self._normalize(np.array(embeddings, dtype=np.float32))
+        rows = [
+            {
+                "id": chunk_id,
+                "doc_id": str(metadata.get("doc_id", "")),
+                "vector": vector.tolist(),
+                "metadata": metadata,
+            }
+            for chunk_id, vector, metadata in zip(ids, vectors, metadatas)
+        ]
+        self.client.upsert(self.collection, rows)
+        
+        logger.info(f"[milvus] Added {len(ids)} vectors to '{self.store_type}'")
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """유사도 검색 (필터는 서버 측에서 적용)"""
+        query_vec = self._normalize(np.array([query_embedding], dtype=np.float32))
+        
+        hits = self.client.search(
+            self.collection,
+            data=query_vec.tolist(),
+            limit=top_k,
+            filter=self._build_filter(filter_metadata),
+            output_fields=["metadata"],
+            search_params={"metric_type": "IP"},
+        )
+        
+        return [
+            (hit["id"], float(hit["distance"]), hit["entity"].get("metadata") or {})
+            for hit in hits[0]
+        ]
+    
+    def get_vectors(self, ids: List[str]) -> np.ndarray:
+        """저장된 벡터 조회 (요청한 ID 순서 유지)"""
+        if not ids:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        rows = self.client.query(
+            self.collection,
+            ids=ids,
+            output_fields=["vector"],
+        )
+        by_id = {row["id"]: row["vector"] for row in rows}
+        return np.array([by_id[chunk_id] for chunk_id in ids], dtype=np.float32)
+    
+    def delete(self, ids: List[str]) -> None:
+        """ID로 벡터 삭제"""
+        if not ids:
+            return
+        self.client.delete(self.collection, ids=ids)
+        logger.info(f"[milvus] Deleted {len(ids)} vectors from '{self.store_type}'")
+    
+    def save(self) -> None:
+        """인덱스 영속화 (세그먼트 flush)"""
+        self.client.flush(self.collection)
+    
+    def load(self) -> bool:
+        """컬렉션 준비 및 메모리 로드"""
+        try:
+            self._ensure_collection()
+            self.client.load_collection(self.collection)
+            logger.info(f"[milvus] Loaded '{self.store_type}' ({self.count()} vectors)")
+            return True
+        except Exception as e:
+            logger.error(f"[milvus] Failed to load '{self.store_type}': {e}")
+            return False
+    
+    def count(self) -> int:
+        """저장된 벡터 수 반환"""
+        rows = self.client.query(
+            self.collection,
+            filter="",
+            output_fields=["count(*)"],
+        )
+        return int(rows[0]["count(*)"]) if rows else 0
+
+
+# 저장소 유형별 싱글톤 캐시
+_stores: Dict[str, MilvusVectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_milvus_store(store_type: str) -> MilvusVectorStore:
+    """저장소 유형별 Milvus 인스턴스 반환
+    
+    Args:
+        store_type: policy, incident, system
+    
+    Returns:
+        MilvusVectorStore 인스턴스
+    """
+    if store_type not in _stores:
+        with _stores_lock:  # 시작 워밍업 스레드와 요청 스레드의 동시 초기화 방지
+            if store_type not in _stores:
+                _stores[store_type] = MilvusVectorStore(store_type)
+    return _stores[store_type]
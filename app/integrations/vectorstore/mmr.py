@@ -0,0 +1,107 @@
+"""검색 결과 다양화 - MMR (Maximal Marginal Relevance)"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    candidate_vectors: np.ndarray,
+    top_k: int,
+    lambda_mult: float = 0.7,
+    group_ids: Optional[Sequence[str]] = None,
+    max_per_group: int = 0,
+    duplicate_threshold: Optional[float] = None,
+) -> List[int]:
+    """MMR 기반 후보 선택
+
+    후보 간 유사도 행렬을 한 번만 계산한 뒤, 선택된 청크와의 최대 유사도를
+    누적 갱신하며 k개를 고른다 (O(k·n), 행렬 연산 1회).
+
+    Args:
+        query_vector: 쿼리 벡터
+        candidate_vectors: (n, dim) 후보 벡터
+        top_k: 선택할 개수
+        lambda_mult: 관련도 가중치 (1.0 = 관련도만, 0.0 = 다양성만)
+        group_ids: 후보별 그룹 키 (예: doc_id)
+        max_per_group: 그룹당 최대 선택 수 (0 = 제한 없음)
+        duplicate_threshold: 선택된 후보와 이 값 이상 유사한 후보는 근접 중복으로 제외
+
+    Returns:
+        선택된 후보 인덱스 (선택 순서)
+    """
+    n = len(candidate_vectors)
+    if n == 0 or top_k <= 0:
+        return []
+
+    candidates = _normalize(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+
+    relevance = candidates @ query           # (n,)
+    similarity = candidates @ candidates.T   # (n, n)
+
+    available = np.ones(n, dtype=bool)
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+
+    if group_ids is not None and max_per_group > 0:
+        _, group_codes = np.unique(np.asarray(group_ids), return_inverse=True)
+        group_counts = np.zeros(group_codes.max() + 1, dtype=np.int32)
+    else:
+        group_codes = None
+
+    selected: List[int] = []
+    for _ in range(min(top_k, n)):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+
+        best = int(np.argmax(scores))
+        if not np.isfinite(scores[best]):
+            break
+
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, similarity[best], out=max_sim)
+
+        # 근접 중복 제거 (오버랩으로 거의 같은 청크)
+        if duplicate_threshold is not None:
+            available &= similarity[best] < duplicate_threshold
+
+        # 그룹(문서)당 상한
+        if group_codes is not None:
+            code = group_codes[best]
+            group_counts[code] += 1
+            if group_counts[code] >= max_per_group:
+                available &= group_codes != code
+
+    return selected
+
+
+def cap_per_group(group_ids: Sequence[str], max_per_group: int) -> List[int]:
+    """순위를 유지한 채 그룹당 상한만 적용 (MMR 미사용 시)
+
+    Returns:
+        유지할 인덱스 (원래 순서)
+    """
+    if max_per_group <= 0:
+        return list(range(len(group_ids)))
+
+    counts: Dict[str, int] = {}
+    kept = []
+    for i, group_id in enumerate(group_ids):
+        if counts.get(group_id, 0) >= max_per_group:
+            continue
+        counts[group_id] = counts.get(group_id, 0) + 1
+        kept.append(i)
+    return kept
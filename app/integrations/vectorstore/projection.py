@@ -0,0 +1,181 @@
+"""저장소별 임베딩 차원 축소 - Matryoshka 절단 / PCA 투영
+
+text-embedding-3 계열은 앞부분 차원만 잘라 재정규화해도 품질이 크게 떨어지지 않는다
+(Matryoshka 표현). PCA는 저장소 벡터로 학습한 투영 행렬을 인덱스 옆에 저장해 사용한다.
+
+저장소에는 축소된 벡터만 저장되며, 쿼리는 원본 차원으로 한 번 임베딩한 뒤
+저장소별로 축소한다 (저장소마다 차원이 달라도 제공자별 쿼리 임베딩 1회).
+원본 차원은 저장소의 임베딩 제공자 차원을 따른다.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+METHOD_MATRYOSHKA = "matryoshka"
+METHOD_PCA = "pca"
+PROJECTION_FILENAME = "projection.npz"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def projection_path(store_type: str) -> Path:
+    """PCA 투영 파일 경로 (FAISS 인덱스와 같은 디렉터리)"""
+    return get_settings().FAISS_INDEX_DIR / store_type / PROJECTION_FILENAME
+
+
+class PCAProjection:
+    """PCA 투영 (mean 중심화 후 상위 주성분으로 사영)"""
+    
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        """
+        Args:
+            mean: (input_dim,) 평균 벡터
+            components: (input_dim, output_dim) 주성분 행렬
+        """
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+    
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[0]
+    
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[1]
+    
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dimension: int) -> "PCAProjection":
+        """정규화된 벡터로 PCA 학습 (SVD)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if dimension > min(vectors.shape):
+            raise ValueError(
+                f"PCA dimension {dimension} exceeds min(n_vectors, input_dim)={min(vectors.shape)}"
+            )
+        mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        return cls(mean, vt[:dimension].T)
+    
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        return (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components
+    
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, mean=self.mean, components=self.components)
+    
+    @classmethod
+    def load(cls, path: Path) -> "PCAProjection":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
+
+
+class StoreProjection:
+    """저장소 하나의 차원 축소 설정
+    
+    - 축소 미설정: 원본 차원 그대로 (apply는 항등)
+    - matryoshka: 앞 dimension 차원 절단 + 재정규화
+    - pca: projection.npz 로 투영, 학습 전이면 원본 차원 유지
+    """
+    
+    def __init__(self, store_type: str):
+        from app.integrations.embeddings.registry import get_embedding_provider
+        
+        settings = get_settings()
+        self.store_type = store_type
+        provider = get_embedding_provider(store_type)
+        self.source_dimension = provider.dimension
+        self.provider_supports_dimensions = provider.supports_dimensions
+        self.method = settings.EMBEDDING_STORE_REDUCTION.get(store_type, METHOD_MATRYOSHKA).lower()
+        self.configured_dimension = settings.EMBEDDING_STORE_DIMENSIONS.get(store_type, self.source_dimension)
+        self.pca: Optional[PCAProjection] = None
+        
+        if self.method not in (METHOD_MATRYOSHKA, METHOD_PCA):
+            raise ValueError(f"Unknown reduction method for '{store_type}': {self.method}")
+        
+        if self.method == METHOD_PCA:
+            path = projection_path(store_type)
+            if path.exists():
+                self.pca = PCAProjection.load(path)
+                if self.pca.output_dim != self.configured_dimension:
+                    logger.warning(
+                        f"[projection] '{store_type}' projection dim {self.pca.output_dim} "
+                        f"!= configured {self.configured_dimension} (using projection)"
+                    )
+            elif self.configured_dimension < self.source_dimension:
+                logger.warning(
+                    f"[projection] '{store_type}' is configured for PCA but has no {PROJECTION_FILENAME}; "
+                    f"storing full {self.source_dimension}-dim vectors until scripts/reproject_store.py is run"
+                )
+    
+    @property
+    def dimension(self) -> int:
+        """저장소에 저장되는 벡터 차원"""
+        if self.method == METHOD_PCA:
+            return self.pca.output_dim if self.pca is not None else self.source_dimension
+        return min(self.configured_dimension, self.source_dimension)
+    
+    @property
+    def api_dimensions(self) -> Optional[int]:
+        """적재 시 임베딩 제공자에 넘길 dimensions (matryoshka 축소 + 제공자 지원 시에만)"""
+        if (
+            self.method == METHOD_MATRYOSHKA
+            and self.provider_supports_dimensions
+            and self.dimension < self.source_dimension
+        ):
+            return self.dimension
+        return None
+    
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """원본(또는 이미 축소된) 벡터를 저장소 차원으로 변환
+        
+        Args:
+            vectors: (n, d) 벡터. d가 이미 저장소 차원이면 그대로 반환
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] == self.dimension:
+            return vectors
+        
+        if self.pca is not None:
+            if vectors.shape[-1] != self.pca.input_dim:
+                raise ValueError(
+                    f"Cannot project {vectors.shape[-1]}-dim vectors with a {self.pca.input_dim}-dim PCA"
+                )
+            return _normalize(self.pca.transform(_normalize(vectors)))
+        
+        if vectors.shape[-1] < self.dimension:
+            raise ValueError(
+                f"Cannot expand {vectors.shape[-1]}-dim vectors to {self.dimension} for '{self.store_type}'"
+            )
+        return _normalize(vectors[..., :self.dimension])
+
+
+# 저장소 유형별 캐시
+_projections: Dict[str, StoreProjection] = {}
+
+
+def get_store_projection(store_type: str) -> StoreProjection:
+    """저장소 유형별 차원 축소 설정 반환"""
+    if store_type not in _projections:
+        _projections[store_type] = StoreProjection(store_type)
+    return _projections[store_type]
+
+
+def reset_store_projection(store_type: Optional[str] = None) -> None:
+    """캐시 무효화 (투영 파일 교체 후 호출)"""
+    if store_type is None:
+        _projections.clear()
+    else:
+        _projections.pop(store_type, None)
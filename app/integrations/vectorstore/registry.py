@@ -0,0 +1,65 @@
+"""벡터 저장소 백엔드 레지스트리
+
+설정(VECTORSTORE_BACKEND)에 따라 저장소 구현을 선택한다.
+백엔드 모듈은 선택된 경우에만 import 하므로 미사용 의존성(pymilvus 등)은 필요 없다.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable, Dict
+
+from app.core.config import get_settings
+from app.integrations.vectorstore.base import VectorStoreBase
+
+logger = logging.getLogger(__name__)
+
+BackendFactory = Callable[[str], VectorStoreBase]
+
+
+def _faiss_factory(store_type: str) -> VectorStoreBase:
+    from app.integrations.vectorstore.faiss_store import get_faiss_store
+    return get_faiss_store(store_type)
+
+
+def _milvus_factory(store_type: str) -> VectorStoreBase:
+    try:
+        from app.integrations.vectorstore.milvus_store import get_milvus_store
+    except ImportError as e:
+        raise RuntimeError(
+            "VECTORSTORE_BACKEND=milvus requires pymilvus (pip install pymilvus)"
+        ) from e
+    return get_milvus_store(store_type)
+
+
+_backends: Dict[str, BackendFactory] = {
+    "faiss": _faiss_factory,
+    "milvus": _milvus_factory,
+}
+
+
+def register_backend(name: str, factory: BackendFactory) -> None:
+    """백엔드 등록 (저장소 유형 → 인스턴스 팩토리)"""
+    _backends[name] = factory
+    logger.info(f"[vectorstore] Registered backend '{name}'")
+
+
+def list_backends() -> list[str]:
+    """등록된 백엔드 이름 목록"""
+    return sorted(_backends)
+
+
+def get_vector_store(store_type: str, backend: str = None) -> VectorStoreBase:
+    """저장소 유형별 벡터 저장소 반환
+    
+    Args:
+        store_type: policy, incident, system
+        backend: 백엔드 이름 (None이면 설정값)
+    
+    Returns:
+        VectorStoreBase 구현 인스턴스
+    """
+    name = (backend or get_settings().VECTORSTORE_BACKEND).lower()
+    factory = _backends.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown vector store backend: {name} (available: {list_backends()})")
+    return factory(store_type)
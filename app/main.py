@@ -1,4 +1,8 @@
 # app/main.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -7,8 +11,13 @@ from app.api.v1.agent import router as agent_router
 from app.api.v1.admin_knowledge import router as admin_knowledge_router
 from app.api.v1.approval import router as approval_router
 from app.api.v1.runs import router as runs_router
+from app.core.config import get_settings
 from app.core.logging import setup_logging
 from app.core.run_context import generate_run_id, set_run_id
+from app.services.agent_service import sweep_checkpoints
+from app.services.warmup_service import mark_warmup_skipped, run_warmup
+
+logger = logging.getLogger(__name__)
 
 class RunIdMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -20,9 +29,43 @@ class RunIdMiddleware(BaseHTTPMiddleware):
         response.headers["X-Run-Id"] = run_id
         return response
 
+async def sweep_checkpoints_periodically(interval_seconds: int) -> None:
+    """보존 기간이 지난 승인 대기 체크포인트 주기 정리"""
+    while True:
+        try:
+            await asyncio.to_thread(sweep_checkpoints)
+        except Exception as e:
+            logger.warning(f"[main] Checkpoint sweep failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 저장소/그래프/클라이언트 워밍업 (완료 전까지 /health 503)"""
+    settings = get_settings()
+    warmup_task = None
+    if not settings.WARMUP_ON_STARTUP:
+        mark_warmup_skipped()
+    elif settings.WARMUP_BLOCKING:
+        await asyncio.to_thread(run_warmup)
+    else:
+        warmup_task = asyncio.create_task(asyncio.to_thread(run_warmup))
+
+    sweeper_task = None
+    if settings.CHECKPOINT_SWEEP_INTERVAL_SECONDS > 0:
+        sweeper_task = asyncio.create_task(sweep_checkpoints_periodically(settings.CHECKPOINT_SWEEP_INTERVAL_SECONDS))
+
+    yield
+
+    if sweeper_task is not None:
+        sweeper_task.cancel()
+
+    if warmup_task is not None and not warmup_task.done():
+        logger.info("[main] Waiting for warmup to finish before shutdown")
+        await warmup_task
+
 def create_app() -> FastAPI:
     setup_logging()
-    app = FastAPI(title="TRACE-AI", version="0.1.0")
+    app = FastAPI(title="TRACE-AI", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(RunIdMiddleware)
 
@@ -87,3 +87,4 @@ class AuditSummary(BaseModel):
     analysis_results: Dict[str, Any] = Field(default_factory=dict)
     errors: List[str] = Field(default_factory=list)
     trace_summary: Dict[str, Any] = Field(default_factory=dict)
+    usage: Dict[str, Any] = Field(default_factory=dict)  # LLM/임베딩 토큰·지연·추정 비용 (노드별)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -38,6 +38,21 @@ class SearchRequest(BaseModel):
     store_type: StoreType = Field(..., description="검색 대상 저장소")
     top_k: int = Field(default=5, ge=1, le=20, description="반환 결과 수")
     filter_tags: Optional[List[str]] = Field(default=None, description="태그 필터")
+    mmr: Optional[bool] = Field(default=None, description="MMR 다양화 사용 여부 (미지정 시 서버 설정)")
+    max_per_doc: Optional[int] = Field(default=None, ge=0, description="문서당 최대 청크 수 (0 = 제한 없음)")
+
+
+class MultiSearchRequest(BaseModel):
+    """다중 저장소 통합 검색 요청"""
+    query: str = Field(..., min_length=1, description="검색 쿼리")
+    store_types: Optional[List[StoreType]] = Field(default=None, description="검색 대상 저장소 (미지정 시 전체)")
+    top_k: int = Field(default=10, ge=1, le=50, description="병합 결과 수")
+    store_quotas: Optional[Dict[StoreType, Annotated[int, Field(ge=1, le=50)]]] = Field(
+        default=None, description="저장소별 최대 결과 수 (top_k와 같은 범위)"
+    )
+    filter_tags: Optional[List[str]] = Field(default=None, description="태그 필터")
+    mmr: Optional[bool] = Field(default=None, description="MMR 다양화 사용 여부 (미지정 시 서버 설정)")
+    max_per_doc: Optional[int] = Field(default=None, ge=0, description="문서당 최대 청크 수 (0 = 제한 없음)")
 
 
 # ===== Response Models =====
@@ -89,11 +104,27 @@ class SearchResponse(BaseModel):
     total_count: int
 
 
+class MultiSearchResult(SearchResult):
+    """통합 검색 결과 항목 (score는 원점수 + 저장소별 보정값)"""
+    raw_score: float = Field(..., description="원본 유사도 점수")
+    store_type: StoreType
+
+
+class MultiSearchResponse(BaseModel):
+    """통합 검색 응답"""
+    query: str
+    store_types: List[StoreType]
+    results: List[MultiSearchResult]
+    total_count: int
+    store_counts: Dict[str, int] = Field(default_factory=dict, description="저장소별 후보 수")
+
+
 class DocumentListResponse(BaseModel):
     """문서 목록 응답"""
     store_type: StoreType
     documents: List[DocumentInfo]
-    total_count: int
+    total_count: int  # 저장소 전체 문서 수
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (마지막 페이지면 None)
 
 
 class DeleteResponse(BaseModel):
@@ -109,3 +140,50 @@ class StoreStatsResponse(BaseModel):
     store_type: StoreType
     document_count: int
     chunk_count: int
+    generation: int = Field(0, description="적재/삭제 시 증가 (검색 캐시 무효화 기준)")
+
+
+class SearchCacheStatsResponse(BaseModel):
+    """검색 결과 캐시 지표"""
+    enabled: bool
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float = Field(..., description="hits / (hits + misses)")
+
+
+# ===== Snapshot Models =====
+
+class SnapshotFileInfo(BaseModel):
+    """스냅샷 파일 항목"""
+    path: str = Field(..., description="아카이브 내 경로")
+    sha256: str
+    size: int
+
+
+class SnapshotStoreInfo(BaseModel):
+    """스냅샷 저장소 항목"""
+    files: List[SnapshotFileInfo] = Field(default_factory=list)
+    dimension: Optional[int] = Field(None, description="저장된 벡터 차원 (축소 적용 후)")
+    embedding_provider: Optional[str] = Field(None, description="임베딩 제공자/모델 식별자 (벡터 공간)")
+    document_count: int = 0
+    chunk_count: int = 0
+
+
+class SnapshotManifest(BaseModel):
+    """스냅샷 매니페스트 (아카이브 첫 멤버)"""
+    format: str
+    format_version: int
+    created_at: str
+    embedding_model: str
+    embedding_dimension: int
+    stores: Dict[str, SnapshotStoreInfo] = Field(default_factory=dict)
+
+
+class SnapshotImportResponse(BaseModel):
+    """스냅샷 복원 응답"""
+    restored: bool
+    manifest: SnapshotManifest
+    duration_ms: float
@@ -3,12 +3,12 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from app.agent.orchestrator import get_graph
 from app.agent.state import AgentState
-from app.core.run_context import get_run_id
-from app.services.approval_store import save_pending_approval
+from app.core.config import get_settings
+from app.core.run_context import clear_run_memo, get_run_id, get_run_memo
+from app.services.approval_store import expire_run, save_pending_approval
 
 logger = logging.getLogger(__name__)
 
@@ -35,34 +35,33 @@ def run_agent(query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str,
     )
 
     logger.info(f"[agent_service] invoke graph run_id={run_id}")
+    # langgraph/LLM 의존성은 실행 시점에 로드 (헬스체크·승인 API 프로세스 시작 시간 단축)
+    from app.agent.checkpoint import delete_checkpoints, thread_config
+    from app.agent.orchestrator import get_graph
+    
     graph = get_graph()
-    result = graph.invoke(state)
+    paused = False
+    # run 메모는 run 시작 시 생성 (사용량 등 run 단위 기록은 있는 메모에만 쌓임)
+    get_run_memo(run_id)
+    try:
+        result = graph.invoke(state, thread_config(run_id), durability=get_settings().CHECKPOINT_DURABILITY)
+        # 승인 대기 run은 EXECUTE 직전에 중단됨 (체크포인트 유지)
+        paused = result.get("approval_status") == "pending"
+    finally:
+        # run 범위 메모(쿼리 임베딩 등) 해제
+        clear_run_memo(run_id)
+        # 재개할 일이 없는 run의 체크포인트는 바로 삭제
+        if not paused:
+            delete_checkpoints(run_id)
     
     # 결과에 시작 시간 추가 (감사 생성용)
     result["_started_at"] = started_at.isoformat()
     
-    # 승인 대기 상태인 경우 상태 저장
-    if result.get("approval_status") == "pending":
-        # 승인 사유 수집
-        approval_reasons = []
-        workflow_result = result.get("workflow_result")
-        if workflow_result and hasattr(workflow_result, "approvals_required"):
-            approval_reasons = workflow_result.approvals_required
-        elif isinstance(workflow_result, dict):
-            approval_reasons = workflow_result.get("approvals_required", [])
-        
-        # trace에서도 승인 사유 확인
-        trace = result.get("trace", {})
-        check_approval_trace = trace.get("check_approval", {})
-        if check_approval_trace.get("approval_reasons"):
-            for reason in check_approval_trace.get("approval_reasons", []):
-                if reason not in approval_reasons:
-                    approval_reasons.append(reason)
-        
-        # 상태 스냅샷 저장
+    # 승인 대기 상태인 경우 승인 요청 등록 (상태 자체는 체크포인트에 있음)
+    if paused:
+        approval_reasons = collect_approval_reasons(result)
         save_pending_approval(
             run_id=run_id,
-            state_snapshot=result,
             action_plan=result.get("action_plan", []),
             approval_reasons=approval_reasons,
         )
@@ -75,33 +74,94 @@ def run_agent(query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str,
             "reasons": approval_reasons,
             "action_plan_count": len(result.get("action_plan", [])),
         }
-
+    
     return result
 
 
-def resume_after_approval(run_id: str, state_snapshot: Dict[str, Any]) -> Dict[str, Any]:
-    """승인 후 실행 재개"""
+def collect_approval_reasons(values: Dict[str, Any]) -> List[str]:
+    """승인 사유 수집 (workflow 결과 + CHECK_APPROVAL trace)"""
+    approval_reasons = []
+    workflow_result = values.get("workflow_result")
+    if workflow_result and hasattr(workflow_result, "approvals_required"):
+        approval_reasons = list(workflow_result.approvals_required)
+    elif isinstance(workflow_result, dict):
+        approval_reasons = list(workflow_result.get("approvals_required", []))
+    
+    # trace에서도 승인 사유 확인
+    check_approval_trace = values.get("trace", {}).get("check_approval", {})
+    for reason in check_approval_trace.get("approval_reasons", []):
+        if reason not in approval_reasons:
+            approval_reasons.append(reason)
+    return approval_reasons
+
+
+def load_paused_run(run_id: str) -> Optional[Dict[str, Any]]:
+    """체크포인트에서 승인 대기(EXECUTE 직전 중단) 중인 run 조회
+    
+    Returns:
+        {"values": 상태 값, "created_at": 중단 시각(ISO)} 또는 None
+    """
+    from app.agent.checkpoint import thread_config
+    from app.agent.orchestrator import get_graph
+    
+    snapshot = get_graph().get_state(thread_config(run_id))
+    if "EXECUTE" not in snapshot.next:
+        return None
+    return {"values": snapshot.values, "created_at": snapshot.created_at}
+
+
+def list_paused_run_ids() -> List[str]:
+    """체크포인트가 남아 있는 승인 대기 run 목록"""
+    from app.agent.checkpoint import list_thread_ids
+    
+    return [run_id for run_id in list_thread_ids() if load_paused_run(run_id) is not None]
+
+
+def resume_after_approval(run_id: str) -> Dict[str, Any]:
+    """승인 후 실행 재개 - 체크포인트에서 EXECUTE부터 이어서 실행 (이전 노드는 다시 실행하지 않음)
+    
+    Raises:
+        LookupError: 재개할 체크포인트가 없는 경우 (보존 기간 경과 등)
+    """
+    from app.agent.checkpoint import delete_checkpoints, thread_config
+    from app.agent.orchestrator import get_graph
+    
     logger.info(f"[agent_service] Resuming after approval: run_id={run_id}")
+    if load_paused_run(run_id) is None:
+        raise LookupError(f"No paused checkpoint for run_id={run_id}")
     
-    # 상태 복원
-    state_snapshot["approval_status"] = "approved"
-    
-    # 간단한 finalize만 수행 (이미 분석은 완료된 상태)
-    # 실제로는 실행(execution) 단계가 추가될 수 있음
-    result = {
-        **state_snapshot,
-        "execution_results": [
-            {
-                "step": "approval_granted",
-                "message": "실행 계획이 승인되었습니다.",
-                "status": "ready_for_execution",
-            }
-        ],
-        "trace": {
-            **state_snapshot.get("trace", {}),
-            "resume_after_approval": {"status": "success"}
-        }
-    }
+    graph = get_graph()
+    config = thread_config(run_id)
+    graph.update_state(config, {"approval_status": "approved"})
+    get_run_memo(run_id)
+    try:
+        result = graph.invoke(None, config, durability=get_settings().CHECKPOINT_DURABILITY)
+    finally:
+        clear_run_memo(run_id)
+    delete_checkpoints(run_id)
     
+    result["_started_at"] = result.get("context", {}).get("_started_at")
     logger.info(f"[agent_service] Resume completed: run_id={run_id}")
     return result
+
+
+def discard_paused_run(run_id: str) -> None:
+    """거부된 run의 체크포인트 삭제"""
+    from app.agent.checkpoint import delete_checkpoints
+    
+    delete_checkpoints(run_id)
+    logger.info(f"[agent_service] Discarded paused run: run_id={run_id}")
+
+
+def sweep_checkpoints() -> int:
+    """보존 기간이 지난 체크포인트 삭제, 해당 승인 대기는 expired 처리
+    
+    Returns:
+        삭제된 run 수
+    """
+    from app.agent.checkpoint import delete_expired_checkpoints
+    
+    run_ids = delete_expired_checkpoints(get_settings().CHECKPOINT_RETENTION_HOURS)
+    for run_id in run_ids:
+        expire_run(run_id)
+    return len(run_ids)
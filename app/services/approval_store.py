@@ -1,10 +1,14 @@
 # app/services/approval_store.py
-"""승인 대기 상태 저장소 (인메모리, MVP용)"""
+"""승인 대기 상태 저장소
+
+승인 요청 정보는 메모리에 두고, 재개에 필요한 run 상태는 그래프 체크포인트(app.agent.checkpoint)에 있다.
+프로세스 재시작으로 메모리 기록이 사라져도 승인 대기 run은 체크포인트에서 복원한다.
+"""
 from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, Literal, Optional
+from typing import Dict, Literal, Optional
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
@@ -15,9 +19,6 @@ class PendingApproval(BaseModel):
     run_id: str
     status: Literal["pending", "approved", "rejected", "expired"] = "pending"
     
-    # 승인 대기 중인 상태 스냅샷
-    state_snapshot: Dict[str, Any] = Field(default_factory=dict)
-    
     # 승인 요청 정보
     action_plan: list = Field(default_factory=list)
     approval_reasons: list = Field(default_factory=list)
@@ -31,20 +32,42 @@ class PendingApproval(BaseModel):
     resolution_note: Optional[str] = None
 
 
-# 인메모리 저장소 (해커톤 MVP용)
+# 승인 요청 정보 (run 상태는 체크포인트)
 _pending_approvals: Dict[str, PendingApproval] = {}
 
 
+def _restore_from_checkpoint(run_id: str) -> Optional[PendingApproval]:
+    """메모리에 없는 승인 대기 run을 체크포인트에서 복원 (프로세스 재시작 후)"""
+    from app.services.agent_service import collect_approval_reasons, load_paused_run
+    
+    paused = load_paused_run(run_id)
+    if paused is None:
+        return None
+    values = paused["values"]
+    pending = PendingApproval(
+        run_id=run_id,
+        action_plan=values.get("action_plan", []),
+        approval_reasons=collect_approval_reasons(values),
+    )
+    if paused["created_at"]:
+        pending.created_at = datetime.fromisoformat(paused["created_at"]).replace(tzinfo=None)
+    _pending_approvals[run_id] = pending
+    logger.info(f"[approval_store] Restored pending approval from checkpoint: run_id={run_id}")
+    return pending
+
+
+def _lookup(run_id: str) -> Optional[PendingApproval]:
+    return _pending_approvals.get(run_id) or _restore_from_checkpoint(run_id)
+
+
 def save_pending_approval(
     run_id: str,
-    state_snapshot: Dict[str, Any],
     action_plan: list,
     approval_reasons: list,
 ) -> PendingApproval:
     """승인 대기 상태 저장"""
     pending = PendingApproval(
         run_id=run_id,
-        state_snapshot=state_snapshot,
         action_plan=action_plan,
         approval_reasons=approval_reasons,
     )
@@ -55,12 +78,12 @@ def save_pending_approval(
 
 def get_pending_approval(run_id: str) -> Optional[PendingApproval]:
     """승인 대기 상태 조회"""
-    return _pending_approvals.get(run_id)
+    return _lookup(run_id)
 
 
 def approve_run(run_id: str, approved_by: str = "user", note: str = "") -> Optional[PendingApproval]:
     """실행 승인"""
-    pending = _pending_approvals.get(run_id)
+    pending = _lookup(run_id)
     if not pending:
         logger.warning(f"[approval_store] Approval not found: run_id={run_id}")
         return None
@@ -80,7 +103,7 @@ def approve_run(run_id: str, approved_by: str = "user", note: str = "") -> Optio
 
 def reject_run(run_id: str, rejected_by: str = "user", note: str = "") -> Optional[PendingApproval]:
     """실행 거부"""
-    pending = _pending_approvals.get(run_id)
+    pending = _lookup(run_id)
     if not pending:
         logger.warning(f"[approval_store] Approval not found: run_id={run_id}")
         return None
@@ -98,12 +121,25 @@ def reject_run(run_id: str, rejected_by: str = "user", note: str = "") -> Option
     return pending
 
 
+def expire_run(run_id: str) -> None:
+    """체크포인트 보존 기간 경과 - 재개할 수 없으므로 expired 처리"""
+    pending = _pending_approvals.get(run_id)
+    if pending and pending.status == "pending":
+        pending.status = "expired"
+        pending.resolved_at = datetime.utcnow()
+        logger.info(f"[approval_store] Expired: run_id={run_id}")
+
+
 def list_pending_approvals() -> list[PendingApproval]:
-    """대기 중인 승인 목록 조회"""
+    """대기 중인 승인 목록 조회 (체크포인트에만 남은 run 포함)"""
+    from app.services.agent_service import list_paused_run_ids
+    
+    for run_id in list_paused_run_ids():
+        _lookup(run_id)
     return [p for p in _pending_approvals.values() if p.status == "pending"]
 
 
 def get_approval_status(run_id: str) -> Optional[str]:
     """승인 상태만 조회"""
-    pending = _pending_approvals.get(run_id)
+    pending = _lookup(run_id)
     return pending.status if pending else None
@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Any, Dict, List, Literal
 from uuid import uuid4
 
+from app.agent.prefetch import get_prefetch_summary
+from app.agent.retrieval import get_embedding_counts
+from app.integrations.llm.usage import snapshot_run_usage, summarize_run_usage
 from app.schemas.agent import ApprovalRecord, AuditSummary
 from app.services.approval_store import get_pending_approval
 
@@ -20,6 +23,23 @@ AUDIT_DIR = Path("audit")
 AUDIT_DIR.mkdir(exist_ok=True)
 
 
+# 승인 대기 중단 시 run 메모 집계를 보존하는 trace 위치 (trace["await_approval"]["run_metrics"])
+RUN_METRICS_KEY = "run_metrics"
+
+
+def snapshot_run_metrics(run_id: str) -> Dict[str, Any]:
+    """run 메모에만 있는 집계값 (임베딩 횟수, LLM 사용량, 프리페치 요약)
+    
+    run 메모는 승인 대기로 중단될 때 해제되므로, AWAIT_APPROVAL 노드가 이 값을 trace에 남겨
+    체크포인트와 함께 저장하고 재개 후 FINALIZE의 감사 요약에서 합산한다.
+    """
+    return {
+        "embeddings": get_embedding_counts(run_id),
+        "usage": snapshot_run_usage(run_id),
+        "retrieval_prefetch": get_prefetch_summary(run_id),
+    }
+
+
 def generate_audit_id() -> str:
     """감사 ID 생성"""
     return f"audit_{uuid4().hex[:8]}"
@@ -170,6 +190,17 @@ def create_audit_summary(
     if trace.get("mixed_summary"):
         trace_summary["subgraphs_executed"].append("mixed")
     
+    # 승인 후 재개된 run은 중단 전 집계가 trace에 보존되어 있음 (run 메모는 재개 이후 값만 가짐)
+    carried = trace.get("await_approval", {}).get(RUN_METRICS_KEY) or {}
+    
+    # 쿼리 임베딩 호출/재사용 횟수 (run 단위 공유)
+    trace_summary["embeddings"] = get_embedding_counts(run_id, carried.get("embeddings"))
+    
+    # 추측 검색 프리페치 (분류와 병행 시작, 사용/취소된 검색)
+    prefetch = get_prefetch_summary(run_id) or carried.get("retrieval_prefetch")
+    if prefetch:
+        trace_summary["retrieval_prefetch"] = prefetch
+    
     # AuditSummary 생성
     audit = AuditSummary(
         audit_id=generate_audit_id(),
@@ -185,6 +216,7 @@ def create_audit_summary(
         analysis_results=state.get("analysis_results", {}),
         errors=errors,
         trace_summary=trace_summary,
+        usage=summarize_run_usage(run_id, carried.get("usage")),
     )
     
     logger.info(f"[audit_service] Generated audit summary: audit_id={audit.audit_id}, run_id={run_id}")
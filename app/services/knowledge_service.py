@@ -2,18 +2,27 @@
 """지식 저장소 서비스 - 문서 적재/검색 파이프라인"""
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import logging
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from app.core.config import get_settings
-from app.integrations.llm.openrouter_client import get_openrouter_client
-from app.integrations.parsers.pdf_parser import parse_pdf_bytes, extract_pdf_metadata_bytes
-from app.integrations.parsers.text_parser import parse_text_bytes, chunk_text
-from app.integrations.vectorstore.faiss_store import get_faiss_store
+from app.integrations.embeddings.registry import get_embedding_provider, provider_name_for
+from app.integrations.parsers.pdf_parser import (
+    parse_pdf_bytes,
+    parse_pdf_file,
+    extract_pdf_metadata,
+    extract_pdf_metadata_bytes,
+)
+from app.integrations.parsers.text_parser import parse_text_bytes, parse_text_file, chunk_text
+from app.integrations.storage.doc_catalog import get_doc_catalog
+from app.integrations.storage.uploads import SpooledUpload, sha256_file
+from app.integrations.vectorstore.base import VectorStoreBase
+from app.integrations.vectorstore.registry import get_vector_store
 from app.schemas.knowledge import (
     StoreType,
     DocumentStatus,
@@ -21,7 +30,10 @@ from app.schemas.knowledge import (
     IngestResponse,
     SearchResult,
     SearchResponse,
+    MultiSearchResult,
+    MultiSearchResponse,
 )
+from app.services.search_cache import get_search_cache, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +43,10 @@ class KnowledgeService:
     
     def __init__(self):
         self.settings = get_settings()
-        self.metadata_dir = self.settings.KNOWLEDGE_STORE_DIR / "metadata"
-        self.metadata_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _get_metadata_path(self, store_type: str) -> Path:
-        """메타데이터 파일 경로"""
-        return self.metadata_dir / f"{store_type}_docs.json"
-    
-    def _load_doc_metadata(self, store_type: str) -> Dict[str, Dict[str, Any]]:
-        """문서 메타데이터 로드"""
-        path = self._get_metadata_path(store_type)
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-        return {}
-    
-    def _save_doc_metadata(self, store_type: str, metadata: Dict[str, Dict[str, Any]]) -> None:
-        """문서 메타데이터 저장"""
-        path = self._get_metadata_path(store_type)
-        path.write_text(
-            json.dumps(metadata, ensure_ascii=False, indent=2, default=str),
-            encoding="utf-8"
-        )
+        # 문서 메타데이터는 SQLite 카탈로그 (기존 metadata/{store}_docs.json 은 최초 접근 시 이관)
+        self.catalog = get_doc_catalog()
+        # 검색 결과 LRU 캐시 (키: 저장소 generation + 쿼리 해시 + top_k + 필터)
+        self.search_cache = get_search_cache()
     
     def _detect_file_type(self, filename: str) -> str:
         """파일 유형 감지"""
@@ -66,14 +61,19 @@ class KnowledgeService:
     async def ingest_document(
         self,
         filename: str,
-        content: bytes,
+        content: Union[bytes, Path],
         store_type: StoreType,
         tags: Optional[List[str]] = None,
         version: Optional[str] = None,
+        content_sha256: Optional[str] = None,
     ) -> IngestResponse:
         """단일 문서 적재
         
         파이프라인: 파싱 → 청킹 → 임베딩 → 저장
+        
+        Args:
+            content: 파일 바이트 또는 디스크 파일 경로 (업로드 스풀 파일은 경로로 전달해 사본 없이 파싱)
+            content_sha256: 미리 계산된 sha256 (스풀링 중 계산된 값, 없으면 여기서 계산)
         """
         ingest_id = str(uuid.uuid4())
         doc_id = str(uuid.uuid4())
@@ -83,15 +83,26 @@ class KnowledgeService:
         try:
             # 1. 파싱
             file_type = self._detect_file_type(filename)
+            is_path = isinstance(content, Path)
             if file_type == "pdf":
-                text = parse_pdf_bytes(content, filename)
-                file_metadata = extract_pdf_metadata_bytes(content)
+                if is_path:
+                    text = parse_pdf_file(content)
+                    file_metadata = extract_pdf_metadata(content)
+                else:
+                    text = parse_pdf_bytes(content, filename)
+                    file_metadata = extract_pdf_metadata_bytes(content)
             elif file_type == "text":
-                text = parse_text_bytes(content, filename)
+                text = parse_text_file(content) if is_path else parse_text_bytes(content, filename)
                 file_metadata = {}
             else:
                 raise ValueError(f"Unsupported file type: {filename}")
             
+            # 원본 파일 식별 정보 (중복 업로드 추적용)
+            if content_sha256 is None:
+                content_sha256 = sha256_file(content) if is_path else hashlib.sha256(content).hexdigest()
+            file_metadata["sha256"] = content_sha256
+            file_metadata["size_bytes"] = content.stat().st_size if is_path else len(content)
+            
             if not text or not text.strip():
                 raise ValueError(f"No text extracted from {filename}")
             
@@ -104,14 +115,21 @@ class KnowledgeService:
             
             logger.info(f"[knowledge] Created {len(chunks)} chunks from {filename}")
             
-            # 3. 임베딩 생성
-            client = get_openrouter_client()
-            embeddings = client.create_embeddings(chunks)
+            # 3. 임베딩 생성 (저장소별 차원 축소 적용)
+            from app.integrations.vectorstore.projection import get_store_projection
             
-            logger.info(f"[knowledge] Generated {len(embeddings)} embeddings")
+            provider = get_embedding_provider(store_type.value)
+            projection = get_store_projection(store_type.value)
+            embeddings = provider.embed(chunks, dimensions=projection.api_dimensions)
+            embeddings = projection.apply(embeddings).tolist()
+            
+            logger.info(
+                f"[knowledge] Generated {len(embeddings)} embeddings "
+                f"(provider={provider.name}, dim={projection.dimension})"
+            )
             
             # 4. 벡터 저장소에 저장
-            store = get_faiss_store(store_type.value)
+            store = get_vector_store(store_type.value)
             
             chunk_ids = []
             chunk_metadatas = []
@@ -133,8 +151,7 @@ class KnowledgeService:
             store.save()
             
             # 5. 문서 메타데이터 저장
-            doc_metadata = self._load_doc_metadata(store_type.value)
-            doc_metadata[doc_id] = {
+            self.catalog.add(store_type.value, {
                 "doc_id": doc_id,
                 "filename": filename,
                 "store_type": store_type.value,
@@ -144,8 +161,7 @@ class KnowledgeService:
                 "version": version,
                 "created_at": datetime.now().isoformat(),
                 "metadata": file_metadata,
-            }
-            self._save_doc_metadata(store_type.value, doc_metadata)
+            })
             
             logger.info(f"[knowledge] Ingest completed: {filename} (doc_id={doc_id}, chunks={len(chunks)})")
             
@@ -170,7 +186,7 @@ class KnowledgeService:
     
     async def ingest_documents(
         self,
-        files: List[tuple[str, bytes]],  # (filename, content) 튜플
+        files: List[Union[tuple[str, bytes], SpooledUpload]],  # (filename, content) 튜플 또는 스풀 파일
         store_type: StoreType,
         tags: Optional[List[str]] = None,
         version: Optional[str] = None,
@@ -181,13 +197,18 @@ class KnowledgeService:
         total_chunks = 0
         errors = []
         
-        for filename, content in files:
+        for item in files:
+            if isinstance(item, SpooledUpload):
+                filename, content, content_sha256 = item.filename, item.path, item.sha256
+            else:
+                (filename, content), content_sha256 = item, None
             result = await self.ingest_document(
                 filename=filename,
                 content=content,
                 store_type=store_type,
                 tags=tags,
                 version=version,
+                content_sha256=content_sha256,
             )
             
             if result.status == DocumentStatus.COMPLETED:
@@ -214,29 +235,56 @@ class KnowledgeService:
         store_type: StoreType,
         top_k: int = 5,
         filter_tags: Optional[List[str]] = None,
+        mmr: Optional[bool] = None,
+        max_per_doc: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> SearchResponse:
-        """지식 저장소 검색"""
+        """지식 저장소 검색
+        
+        Args:
+            mmr: MMR 다양화 사용 여부 (None이면 설정값)
+            max_per_doc: 문서당 최대 청크 수 (None이면 설정값, 0 = 제한 없음)
+            query_embedding: 미리 계산된 원본 차원 쿼리 임베딩 (저장소 제공자 기준, 있으면 임베딩 호출 생략)
+        """
         logger.info(f"[knowledge] Search: '{query}' in {store_type.value} (top_k={top_k})")
         
         try:
-            # 쿼리 임베딩 생성
-            client = get_openrouter_client()
-            try:
-                query_embedding = client.create_embedding(query)
-            except Exception as e:
-                logger.error(f"[knowledge] Failed to create embedding for query: {e}")
-                # 임베딩 생성 실패 시 빈 결과 반환
-                return SearchResponse(
-                    query=query,
-                    store_type=store_type,
-                    results=[],
-                    total_count=0,
+            # 결과 캐시 조회 (generation이 키에 포함되어 적재/삭제 시 자동 무효화)
+            cache_key = None
+            if self.search_cache.enabled:
+                cache_key = make_cache_key(
+                    store_type.value,
+                    self.catalog.stats(store_type.value)["generation"],
+                    query,
+                    top_k,
+                    filter_tags,
+                    self.settings.SEARCH_MMR_ENABLED if mmr is None else mmr,
+                    self.settings.SEARCH_MAX_CHUNKS_PER_DOC if max_per_doc is None else max_per_doc,
                 )
+                cached = self.search_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"[knowledge] Search cache hit for '{query}' in {store_type.value}")
+                    return cached
+            
+            # 쿼리 임베딩 생성 (미리 계산된 임베딩이 없을 때만)
+            if query_embedding is None:
+                try:
+                    query_embedding = get_embedding_provider(store_type.value).embed_query(query)
+                except Exception as e:
+                    logger.error(f"[knowledge] Failed to create embedding for query: {e}")
+                    # 임베딩 생성 실패 시 빈 결과 반환
+                    return SearchResponse(
+                        query=query,
+                        store_type=store_type,
+                        results=[],
+                        total_count=0,
+                    )
             
             # 벡터 검색
             try:
-                store = get_faiss_store(store_type.value)
-                search_results = store.search(query_embedding, top_k=top_k * 2 if filter_tags else top_k)
+                results = self._search_store(
+                    query_embedding, store_type, top_k, filter_tags, mmr, max_per_doc
+                )
             except Exception as e:
                 logger.error(f"[knowledge] Failed to search vector store: {e}")
                 # 검색 실패 시 빈 결과 반환
@@ -247,38 +295,17 @@ class KnowledgeService:
                     total_count=0,
                 )
             
-            results = []
-            for chunk_id, score, metadata in search_results:
-                # 태그 필터링
-                if filter_tags:
-                    chunk_tags = metadata.get("tags", [])
-                    if not any(tag in chunk_tags for tag in filter_tags):
-                        continue
-                
-                results.append(SearchResult(
-                    chunk_id=chunk_id,
-                    doc_id=metadata.get("doc_id", ""),
-                    score=score,
-                    text=metadata.get("text", ""),
-                    metadata={
-                        "filename": metadata.get("filename", ""),
-                        "tags": metadata.get("tags", []),
-                        "version": metadata.get("version"),
-                        "chunk_index": metadata.get("chunk_index", 0),
-                    },
-                ))
-                
-                if len(results) >= top_k:
-                    break
-            
             logger.info(f"[knowledge] Found {len(results)} results for '{query}'")
             
-            return SearchResponse(
+            response = SearchResponse(
                 query=query,
                 store_type=store_type,
                 results=results,
                 total_count=len(results),
             )
+            if cache_key is not None:
+                self.search_cache.put(cache_key, response)
+            return response
         except Exception as e:
             # 예상치 못한 오류 발생 시 빈 결과 반환
             logger.error(f"[knowledge] Unexpected error during search: {e}", exc_info=True)
@@ -289,64 +316,244 @@ class KnowledgeService:
                 total_count=0,
             )
     
+    async def search_all(
+        self,
+        query: str,
+        stores: Optional[List[StoreType]] = None,
+        top_k: int = 10,
+        store_quotas: Optional[Dict[StoreType, int]] = None,
+        filter_tags: Optional[List[str]] = None,
+        mmr: Optional[bool] = None,
+        max_per_doc: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> MultiSearchResponse:
+        """다중 저장소 통합 검색
+        
+        쿼리를 임베딩 제공자별로 한 번만 임베딩한 뒤 저장소들을 병렬 검색하고,
+        원본 코사인 점수에 저장소별 보정값(SEARCH_STORE_SCORE_OFFSETS)을 더해 하나의 순위로 병합한다.
+        저장소별 min-max 정규화는 관련 없는 저장소의 1위도 1.0으로 끌어올리므로 쓰지 않는다.
+        
+        Args:
+            stores: 검색 대상 저장소 (None이면 전체)
+            top_k: 병합 결과 수
+            store_quotas: 저장소별 최대 결과 수 (미지정 저장소는 top_k)
+            query_embedding: 미리 계산된 원본 차원 쿼리 임베딩 (대상 저장소가 모두 같은 제공자일 때만 사용)
+        """
+        stores = list(stores) if stores else list(StoreType)
+        quotas = {store_type: (store_quotas or {}).get(store_type, top_k) for store_type in stores}
+        
+        logger.info(f"[knowledge] Search-all: '{query}' in {[s.value for s in stores]} (top_k={top_k})")
+        
+        empty = MultiSearchResponse(query=query, store_types=stores, results=[], total_count=0)
+        
+        # 쿼리 임베딩: 임베딩 제공자별 1회 생성 (저장소마다 벡터 공간이 다를 수 있음)
+        provider_names = {store_type: provider_name_for(store_type.value) for store_type in stores}
+        query_embeddings: Dict[str, List[float]] = {}
+        if query_embedding is not None and len(set(provider_names.values())) == 1:
+            query_embeddings[provider_names[stores[0]]] = query_embedding
+        try:
+            for name in set(provider_names.values()) - set(query_embeddings):
+                query_embeddings[name] = get_embedding_provider(provider=name).embed_query(query)
+        except Exception as e:
+            logger.error(f"[knowledge] Failed to create embedding for query: {e}")
+            return empty
+        
+        # 저장소 병렬 검색 (FAISS 검색은 GIL을 해제하므로 스레드로 병렬화)
+        per_store = await asyncio.gather(*[
+            asyncio.to_thread(
+                self._search_store,
+                query_embeddings[provider_names[store_type]], store_type, quotas[store_type], filter_tags, mmr, max_per_doc,
+            )
+            for store_type in stores
+        ], return_exceptions=True)
+        
+        candidates: List[MultiSearchResult] = []
+        store_counts: Dict[str, int] = {}
+        for store_type, results in zip(stores, per_store):
+            if isinstance(results, Exception):
+                logger.error(f"[knowledge] Failed to search {store_type.value}: {results}")
+                store_counts[store_type.value] = 0
+                continue
+            
+            # 절대 관련도 유지: 원점수 + 저장소별 보정값 (제공자가 달라 점수 분포가 다른 저장소만 보정)
+            offset = self.settings.SEARCH_STORE_SCORE_OFFSETS.get(store_type.value, 0.0)
+            for r in results:
+                candidates.append(MultiSearchResult(
+                    **r.model_dump(exclude={"score"}),
+                    score=r.score + offset,
+                    raw_score=r.score,
+                    store_type=store_type,
+                ))
+            store_counts[store_type.value] = len(results)
+        
+        # 보정 점수 기준 병합 (동점이면 원점수 우선)
+        candidates.sort(key=lambda r: (r.score, r.raw_score), reverse=True)
+        merged = candidates[:top_k]
+        
+        logger.info(f"[knowledge] Search-all merged {len(candidates)} -> {len(merged)} results")
+        
+        return MultiSearchResponse(
+            query=query,
+            store_types=stores,
+            results=merged,
+            total_count=len(merged),
+            store_counts=store_counts,
+        )
+    
+    def _search_store(
+        self,
+        query_embedding: List[float],
+        store_type: StoreType,
+        top_k: int,
+        filter_tags: Optional[List[str]] = None,
+        mmr: Optional[bool] = None,
+        max_per_doc: Optional[int] = None,
+    ) -> List[SearchResult]:
+        """단일 저장소 벡터 검색 (임베딩 완료된 쿼리 기준)
+        
+        쿼리 임베딩은 원본 차원이며, 저장소 차원으로 여기서 축소한다.
+        """
+        # numpy 기반 모듈은 첫 검색 시 로드 (API 시작 시간 단축)
+        from app.integrations.vectorstore.projection import get_store_projection
+        
+        query_embedding = get_store_projection(store_type.value).apply(query_embedding).tolist()
+        
+        use_mmr = self.settings.SEARCH_MMR_ENABLED if mmr is None else mmr
+        if max_per_doc is None:
+            max_per_doc = self.settings.SEARCH_MAX_CHUNKS_PER_DOC
+        diversify = use_mmr or max_per_doc > 0
+        
+        # 다양화 시에는 후보를 넉넉히 가져온 뒤 재선택
+        fetch_k = top_k * self.settings.SEARCH_MMR_FETCH_MULTIPLIER if diversify else top_k
+        
+        # 태그 필터는 백엔드에 위임 (Milvus는 서버 측, FAISS는 검색 중 적용)
+        store = get_vector_store(store_type.value)
+        filter_metadata = {"tags": list(filter_tags)} if filter_tags else None
+        search_results = store.search(query_embedding, top_k=fetch_k, filter_metadata=filter_metadata)
+        
+        # MMR 다양화 / 문서당 상한
+        if diversify and search_results:
+            search_results = self._diversify(
+                store, query_embedding, search_results, top_k, use_mmr, max_per_doc
+            )
+        
+        results = []
+        for chunk_id, score, metadata in search_results[:top_k]:
+            results.append(SearchResult(
+                chunk_id=chunk_id,
+                doc_id=metadata.get("doc_id", ""),
+                score=score,
+                text=metadata.get("text", ""),
+                metadata={
+                    "filename": metadata.get("filename", ""),
+                    "tags": metadata.get("tags", []),
+                    "version": metadata.get("version"),
+                    "chunk_index": metadata.get("chunk_index", 0),
+                },
+            ))
+        
+        return results
+    
+    def _diversify(
+        self,
+        store: VectorStoreBase,
+        query_embedding: List[float],
+        search_results: List[tuple],
+        top_k: int,
+        use_mmr: bool,
+        max_per_doc: int,
+    ) -> List[tuple]:
+        """후보 검색 결과에 MMR 선택 및 문서당 상한 적용"""
+        from app.integrations.vectorstore.mmr import cap_per_group, mmr_select
+        
+        doc_ids = [metadata.get("doc_id", chunk_id) for chunk_id, _, metadata in search_results]
+        
+        if use_mmr:
+            vectors = store.get_vectors([chunk_id for chunk_id, _, _ in search_results])
+            selected = mmr_select(
+                query_embedding,
+                vectors,
+                top_k=top_k,
+                lambda_mult=self.settings.SEARCH_MMR_LAMBDA,
+                group_ids=doc_ids,
+                max_per_group=max_per_doc,
+                duplicate_threshold=self.settings.SEARCH_DUPLICATE_THRESHOLD,
+            )
+        else:
+            selected = cap_per_group(doc_ids, max_per_doc)
+        
+        logger.info(f"[knowledge] Diversified {len(search_results)} candidates -> {min(len(selected), top_k)}")
+        return [search_results[i] for i in selected[:top_k]]
+    
     def list_documents(self, store_type: StoreType) -> List[DocumentInfo]:
-        """문서 목록 조회"""
-        doc_metadata = self._load_doc_metadata(store_type.value)
+        """문서 목록 조회 (전체)"""
+        documents, _ = self.list_documents_page(store_type)
+        return documents
+    
+    def list_documents_page(
+        self,
+        store_type: StoreType,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[DocumentInfo], Optional[str]]:
+        """문서 목록 조회 (커서 페이지네이션)
+        
+        Returns:
+            (문서 목록, 다음 페이지 커서 또는 None)
+        """
+        records, next_cursor = self.catalog.list_records(store_type.value, limit=limit, cursor=cursor)
         
         documents = []
-        for doc_id, meta in doc_metadata.items():
+        for meta in records:
             documents.append(DocumentInfo(
-                doc_id=doc_id,
+                doc_id=meta["doc_id"],
                 filename=meta.get("filename", ""),
                 store_type=StoreType(meta.get("store_type", store_type.value)),
                 status=DocumentStatus(meta.get("status", "completed")),
                 chunk_count=meta.get("chunk_count", 0),
                 tags=meta.get("tags", []),
                 version=meta.get("version"),
-                created_at=datetime.fromisoformat(meta.get("created_at", datetime.now().isoformat())),
+                created_at=datetime.fromisoformat(meta.get("created_at") or datetime.now().isoformat()),
                 metadata=meta.get("metadata", {}),
             ))
         
-        return documents
+        return documents, next_cursor
     
     def delete_document(self, doc_id: str, store_type: StoreType) -> bool:
         """문서 삭제"""
         logger.info(f"[knowledge] Deleting document: {doc_id} from {store_type.value}")
         
-        # 메타데이터에서 문서 정보 조회
-        doc_metadata = self._load_doc_metadata(store_type.value)
-        
-        if doc_id not in doc_metadata:
+        # 카탈로그에서 문서 정보 조회
+        doc_info = self.catalog.get(store_type.value, doc_id)
+        if doc_info is None:
             logger.warning(f"[knowledge] Document not found: {doc_id}")
             return False
         
-        doc_info = doc_metadata[doc_id]
         chunk_count = doc_info.get("chunk_count", 0)
         
         # 청크 ID 목록 생성
         chunk_ids = [f"{doc_id}_{i}" for i in range(chunk_count)]
         
         # 벡터 저장소에서 삭제
-        store = get_faiss_store(store_type.value)
+        store = get_vector_store(store_type.value)
         store.delete(chunk_ids)
         store.save()
         
-        # 메타데이터에서 삭제
-        del doc_metadata[doc_id]
-        self._save_doc_metadata(store_type.value, doc_metadata)
+        # 카탈로그에서 삭제
+        self.catalog.delete(store_type.value, doc_id)
         
         logger.info(f"[knowledge] Deleted document: {doc_id} ({chunk_count} chunks)")
         return True
     
     def get_store_stats(self, store_type: StoreType) -> dict:
-        """저장소 통계"""
-        doc_metadata = self._load_doc_metadata(store_type.value)
-        store = get_faiss_store(store_type.value)
+        """저장소 통계 (카탈로그 카운터, O(1))"""
+        stats = self.catalog.stats(store_type.value)
         
         return {
             "store_type": store_type.value,
-            "document_count": len(doc_metadata),
-            "chunk_count": store.count(),
+            "document_count": stats["document_count"],
+            "chunk_count": stats["chunk_count"],
+            "generation": stats["generation"],
         }
 
 
@@ -0,0 +1,106 @@
+"""검색 결과 캐시 - 저장소 generation 기반 LRU
+
+같은 질의가 같은 저장소/top_k/필터로 반복될 때 ANN 검색과 메타데이터 조립을 생략한다.
+키에 카탈로그의 저장소 generation을 포함하므로, 적재·삭제·스냅샷 복원으로
+generation이 올라가면 이전 항목은 더 이상 조회되지 않고 LRU로 밀려난다
+(다른 워커 프로세스의 변경도 카탈로그 data_version으로 반영됨).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.schemas.knowledge import SearchResponse
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[Hashable, ...]
+
+
+def make_cache_key(
+    store_type: str,
+    generation: int,
+    query: str,
+    top_k: int,
+    filter_tags: Optional[List[str]],
+    mmr: bool,
+    max_per_doc: int,
+) -> CacheKey:
+    """캐시 키 (저장소, generation, 쿼리 해시, top_k, 필터, 다양화 옵션)"""
+    query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    tags = tuple(sorted(set(filter_tags))) if filter_tags else ()
+    return (store_type, generation, query_hash, top_k, tags, mmr, max_per_doc)
+
+
+class SearchCache:
+    """스레드 안전 LRU 캐시 (SearchResponse)"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, SearchResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    def get(self, key: CacheKey) -> Optional[SearchResponse]:
+        """캐시 조회 (호출 측 변경이 캐시에 영향을 주지 않도록 복사본 반환)"""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response.model_copy(deep=True)
+    
+    def put(self, key: CacheKey, response: SearchResponse) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = response.model_copy(deep=True)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """적중률 지표"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# 캐시 싱글톤
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """SearchCache 싱글톤"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(get_settings().SEARCH_CACHE_MAX_ENTRIES)
+    return _cache
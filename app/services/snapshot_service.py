@@ -0,0 +1,311 @@
+"""지식 저장소 스냅샷 서비스 - 인덱스/메타데이터/문서 카탈로그 내보내기·가져오기
+
+신규 노드가 임베딩 API로 전체 문서를 재적재하지 않고,
+검증된 아카이브 하나로 저장소를 복원할 수 있게 한다.
+
+아카이브 구조 (tar.gz):
+    manifest.json                       # 형식 버전, 임베딩 설정, 파일별 sha256/크기
+    stores/{store}/index.faiss
+    stores/{store}/metadata.json
+    stores/{store}/{store}_docs.json    # 문서 카탈로그 덤프 (SQLite 카탈로그에서 생성/복원)
+    stores/{store}/projection.npz       # PCA 축소 저장소만
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.schemas.knowledge import SnapshotFileInfo, SnapshotManifest, SnapshotStoreInfo, StoreType
+from app.integrations.embeddings.registry import get_embedding_provider
+from app.integrations.storage.doc_catalog import get_doc_catalog
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "trace-ai-knowledge-snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+_COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class SnapshotError(ValueError):
+    """스냅샷 형식/무결성 오류"""
+
+
+def _sha256_file(path: Path) -> str:
+    """파일 sha256 (청크 단위)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_COPY_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _require_faiss_backend() -> None:
+    """스냅샷은 파일 기반 FAISS 저장소만 지원"""
+    backend = get_settings().VECTORSTORE_BACKEND.lower()
+    if backend != "faiss":
+        raise SnapshotError(f"Snapshots are supported for the faiss backend only (current: {backend})")
+
+
+def _store_files(store_type: str) -> Dict[str, Path]:
+    """저장소별 스냅샷 대상 파일 (아카이브 내 파일명 -> 로컬 경로)"""
+    from app.integrations.vectorstore.faiss_store import get_faiss_store
+    from app.integrations.vectorstore.projection import PROJECTION_FILENAME, projection_path
+    
+    store = get_faiss_store(store_type)
+    return {
+        store.index_path.name: store.index_path,
+        store.metadata_path.name: store.metadata_path,
+        PROJECTION_FILENAME: projection_path(store_type),
+    }
+
+
+def _docs_name(store_type: str) -> str:
+    """문서 카탈로그 덤프 파일명 (기존 {store}_docs.json 형식 유지)"""
+    return f"{store_type}_docs.json"
+
+
+def export_snapshot(dest: Path, store_types: Optional[List[StoreType]] = None) -> SnapshotManifest:
+    """저장소 스냅샷 아카이브 생성
+    
+    파일을 임시 디렉터리로 복사한 뒤 해시를 계산하므로,
+    내보내는 동안 적재가 일어나도 매니페스트와 내용이 어긋나지 않는다.
+    
+    Args:
+        dest: 생성할 아카이브 경로 (.tar.gz)
+        store_types: 대상 저장소 (None이면 전체)
+    
+    Returns:
+        아카이브에 기록된 매니페스트
+    """
+    from app.integrations.vectorstore.faiss_store import get_faiss_store
+    
+    settings = get_settings()
+    _require_faiss_backend()
+    store_types = list(store_types) if store_types else list(StoreType)
+    
+    with tempfile.TemporaryDirectory(prefix="trace_snapshot_") as staging:
+        staging_dir = Path(staging)
+        stores: Dict[str, SnapshotStoreInfo] = {}
+        
+        for store_type in store_types:
+            store = get_faiss_store(store_type.value)
+            store.save()  # 메모리 상태를 디스크에 반영
+            
+            files: List[SnapshotFileInfo] = []
+            for name, src in _store_files(store_type.value).items():
+                if not src.exists():
+                    continue
+                arcname = f"stores/{store_type.value}/{name}"
+                staged = staging_dir / arcname
+                staged.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(src, staged)
+                files.append(SnapshotFileInfo(
+                    path=arcname,
+                    sha256=_sha256_file(staged),
+                    size=staged.stat().st_size,
+                ))
+            
+            # 문서 카탈로그 덤프
+            docs = get_doc_catalog().export_store(store_type.value)
+            arcname = f"stores/{store_type.value}/{_docs_name(store_type.value)}"
+            staged = staging_dir / arcname
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            staged.write_text(json.dumps(docs, ensure_ascii=False, indent=2), encoding="utf-8")
+            files.append(SnapshotFileInfo(
+                path=arcname,
+                sha256=_sha256_file(staged),
+                size=staged.stat().st_size,
+            ))
+            
+            stores[store_type.value] = SnapshotStoreInfo(
+                files=files,
+                dimension=store.dimension,
+                embedding_provider=get_embedding_provider(store_type.value).model_id,
+                chunk_count=store.count(),
+                document_count=len(docs),
+            )
+        
+        manifest = SnapshotManifest(
+            format=SNAPSHOT_FORMAT,
+            format_version=SNAPSHOT_FORMAT_VERSION,
+            created_at=datetime.now(timezone.utc).isoformat(),
+            embedding_model=settings.EMBEDDING_MODEL,
+            embedding_dimension=settings.EMBEDDING_DIMENSION,
+            stores=stores,
+        )
+        
+        # 매니페스트를 첫 멤버로 기록 (가져오기 시 스트리밍 검증용)
+        manifest_path = staging_dir / MANIFEST_NAME
+        manifest_path.write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+        
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(dest, "w:gz") as tar:
+            tar.add(manifest_path, arcname=MANIFEST_NAME)
+            for info in stores.values():
+                for file_info in info.files:
+                    tar.add(staging_dir / file_info.path, arcname=file_info.path)
+    
+    logger.info(f"[snapshot] Exported {list(stores)} -> {dest}")
+    return manifest
+
+
+def _read_manifest(tar: tarfile.TarFile) -> SnapshotManifest:
+    """스트림의 첫 멤버에서 매니페스트 읽기"""
+    from app.integrations.vectorstore.projection import PROJECTION_FILENAME, get_store_projection
+    
+    member = tar.next()
+    if member is None or member.name != MANIFEST_NAME:
+        raise SnapshotError("Snapshot must start with manifest.json")
+    
+    data = json.loads(tar.extractfile(member).read().decode("utf-8"))
+    manifest = SnapshotManifest(**data)
+    
+    if manifest.format != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Unknown snapshot format: {manifest.format}")
+    if manifest.format_version > SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {manifest.format_version}")
+    
+    # 매니페스트 경로 검증 (허용된 저장소/파일 외 경로 차단)
+    for store_type, info in manifest.stores.items():
+        if store_type not in {s.value for s in StoreType}:
+            raise SnapshotError(f"Unknown store in snapshot: {store_type}")
+        allowed = {f"stores/{store_type}/{name}" for name in [*_store_files(store_type), _docs_name(store_type)]}
+        for file_info in info.files:
+            if file_info.path not in allowed:
+                raise SnapshotError(f"Unexpected path in manifest: {file_info.path}")
+        
+        # 임베딩 제공자 검증 (다른 벡터 공간의 인덱스는 검색 결과가 무의미)
+        server_provider = get_embedding_provider(store_type).model_id
+        if info.embedding_provider and info.embedding_provider != server_provider:
+            raise SnapshotError(
+                f"Embedding provider mismatch for '{store_type}': "
+                f"snapshot={info.embedding_provider}, server={server_provider}"
+            )
+        
+        # 축소 차원 검증 (PCA 투영 파일이 함께 오면 그 차원을 따름)
+        has_projection = any(Path(f.path).name == PROJECTION_FILENAME for f in info.files)
+        expected_dim = get_store_projection(store_type).dimension
+        if info.dimension and not has_projection and info.dimension != expected_dim:
+            raise SnapshotError(
+                f"Store dimension mismatch for '{store_type}': snapshot={info.dimension}, server={expected_dim}"
+            )
+    
+    settings = get_settings()
+    if manifest.embedding_dimension != settings.EMBEDDING_DIMENSION:
+        raise SnapshotError(
+            f"Embedding dimension mismatch: snapshot={manifest.embedding_dimension}, "
+            f"server={settings.EMBEDDING_DIMENSION}"
+        )
+    if manifest.embedding_model != settings.EMBEDDING_MODEL:
+        logger.warning(
+            f"[snapshot] Embedding model differs: snapshot={manifest.embedding_model}, "
+            f"server={settings.EMBEDDING_MODEL}"
+        )
+    return manifest
+
+
+def import_snapshot(fileobj: BinaryIO) -> SnapshotManifest:
+    """스냅샷 아카이브 복원 (스트리밍 + 무결성 검증)
+    
+    아카이브를 스트림으로 한 번만 읽으며 각 파일을 스테이징 디렉터리에 쓰고
+    sha256/크기를 검증한다. 모든 파일이 검증된 뒤에만 저장소 파일을 교체하고
+    인덱스를 다시 로드하므로, 손상된 아카이브가 기존 저장소를 덮어쓰지 않는다.
+    
+    Args:
+        fileobj: 아카이브 바이너리 스트림
+    
+    Returns:
+        복원된 스냅샷의 매니페스트
+    """
+    from app.integrations.vectorstore.faiss_store import get_faiss_store
+    from app.integrations.vectorstore.projection import (
+        PROJECTION_FILENAME,
+        get_store_projection,
+        reset_store_projection,
+    )
+    
+    _require_faiss_backend()
+    
+    with tempfile.TemporaryDirectory(prefix="trace_restore_") as staging:
+        staging_dir = Path(staging)
+        
+        try:
+            with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+                manifest = _read_manifest(tar)
+                expected = {
+                    file_info.path: file_info
+                    for info in manifest.stores.values()
+                    for file_info in info.files
+                }
+                received = set()
+                
+                member = tar.next()
+                while member is not None:
+                    file_info = expected.get(member.name)
+                    if file_info is None or not member.isfile():
+                        raise SnapshotError(f"Unexpected member in snapshot: {member.name}")
+                    
+                    target = staging_dir / member.name
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    digest = hashlib.sha256()
+                    size = 0
+                    source = tar.extractfile(member)
+                    with open(target, "wb") as out:
+                        for block in iter(lambda: source.read(_COPY_CHUNK_SIZE), b""):
+                            digest.update(block)
+                            size += len(block)
+                            out.write(block)
+                    
+                    if size != file_info.size or digest.hexdigest() != file_info.sha256:
+                        raise SnapshotError(f"Checksum mismatch: {member.name}")
+                    received.add(member.name)
+                    member = tar.next()
+        except (tarfile.TarError, EOFError, gzip.BadGzipFile) as e:
+            raise SnapshotError(f"Corrupted snapshot archive: {e}") from e
+        
+        missing = set(expected) - received
+        if missing:
+            raise SnapshotError(f"Snapshot is missing files: {sorted(missing)}")
+        
+        # 검증 완료 후 저장소별로 교체 및 재로드
+        for store_type, info in manifest.stores.items():
+            targets = _store_files(store_type)
+            restored_names = {Path(file_info.path).name for file_info in info.files}
+            for file_info in info.files:
+                name = Path(file_info.path).name
+                if name == _docs_name(store_type):
+                    docs = json.loads((staging_dir / file_info.path).read_text(encoding="utf-8"))
+                    get_doc_catalog().replace_store(store_type, docs)
+                    continue
+                dest = targets[name]
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                staged = staging_dir / file_info.path
+                # 같은 파일시스템이 아닐 수 있으므로 대상 옆에 복사 후 원자적 교체
+                tmp_dest = dest.with_name(dest.name + ".restore")
+                shutil.copyfile(staged, tmp_dest)
+                os.replace(tmp_dest, dest)
+            
+            # 스냅샷에 없는 투영 파일은 제거 (이전 PCA 설정 잔존 방지)
+            stale = targets[PROJECTION_FILENAME]
+            if PROJECTION_FILENAME not in restored_names and stale.exists():
+                stale.unlink()
+            
+            reset_store_projection(store_type)
+            store = get_faiss_store(store_type)
+            store.dimension = get_store_projection(store_type).dimension
+            store.load()
+            logger.info(f"[snapshot] Restored store '{store_type}' ({info.chunk_count} chunks)")
+    
+    return manifest
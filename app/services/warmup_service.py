@@ -0,0 +1,182 @@
+"""시작 시 사전 로드/워밍업 - 인덱스, 그래프, 클라이언트 초기화 및 준비 상태 관리
+
+지연 초기화(get_faiss_store, get_graph, get_openrouter_client 등)를 서버 시작 단계로
+당겨, 배포 직후 첫 요청이 인덱스 로드·그래프 컴파일 비용을 떠안지 않게 한다.
+워밍업이 끝나기 전까지 /health 는 준비되지 않음(503)을 반환한다.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+WarmupStatus = Literal["pending", "warming_up", "ready", "failed", "skipped"]
+
+
+class ComponentTiming(BaseModel):
+    """구성 요소별 초기화 결과"""
+    status: Literal["ok", "failed"] = "ok"
+    duration_ms: float = 0.0
+    detail: Optional[str] = None
+    error: Optional[str] = None
+
+
+class WarmupState(BaseModel):
+    """워밍업 진행 상태"""
+    status: WarmupStatus = "pending"
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+    components: Dict[str, ComponentTiming] = Field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "skipped")
+
+
+_state = WarmupState()
+_lock = threading.Lock()
+
+
+def get_warmup_state() -> WarmupState:
+    """현재 워밍업 상태 (복사본)"""
+    with _lock:
+        return _state.model_copy(deep=True)
+
+
+def _run_component(name: str, func: Callable[[], Optional[str]]) -> bool:
+    """구성 요소 하나 초기화 및 소요 시간 기록"""
+    start = time.perf_counter()
+    try:
+        detail = func()
+        timing = ComponentTiming(duration_ms=(time.perf_counter() - start) * 1000, detail=detail)
+    except Exception as e:
+        logger.error(f"[warmup] {name} failed: {e}", exc_info=True)
+        timing = ComponentTiming(
+            status="failed",
+            duration_ms=(time.perf_counter() - start) * 1000,
+            error=str(e),
+        )
+
+    with _lock:
+        _state.components[name] = timing
+    logger.info(f"[warmup] {name}: {timing.status} ({timing.duration_ms:.1f}ms)")
+    return timing.status == "ok"
+
+
+def _init_llm_client() -> str:
+    from app.integrations.llm.openrouter_client import get_openrouter_client
+
+    client = get_openrouter_client()
+    return client.llm_model
+
+
+def _init_embedding_provider(name: str) -> Callable[[], str]:
+    def init() -> str:
+        from app.integrations.embeddings.registry import get_embedding_provider
+        
+        provider = get_embedding_provider(provider=name)
+        return f"{provider.model_id} (dim={provider.dimension})"
+    return init
+
+
+def _load_store(store_type: str) -> Callable[[], str]:
+    def load() -> str:
+        from app.integrations.vectorstore.registry import get_vector_store
+
+        store = get_vector_store(store_type)
+        return f"{store.count()} vectors"
+    return load
+
+
+def _compile_graph(getter_path: str) -> Callable[[], None]:
+    def compile_graph() -> None:
+        module_name, getter = getter_path.rsplit(".", 1)
+        getattr(importlib.import_module(module_name), getter)()
+    return compile_graph
+
+
+def _warmup_search(store_type: str, searches: int) -> Callable[[], str]:
+    """임의 단위 벡터로 검색 경로(투영·검색·MMR)를 실제로 실행"""
+    def search() -> str:
+        import numpy as np
+        
+        from app.integrations.vectorstore.projection import get_store_projection
+        from app.schemas.knowledge import StoreType
+        from app.services.knowledge_service import get_knowledge_service
+
+        service = get_knowledge_service()
+        dimension = get_store_projection(store_type).source_dimension
+        rng = np.random.default_rng(0)
+        hits = 0
+        for _ in range(searches):
+            vector = rng.standard_normal(dimension).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            hits += len(service._search_store(vector.tolist(), StoreType(store_type), top_k=5, mmr=True))
+        return f"{searches} searches, {hits} hits"
+    return search
+
+
+def run_warmup() -> WarmupState:
+    """전체 워밍업 실행 (동기, 스레드에서 호출)
+
+    구성 요소 하나가 실패해도 나머지는 계속 초기화하며,
+    실패가 있으면 상태는 failed 로 남아 /health 가 준비되지 않음을 보고한다.
+    """
+    from app.schemas.knowledge import StoreType
+
+    settings = get_settings()
+    started = time.perf_counter()
+    with _lock:
+        _state.status = "warming_up"
+        _state.started_at = datetime.now(timezone.utc)
+        _state.components = {}
+    logger.info("[warmup] Starting warmup")
+
+    from app.integrations.embeddings.registry import provider_name_for
+
+    ok = _run_component("llm_client", _init_llm_client)
+
+    # 로컬 임베딩 모델(onnx)은 로드 비용이 크므로 시작 시 미리 로드
+    for name in sorted({provider_name_for(store_type.value) for store_type in StoreType}):
+        ok &= _run_component(f"embeddings.{name}", _init_embedding_provider(name))
+
+    for store_type in StoreType:
+        ok &= _run_component(f"vectorstore.{store_type.value}", _load_store(store_type.value))
+
+    for name, getter in (
+        ("graph.main", "app.agent.orchestrator.get_graph"),
+        ("graph.compliance", "app.agent.subgraphs.compliance_graph.get_compliance_graph"),
+        ("graph.rca", "app.agent.subgraphs.rca_graph.get_rca_graph"),
+        ("graph.workflow", "app.agent.subgraphs.workflow_graph.get_workflow_graph"),
+    ):
+        ok &= _run_component(name, _compile_graph(getter))
+
+    if settings.WARMUP_SEARCHES > 0:
+        for store_type in StoreType:
+            ok &= _run_component(
+                f"search.{store_type.value}",
+                _warmup_search(store_type.value, settings.WARMUP_SEARCHES),
+            )
+
+    with _lock:
+        _state.status = "ready" if ok else "failed"
+        _state.finished_at = datetime.now(timezone.utc)
+        _state.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"[warmup] Finished: {_state.status} ({_state.duration_ms:.1f}ms)")
+        return _state.model_copy(deep=True)
+
+
+def mark_warmup_skipped() -> None:
+    """워밍업 비활성화 시 (기존 지연 초기화 동작)"""
+    with _lock:
+        _state.status = "skipped"
@@ -0,0 +1,75 @@
+"""체크포인트 저장소 테스트 - 압축 직렬화 / 보존 기간 정리 (저장 자체는 langgraph SqliteSaver)"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.agent import checkpoint
+from app.agent.checkpoint import CompressingSerializer
+from app.core.config import get_settings
+
+
+@pytest.fixture
+def saver(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_BACKEND", "sqlite")
+    monkeypatch.setenv("CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+    get_settings.cache_clear()
+    checkpoint.get_checkpointer.cache_clear()
+
+    yield checkpoint.get_checkpointer()
+
+    checkpoint.get_checkpointer.cache_clear()
+    get_settings.cache_clear()
+
+
+def put_checkpoint(saver, thread_id: str, age_hours: float, value: str = "x") -> None:
+    stored = empty_checkpoint()
+    stored["ts"] = (datetime.now(timezone.utc) - timedelta(hours=age_hours)).isoformat()
+    stored["channel_values"] = {"user_input": value}
+    stored["channel_versions"] = {"user_input": saver.get_next_version(None, None)}
+    saver.put(
+        {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}},
+        stored, {"source": "loop", "step": 1}, stored["channel_versions"],
+    )
+
+
+def test_compressing_serializer_round_trip():
+    serde = CompressingSerializer(JsonPlusSerializer())
+    large = {"evidence": ["같은 문장 반복 " * 50] * 20}
+
+    type_, data = serde.dumps_typed(large)
+    assert type_.endswith("+zlib")
+    assert len(data) < len(JsonPlusSerializer().dumps_typed(large)[1])
+    assert serde.loads_typed((type_, data)) == large
+
+    # 작은 값과 압축 없이 저장된 값은 그대로
+    small_typed = serde.dumps_typed({"a": 1})
+    assert not small_typed[0].endswith("+zlib")
+    assert serde.loads_typed(JsonPlusSerializer().dumps_typed(large)) == large
+
+
+def test_saver_persists_compressed_values(saver):
+    payload = "증거 청크 " * 500
+    put_checkpoint(saver, "run-large", age_hours=0, value=payload)
+
+    saved = saver.get_tuple(checkpoint.thread_config("run-large"))
+    assert saved.checkpoint["channel_values"]["user_input"] == payload
+    with saver.cursor(transaction=False) as cur:
+        (type_,) = cur.execute("SELECT type FROM checkpoints WHERE thread_id = 'run-large'").fetchone()
+    assert type_.endswith("+zlib")
+
+
+def test_delete_expired_checkpoints_keeps_recent_runs(saver):
+    put_checkpoint(saver, "run-old", age_hours=100)
+    put_checkpoint(saver, "run-recent", age_hours=1)
+    # 마지막 체크포인트가 최근이면 이전 체크포인트가 오래되었어도 유지
+    put_checkpoint(saver, "run-resumed", age_hours=100)
+    put_checkpoint(saver, "run-resumed", age_hours=0)
+
+    assert sorted(checkpoint.list_thread_ids()) == ["run-old", "run-recent", "run-resumed"]
+    assert checkpoint.delete_expired_checkpoints(retention_hours=72) == ["run-old"]
+    assert sorted(checkpoint.list_thread_ids()) == ["run-recent", "run-resumed"]
+    assert saver.get_tuple(checkpoint.thread_config("run-old")) is None
@@ -0,0 +1,111 @@
+"""승인 대기 중단/재개 테스트 - 허용된 CHECKPOINT_DURABILITY 값마다 실행
+
+LLM은 고정 응답 클라이언트로 대체하고, 임베딩은 로컬 hashing 제공자를 쓴다 (네트워크 불필요).
+"""
+from __future__ import annotations
+
+import json
+from typing import get_args
+
+import pytest
+
+from app.core.config import Settings, get_settings
+from app.integrations.llm.usage import record_usage
+
+DURABILITY_MODES = get_args(Settings.model_fields["CHECKPOINT_DURABILITY"].annotation)
+
+PLAN = {
+    "action_plan": [{
+        "step": 1, "title": "배포", "description": "운영 서버 배포", "risk_level": "high",
+        "requires_approval": True, "estimated_duration": "1h", "rollback_plan": None,
+    }],
+    "total_steps": 1,
+    "overall_risk": "high",
+    "approvals_required": ["운영 배포"],
+    "summary": "배포 계획",
+}
+
+
+class FixedLLMClient:
+    """시스템 프롬프트로 노드를 구분해 고정 JSON을 돌려주는 LLM 클라이언트"""
+
+    def chat_with_system(self, system_prompt, user_message, **kwargs):
+        # 실제 클라이언트처럼 호출 사용량을 run에 기록
+        record_usage("chat", "fixed-model", 1.0)
+        if "분류하는" in system_prompt[:40]:
+            return json.dumps({"intent": "mixed", "capabilities": ["compliance", "workflow"], "reason": "test"})
+        if "규정 및 정책" in system_prompt[:40]:
+            return json.dumps({"status": "no_violation", "violations": [], "recommendations": [], "summary": "ok"})
+        return json.dumps(PLAN)
+
+    def chat_with_system_stream(self, system_prompt, user_message, **kwargs):
+        yield self.chat_with_system(system_prompt, user_message)
+
+
+@pytest.fixture
+def agent_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("KNOWLEDGE_STORE_DIR", str(tmp_path / "knowledge"))
+    monkeypatch.setenv("FAISS_INDEX_DIR", str(tmp_path / "faiss"))
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "hashing")
+    monkeypatch.setenv("CHECKPOINT_BACKEND", "sqlite")
+    get_settings.cache_clear()
+
+    from app.agent import checkpoint, orchestrator
+    from app.agent.nodes import classify_intent
+    from app.agent.subgraphs import compliance_graph, rca_graph, workflow_graph
+    from app.services import audit_service
+
+    (tmp_path / "audit").mkdir()
+    monkeypatch.setattr(audit_service, "AUDIT_DIR", tmp_path / "audit")
+    checkpoint.get_checkpointer.cache_clear()
+    orchestrator.get_graph.cache_clear()
+    client = FixedLLMClient()
+    for module in (classify_intent, compliance_graph, rca_graph, workflow_graph):
+        monkeypatch.setattr(module, "get_openrouter_client", lambda: client)
+
+    yield tmp_path / "audit"
+
+    checkpoint.get_checkpointer.cache_clear()
+    orchestrator.get_graph.cache_clear()
+    get_settings.cache_clear()
+
+
+@pytest.mark.parametrize("durability", DURABILITY_MODES)
+def test_pause_and_resume_under_each_durability(agent_env, monkeypatch, durability):
+    from app.core.run_context import set_run_id
+    from app.services.agent_service import load_paused_run, resume_after_approval, run_agent
+
+    monkeypatch.setattr(get_settings(), "CHECKPOINT_DURABILITY", durability)
+    run_id = f"durability-{durability}"
+    set_run_id(run_id)
+
+    paused = run_agent("비밀번호 정책 확인하고 운영 배포 계획 세워줘")
+    assert paused["errors"] == []
+    assert paused["approval_status"] == "pending"
+    assert paused["trace"]["mixed_summary"]["executed_subgraphs"] == 2
+    assert load_paused_run(run_id) is not None
+
+    resumed = resume_after_approval(run_id)
+    assert resumed["errors"] == []
+    assert resumed["approval_status"] == "approved"
+    assert "execute" in resumed["trace"]
+    assert load_paused_run(run_id) is None
+
+
+def test_resumed_run_audit_keeps_metrics_from_before_pause(agent_env):
+    from app.core.run_context import set_run_id
+    from app.services.agent_service import resume_after_approval, run_agent
+
+    run_id = "resume-metrics"
+    set_run_id(run_id)
+    paused = run_agent("비밀번호 정책 확인하고 운영 배포 계획 세워줘")
+    assert paused["approval_status"] == "pending"
+
+    resume_after_approval(run_id)
+    audit = json.loads((agent_env / f"audit_{run_id}.json").read_text(encoding="utf-8"))
+
+    # 임베딩 / 프리페치 / LLM 호출은 모두 중단 전에 일어남 (빈 저장소라 compliance 분석은 건너뜀)
+    assert audit["trace_summary"]["embeddings"]["calls"] >= 1
+    assert audit["trace_summary"]["retrieval_prefetch"]["used"]
+    assert {"CLASSIFY_INTENT", "MIXED/GENERATE_ACTION_PLAN"} <= set(audit["usage"]["by_node"])
@@ -0,0 +1,33 @@
+"""API 시작 import 시간 회귀 테스트 (scripts/bench_import_time.py 를 새 프로세스로 실행)"""
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BENCH = ROOT / "scripts" / "bench_import_time.py"
+
+# 지연 로드 전 약 2.0s, 이후 약 0.4~0.6s (느린 CI는 IMPORT_TIME_BUDGET_MS 로 조정)
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+
+
+def run_bench() -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(BENCH), "--runs", "3", "--top", "0", "--budget-ms", str(BUDGET_MS)],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+    )
+
+
+def test_startup_import_within_budget_and_defers_heavy_modules():
+    proc = run_bench()
+
+    match = re.search(r"median=([\d.]+)ms", proc.stdout)
+    assert match, proc.stdout + proc.stderr
+    assert float(match.group(1)) <= BUDGET_MS, proc.stdout
+
+    # faiss / numpy / pdfplumber / langgraph / openai 등은 첫 요청·워밍업 시점에 로드되어야 함
+    assert "heavy modules imported at startup" not in proc.stdout, proc.stdout
+    assert proc.returncode == 0, proc.stdout + proc.stderr
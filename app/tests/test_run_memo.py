@@ -0,0 +1,86 @@
+"""run 메모 테스트 - key별 동시 계산 / 해제 후 재생성 방지 / 해제 시 백그라운드 작업 정리"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import run_context
+from app.core.run_context import clear_run_memo, find_run_memo, get_run_memo, set_run_id
+from app.integrations.llm import usage
+
+
+class Closable:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_find_run_memo_does_not_create():
+    assert find_run_memo("memo-missing") is None
+    assert "memo-missing" not in run_context._run_memos
+
+
+def test_clear_run_memo_closes_values():
+    value = Closable()
+    get_run_memo("memo-close").get_or_compute("prefetch", lambda: value)
+
+    clear_run_memo("memo-close")
+    assert value.closed
+    assert find_run_memo("memo-close") is None
+
+
+def test_usage_recorded_after_run_end_does_not_recreate_memo(monkeypatch):
+    # 그래프 노드 안에서 시작되어 run 종료 후 끝난 호출 (폐기된 추측 검색 등)
+    monkeypatch.setattr(usage, "current_node", lambda: "CLASSIFY_INTENT")
+    set_run_id("memo-ended")
+    get_run_memo("memo-ended")
+    usage.record_usage("embedding", "test-model", 1.0)
+    assert len(find_run_memo("memo-ended").items(usage.USAGE_RECORDS)) == 1
+
+    clear_run_memo("memo-ended")
+    usage.record_usage("embedding", "test-model", 1.0)
+    assert find_run_memo("memo-ended") is None
+
+
+def test_get_or_compute_does_not_block_other_keys_and_computes_once():
+    memo = get_run_memo("memo-concurrent")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        release.wait(timeout=5)
+        return "slow-value"
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        first = executor.submit(memo.get_or_compute, "slow", slow)
+        assert started.wait(timeout=5)
+        waiter = executor.submit(memo.get_or_compute, "slow", slow)
+
+        # 다른 key는 느린 계산이 끝나길 기다리지 않음
+        other = executor.submit(memo.get_or_compute, "fast", lambda: "fast-value")
+        assert other.result(timeout=1) == ("fast-value", False)
+        assert not waiter.done()
+
+        release.set()
+        assert first.result(timeout=5) == ("slow-value", False)
+        assert waiter.result(timeout=5) == ("slow-value", True)
+    assert calls == ["slow"]
+    clear_run_memo("memo-concurrent")
+
+
+def test_get_or_compute_failure_propagates_and_allows_retry():
+    memo = get_run_memo("memo-failure")
+
+    def fail():
+        raise RuntimeError("embedding down")
+
+    with pytest.raises(RuntimeError):
+        memo.get_or_compute("key", fail)
+    assert memo.get_or_compute("key", lambda: 1) == (1, False)
+    clear_run_memo("memo-failure")
@@ -0,0 +1,47 @@
+"""벡터 저장소 메타데이터 필터 테스트 - 백엔드별 태그('하나라도 포함') / doc_id 필터 동작 일치"""
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import get_settings
+from app.integrations.vectorstore.faiss_store import FAISSVectorStore
+from app.integrations.vectorstore.milvus_store import MilvusVectorStore
+
+DIMENSION = 4
+
+CHUNKS = [
+    ("c0", [1.0, 0.0, 0.0, 0.0], {"doc_id": "d0", "tags": ["보안"]}),
+    ("c1", [0.9, 0.1, 0.0, 0.0], {"doc_id": "d0", "tags": ["배포"]}),
+    ("c2", [0.8, 0.2, 0.0, 0.0], {"doc_id": "d1", "tags": ["보안", "네트워크"]}),
+    ("c3", [0.7, 0.3, 0.0, 0.0], {"doc_id": "d1", "tags": []}),
+]
+
+
+@pytest.fixture(params=["faiss", "milvus"])
+def store(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAISS_INDEX_DIR", str(tmp_path / "faiss"))
+    monkeypatch.setenv("VECTORSTORE_MILVUS_URI", str(tmp_path / "milvus" / "test.db"))
+    monkeypatch.setenv("VECTORSTORE_MILVUS_COLLECTION", "filter_test")
+    get_settings.cache_clear()
+
+    backend = FAISSVectorStore if request.param == "faiss" else MilvusVectorStore
+    store = backend("policy", dimension=DIMENSION)
+    ids, embeddings, metadatas = zip(*CHUNKS)
+    store.add(list(embeddings), list(metadatas), list(ids))
+
+    yield store
+
+    get_settings.cache_clear()
+
+
+def test_tag_filter_matches_any_tag(store):
+    results = store.search([1.0, 0.0, 0.0, 0.0], top_k=2, filter_metadata={"tags": ["보안"]})
+    assert [chunk_id for chunk_id, _, _ in results] == ["c0", "c2"]
+
+    results = store.search([1.0, 0.0, 0.0, 0.0], top_k=5, filter_metadata={"tags": ["배포", "네트워크"]})
+    assert [chunk_id for chunk_id, _, _ in results] == ["c1", "c2"]
+
+
+def test_doc_id_and_tag_filters_combine(store):
+    results = store.search([1.0, 0.0, 0.0, 0.0], top_k=5, filter_metadata={"doc_id": "d1", "tags": ["보안"]})
+    assert [chunk_id for chunk_id, _, _ in results] == ["c2"]
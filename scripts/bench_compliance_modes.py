@@ -0,0 +1,153 @@
+"""규정 준수 분석 모드 벤치마크 (single_pass vs two_pass)
+
+scripts/fixtures 의 질의(query)와 규정 문서(test_policy.txt, demo/demo_docs/policy_*.txt)
+청크를 증거로 ANALYZE_COMPLIANCE → (필요 시) GENERATE_RECOMMENDATION 을 모드별로 실행하여
+지연(p50/p95), LLM 호출 수, 후속 호출 비율을 비교한다. 기본은 실제 LLM을 호출하며
+(OPENROUTER_API_KEY 필요), --simulate-ms 를 주면 호출당 고정 지연의 모의 응답으로 실행한다.
+
+Usage:
+    python scripts/bench_compliance_modes.py --repeat 3
+    python scripts/bench_compliance_modes.py --simulate-ms 800
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.agent.state import AgentState, merge_trace  # noqa: E402
+from app.agent.subgraphs import compliance_graph  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.run_context import set_run_id  # noqa: E402
+from app.integrations.parsers.text_parser import chunk_text  # noqa: E402
+
+MODES = ["single_pass", "two_pass"]
+
+
+class SimulatedClient:
+    """호출당 고정 지연 후 모의 JSON 응답 (네트워크 없이 호출 수·지연 구조만 비교)"""
+
+    def __init__(self, latency_ms: float):
+        self.latency_s = latency_ms / 1000
+        self.calls = 0
+
+    def chat_with_system(self, system_prompt: str, user_message: str, model=None) -> str:
+        self.calls += 1
+        time.sleep(self.latency_s)
+        if system_prompt == compliance_graph.RECOMMENDATION_SYSTEM_PROMPT:
+            return json.dumps(["특수문자를 포함한 8자 이상 비밀번호로 변경하세요."], ensure_ascii=False)
+        result = {
+            "status": "violation",
+            "violations": [{
+                "rule_name": "비밀번호 정책", "rule_content": "8자 이상, 특수문자 포함",
+                "violation_detail": "특수문자 없음", "severity": "high",
+            }],
+            "summary": "비밀번호 정책 위반",
+        }
+        if compliance_graph.RECOMMENDATIONS_FORMAT in system_prompt:
+            result["recommendations"] = ["특수문자를 포함한 8자 이상 비밀번호로 변경하세요."]
+        return json.dumps(result, ensure_ascii=False)
+
+    def chat_with_system_stream(self, system_prompt: str, user_message: str, model=None) -> Iterator[str]:
+        yield self.chat_with_system(system_prompt, user_message, model)
+
+
+def load_queries() -> list[str]:
+    queries = []
+    for path in sorted((ROOT / "scripts" / "fixtures").glob("*.json")):
+        query = json.loads(path.read_text(encoding="utf-8-sig")).get("query")
+        if query:
+            queries.append(query)
+    return queries
+
+
+def load_policy_evidence() -> list[dict]:
+    paths = [ROOT / "scripts" / "fixtures" / "test_policy.txt", *sorted((ROOT / "demo" / "demo_docs").glob("policy_*.txt"))]
+    evidence = []
+    for path in paths:
+        if not path.exists():
+            continue
+        for i, text in enumerate(chunk_text(path.read_text(encoding="utf-8-sig"))):
+            evidence.append({
+                "type": "policy", "doc_id": path.stem, "content": text,
+                "score": 1.0 - i * 0.01, "metadata": {"chunk_index": i},
+            })
+    return evidence
+
+
+def apply_update(state: AgentState, update: dict) -> AgentState:
+    """노드 반환값 적용 (그래프처럼 trace는 리듀서로 병합)"""
+    return state.model_copy(update={**update, "trace": merge_trace(state.trace, update.get("trace", {}))})
+
+
+def run_once(query: str, evidence: list[dict]) -> tuple[float, bool]:
+    """분석(+후속) 1회 실행 → (지연 ms, 후속 호출 여부)"""
+    run_id = f"bench-{uuid.uuid4()}"
+    set_run_id(run_id)
+    state = AgentState(run_id=run_id, user_input=query, evidence=evidence)
+
+    start = time.perf_counter()
+    state = apply_update(state, compliance_graph.analyze_compliance_node(state))
+    follow_up = compliance_graph.route_after_analysis(state) == "GENERATE_RECOMMENDATION"
+    if follow_up:
+        state = apply_update(state, compliance_graph.generate_recommendation_node(state))
+    return (time.perf_counter() - start) * 1000, follow_up
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compliance single_pass vs two_pass latency benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="질의당 반복 횟수")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--simulate-ms", type=float, default=0, help="모의 LLM 호출 지연 (0 = 실제 LLM)")
+    args = parser.parse_args()
+
+    queries, evidence = load_queries(), load_policy_evidence()
+    if not queries:
+        print("No fixture queries in scripts/fixtures")
+        return 1
+
+    settings = get_settings()
+    if args.simulate_ms:
+        client = SimulatedClient(args.simulate_ms)
+        compliance_graph.get_openrouter_client = lambda: client
+    else:
+        from app.integrations.llm.openrouter_client import get_openrouter_client
+        client = get_openrouter_client()
+        # 같은 질의 반복이 합치기/캐시 없이 매번 업스트림으로 가도록
+        client.coalesce = False
+
+    print(f"queries={len(queries)} evidence_chunks={len(evidence)} repeat={args.repeat} "
+          f"backend={'simulated %.0fms' % args.simulate_ms if args.simulate_ms else settings.LLM_MODEL}\n")
+    print(f"{'mode':<12} {'p50_ms':>9} {'p95_ms':>9} {'mean_ms':>9} {'calls/run':>10} {'follow_up':>10}")
+    for mode in args.modes:
+        settings.COMPLIANCE_MODE = mode
+        calls_before = getattr(client, "calls", 0)
+        latencies, follow_ups = [], 0
+        for query in queries:
+            for _ in range(args.repeat):
+                latency_ms, follow_up = run_once(query, evidence)
+                latencies.append(latency_ms)
+                follow_ups += follow_up
+
+        runs = len(latencies)
+        calls = f"{(client.calls - calls_before) / runs:.2f}" if args.simulate_ms else f"{1 + follow_ups / runs:.2f}"
+        print(f"{mode:<12} {percentile(latencies, 50):9.1f} {percentile(latencies, 95):9.1f} "
+              f"{statistics.mean(latencies):9.1f} {calls:>10} {follow_ups / runs:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""임베딩 제공자 벤치마크 (오프라인, 재현 가능)
+
+문서 디렉터리(기본: demo/demo_docs)를 청킹한 뒤 제공자별로
+배치 임베딩 처리량(chunks/s), 단일 쿼리 지연(p50/p95)을 측정하고,
+같은 입력을 두 번 임베딩해 결과가 동일한지(결정성) 확인한다.
+hashing/onnx 제공자는 네트워크 없이 실행된다.
+
+Usage:
+    python scripts/bench_embeddings.py --provider hashing
+    python scripts/bench_embeddings.py --provider onnx --docs path/to/docs --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.integrations.embeddings.registry import get_embedding_provider, list_providers  # noqa: E402
+from app.integrations.parsers.text_parser import chunk_text  # noqa: E402
+
+
+def load_chunks(docs_dir: Path) -> list[str]:
+    chunks = []
+    for path in sorted(docs_dir.glob("*")):
+        if path.suffix.lower() in (".txt", ".md", ".markdown"):
+            chunks.extend(chunk_text(path.read_text(encoding="utf-8")))
+    return chunks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Embedding provider benchmark")
+    parser.add_argument("--provider", default="hashing", choices=list_providers())
+    parser.add_argument("--docs", type=Path, default=ROOT / "demo" / "demo_docs")
+    parser.add_argument("--repeat", type=int, default=3, help="코퍼스 반복 횟수 (배치 크기 확대)")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.docs) * args.repeat
+    if not chunks:
+        print(f"No text documents in {args.docs}")
+        return 1
+
+    provider = get_embedding_provider(provider=args.provider)
+    print(f"provider={provider.model_id} dim={provider.dimension} chunks={len(chunks)}")
+
+    start = time.perf_counter()
+    first = np.asarray(provider.embed(chunks), dtype=np.float32)
+    batch_s = time.perf_counter() - start
+    print(f"batch embed: {batch_s * 1000:.1f}ms ({len(chunks) / batch_s:.0f} chunks/s)")
+
+    latencies = []
+    for i in range(args.queries):
+        query = chunks[i % len(chunks)][:64]
+        start = time.perf_counter()
+        provider.embed_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"query embed: p50={statistics.median(latencies):.2f}ms p95={p95:.2f}ms")
+
+    second = np.asarray(provider.embed(chunks), dtype=np.float32)
+    deterministic = np.array_equal(first, second)
+    print(f"deterministic: {deterministic}")
+    return 0 if deterministic else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
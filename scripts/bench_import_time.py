@@ -0,0 +1,85 @@
+"""API 시작 import 시간 벤치마크 / 예산 검사
+
+`python -X importtime -c "import app.main"` 를 새 프로세스로 여러 번 실행해
+app.main 누적 import 시간(중앙값)과 가장 무거운 모듈을 보고한다.
+--budget-ms 를 넘거나, 시작 시 로드되면 안 되는 무거운 의존성이 import 되면
+종료 코드 1을 반환하므로 CI 회귀 검사로 사용할 수 있다.
+
+Usage:
+    python scripts/bench_import_time.py
+    python scripts/bench_import_time.py --budget-ms 1500 --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 워밍업/첫 요청 시점에 로드되어야 하는 무거운 의존성
+DEFERRED_MODULES = ["faiss", "numpy", "pdfplumber", "langgraph", "langchain_core", "openai", "pymilvus"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(target: str) -> tuple[float, dict, list]:
+    """새 인터프리터에서 import 후 (누적 ms, 모듈별 누적 ms, 로드된 지연 대상 모듈)"""
+    code = (
+        f"import {target}, sys, json; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2)) / 1000
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return cumulative.get(target, 0.0), cumulative, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup import-time benchmark")
+    parser.add_argument("--target", default="app.main", help="측정할 모듈")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="출력할 무거운 모듈 수")
+    parser.add_argument("--budget-ms", type=float, default=0, help="중앙값 예산 (0 = 검사 안 함)")
+    parser.add_argument("--allow-deferred", action="store_true", help="무거운 의존성 로드 검사 생략")
+    args = parser.parse_args()
+
+    totals, last, loaded = [], {}, []
+    for _ in range(args.runs):
+        total, last, loaded = run_once(args.target)
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"{args.target}: median={median:.1f}ms min={min(totals):.1f}ms max={max(totals):.1f}ms (runs={args.runs})")
+    print(f"\nTop {args.top} modules by cumulative import time (last run):")
+    for name, ms in sorted(last.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {ms:9.1f}ms  {name}")
+
+    failed = False
+    if loaded and not args.allow_deferred:
+        print(f"\nFAIL: heavy modules imported at startup: {loaded}")
+        failed = True
+    if args.budget_ms and median > args.budget_ms:
+        print(f"\nFAIL: median {median:.1f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    if not failed and (args.budget_ms or not args.allow_deferred):
+        print("\nOK: within import budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
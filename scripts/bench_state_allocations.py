@@ -0,0 +1,200 @@
+"""에이전트 상태 복사/할당 벤치마크
+
+임시 디렉터리에 데모 문서(demo/demo_docs)를 hashing 임베딩으로 적재하고, 모의 LLM 응답으로
+메인 그래프를 mixed 의도(전체 서브그래프)로 실행하면서 run당 다음을 측정한다 (네트워크 없음).
+
+- state_builds: 노드 입력마다 만들어지는 AgentState 검증 횟수
+- model_dumps: AgentState.model_dump() 호출 횟수
+- containers_copied: 검증/덤프로 새로 만들어진 dict/list 수 (입력과 같은 객체로 유지된 값은 제외)
+- peak_kib: run 중 tracemalloc 최대 사용량 (run 시작 시점 대비)
+
+--attachment-kb 로 첨부 로그 크기를, --evidence-copies 로 증거 청크 수를 키워 상태 크기의 영향을 본다.
+
+Usage:
+    python scripts/bench_state_allocations.py --runs 5
+    python scripts/bench_state_allocations.py --attachment-kb 1024 --evidence-copies 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# 설정 로드 전에 임시 저장소/hashing 임베딩 지정
+WORK_DIR = Path(tempfile.mkdtemp(prefix="bench-state-"))
+os.environ.update({
+    "DATA_DIR": str(WORK_DIR),
+    "KNOWLEDGE_STORE_DIR": str(WORK_DIR / "knowledge"),
+    "FAISS_INDEX_DIR": str(WORK_DIR / "faiss"),
+    "EMBEDDING_PROVIDER": "hashing",
+    "EMBEDDING_STORE_PROVIDERS": "{}",
+})
+os.chdir(WORK_DIR)
+
+RESPONSES = {
+    "분류하는": {"intent": "mixed", "capabilities": ["compliance", "rca", "workflow"], "reason": "bench"},
+    "규정 및 정책": {
+        "status": "violation",
+        "violations": [{"rule_name": "비밀번호 정책", "rule_content": "8자 이상", "violation_detail": "짧음", "severity": "high"}],
+        "recommendations": ["비밀번호 변경"],
+        "summary": "위반",
+    },
+    "장애 분석": {
+        "hypotheses": [{"rank": 1, "title": "커넥션 풀 고갈", "description": "d", "evidence": [], "confidence": "high", "verification_steps": []}],
+        "summary": "rca",
+    },
+    "업무 계획": {
+        "action_plan": [{"step": 1, "title": "배포", "description": "d", "risk_level": "low", "requires_approval": False, "estimated_duration": "1h", "rollback_plan": None}],
+        "total_steps": 1,
+        "overall_risk": "low",
+        "approvals_required": [],
+        "summary": "wf",
+    },
+}
+
+
+class SimulatedClient:
+    """시스템 프롬프트로 응답을 고르는 모의 LLM"""
+
+    def chat_with_system(self, system_prompt: str, user_message: str, model=None) -> str:
+        for marker, response in RESPONSES.items():
+            if marker in system_prompt[:60]:
+                return json.dumps(response, ensure_ascii=False)
+        return json.dumps(["권고사항"], ensure_ascii=False)
+
+    def chat_with_system_stream(self, system_prompt: str, user_message: str, model=None) -> Iterator[str]:
+        yield self.chat_with_system(system_prompt, user_message, model)
+
+
+class CopyCounter:
+    """AgentState 검증/덤프 횟수와 새로 만들어진 컨테이너 수"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.state_builds = 0
+        self.model_dumps = 0
+        self.containers = 0
+
+    @staticmethod
+    def count(value: Any) -> int:
+        if isinstance(value, dict):
+            return 1 + sum(CopyCounter.count(v) for v in value.values())
+        if isinstance(value, (list, tuple)):
+            return 1 + sum(CopyCounter.count(v) for v in value)
+        return 0
+
+    def install(self, state_cls: type) -> None:
+        original_init, original_dump = state_cls.__init__, state_cls.model_dump
+        counter = self
+
+        def init(self, **data):
+            original_init(self, **data)
+            counter.state_builds += 1
+            for name, value in data.items():
+                current = getattr(self, name, None)
+                if current is not value:
+                    counter.containers += counter.count(current)
+
+        def model_dump(self, *args, **kwargs):
+            counter.model_dumps += 1
+            result = original_dump(self, *args, **kwargs)
+            counter.containers += counter.count(result)
+            return result
+
+        state_cls.__init__ = init
+        state_cls.model_dump = model_dump
+
+
+def seed_stores() -> None:
+    from app.schemas.knowledge import StoreType
+    from app.services.knowledge_service import get_knowledge_service
+
+    service = get_knowledge_service()
+    stores = {"policy": StoreType.POLICY, "incident": StoreType.INCIDENT, "system": StoreType.SYSTEM}
+    for path in sorted((ROOT / "demo" / "demo_docs").glob("*.txt")):
+        store_type = stores.get(path.name.split("_", 1)[0])
+        if store_type is not None:
+            asyncio.run(service.ingest_document(path.name, path.read_bytes(), store_type, tags=["bench"]))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Agent state copy/allocation benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--attachment-kb", type=int, default=256, help="첨부 로그 파일 크기")
+    parser.add_argument("--evidence-copies", type=int, default=1, help="초기 증거로 넣을 데모 청크 반복 수")
+    args = parser.parse_args()
+
+    from app.agent import orchestrator
+    from app.agent.checkpoint import delete_checkpoints, thread_config
+    from app.agent.nodes import classify_intent
+    from app.agent.state import AgentState
+    from app.agent.subgraphs import compliance_graph, rca_graph, workflow_graph
+    from app.core.config import get_settings
+    from app.core.run_context import clear_run_memo, set_run_id
+
+    settings = get_settings()
+    client = SimulatedClient()
+    for module in (classify_intent, compliance_graph, rca_graph, workflow_graph):
+        module.get_openrouter_client = lambda: client
+    seed_stores()
+
+    counter = CopyCounter()
+    counter.install(AgentState)
+    graph = orchestrator.get_graph()
+
+    attachment = {"name": "app.log", "content": "2024-01-01 ERROR connection refused\n" * (args.attachment_kb * 1024 // 36)}
+    initial_evidence = [
+        {"type": "note", "doc_id": f"note-{i}", "content": "x" * 2000, "score": 0.5, "metadata": {"chunk_index": i}}
+        for i in range(10 * args.evidence_copies)
+    ]
+
+    rows = []
+    tracemalloc.start()
+    for i in range(args.runs + 1):
+        run_id = f"bench-{uuid.uuid4()}"
+        set_run_id(run_id)
+        state = AgentState(
+            run_id=run_id,
+            user_input="비밀번호 정책 위반 확인하고 Redis 장애 분석 후 배포 계획 세워줘",
+            files=[attachment],
+            evidence=list(initial_evidence),
+        )
+        counter.reset()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            graph.invoke(state, thread_config(run_id), durability=settings.CHECKPOINT_DURABILITY)
+        finally:
+            clear_run_memo(run_id)
+            delete_checkpoints(run_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        if i == 0:
+            continue  # 첫 run은 그래프/인덱스 초기화 포함
+        rows.append((counter.state_builds, counter.model_dumps, counter.containers, (peak - baseline) / 1024, elapsed_ms))
+    tracemalloc.stop()
+
+    print(f"runs={args.runs} attachment={args.attachment_kb}KiB initial_evidence={len(initial_evidence)}\n")
+    print(f"{'state_builds':>12} {'model_dumps':>11} {'containers_copied':>17} {'peak_kib':>9} {'ms':>7}")
+    builds, dumps, containers, peaks, times = (statistics.mean(column) for column in zip(*rows))
+    print(f"{builds:12.1f} {dumps:11.1f} {containers:17.0f} {peaks:9.1f} {times:7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
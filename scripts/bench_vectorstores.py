@@ -0,0 +1,155 @@
+"""벡터 저장소 백엔드 벤치마크 (FAISS vs Milvus Lite)
+
+기존 FAISS 저장소의 벡터/메타데이터(우리 코퍼스)를 두 백엔드에 각각 적재한 뒤
+적재 시간, 검색 지연(p50/p95), 필터 검색 지연, FAISS 대비 recall@k를 비교한다.
+코퍼스가 없으면 --synthetic N 으로 임의 벡터를 사용한다.
+
+Usage:
+    python scripts/bench_vectorstores.py --store policy
+    python scripts/bench_vectorstores.py --synthetic 20000 --dim 1536
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def load_corpus(index_dir: Path, store: str):
+    """FAISS 인덱스 디렉터리에서 벡터/ID/메타데이터 로드"""
+    import faiss
+
+    index = faiss.read_index(str(index_dir / store / "index.faiss"))
+    dump = json.loads((index_dir / store / "metadata.json").read_text(encoding="utf-8"))
+    idx_to_id = {int(k): v for k, v in dump["idx_to_id"].items()}
+    positions = sorted(idx_to_id)
+    vectors = index.reconstruct_batch(np.array(positions, dtype=np.int64))
+    ids = [idx_to_id[i] for i in positions]
+    metadatas = [dump["metadatas"][chunk_id] for chunk_id in ids]
+    return vectors, ids, metadatas
+
+
+def synthetic_corpus(n: int, dim: int, seed: int = 0):
+    """임의 벡터 코퍼스 (문서당 5청크)"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc{i // 5}_{i % 5}" for i in range(n)]
+    metadatas = [
+        {"doc_id": f"doc{i // 5}", "chunk_index": i % 5, "tags": ["even" if (i // 5) % 2 == 0 else "odd"], "text": ""}
+        for i in range(n)
+    ]
+    return vectors, ids, metadatas
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_backend(name, store, vectors, ids, metadatas, queries, top_k, batch_size):
+    """단일 백엔드 측정"""
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch_size):
+        store.add(vectors[i:i + batch_size].tolist(), metadatas[i:i + batch_size], ids[i:i + batch_size])
+    store.save()
+    ingest_s = time.perf_counter() - start
+
+    latencies, results = [], []
+    for q in queries:
+        t = time.perf_counter()
+        hits = store.search(q.tolist(), top_k=top_k)
+        latencies.append((time.perf_counter() - t) * 1000)
+        results.append([chunk_id for chunk_id, _, _ in hits])
+
+    filter_value = metadatas[0].get("doc_id")
+    filtered = []
+    for q in queries[:50]:
+        t = time.perf_counter()
+        store.search(q.tolist(), top_k=top_k, filter_metadata={"doc_id": filter_value})
+        filtered.append((time.perf_counter() - t) * 1000)
+
+    return {
+        "backend": name,
+        "count": store.count(),
+        "ingest_s": ingest_s,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "mean_ms": statistics.fmean(latencies),
+        "filter_p50_ms": percentile(filtered, 50),
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="FAISS vs Milvus Lite benchmark")
+    parser.add_argument("--store", default="policy", help="코퍼스로 사용할 저장소 유형")
+    parser.add_argument("--index-dir", type=Path, default=None, help="FAISS 인덱스 디렉터리 (기본: 설정값)")
+    parser.add_argument("--synthetic", type=int, default=0, help="임의 벡터 N개 사용")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, ids, metadatas = synthetic_corpus(args.synthetic, args.dim)
+    else:
+        from app.core.config import get_settings
+
+        index_dir = args.index_dir or get_settings().FAISS_INDEX_DIR
+        vectors, ids, metadatas = load_corpus(index_dir, args.store)
+    if len(ids) == 0:
+        print("Corpus is empty. Ingest documents first or use --synthetic N.")
+        return 1
+
+    dim = vectors.shape[1]
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(ids), size=args.queries)
+    queries = vectors[picks] + rng.normal(0, 0.05, size=(args.queries, dim)).astype(np.float32)
+
+    # 두 백엔드 모두 임시 위치에 새로 생성 (운영 데이터 비접촉)
+    work_dir = Path(tempfile.mkdtemp(prefix="trace_bench_"))
+    os.environ["FAISS_INDEX_DIR"] = str(work_dir / "faiss")
+    os.environ["VECTORSTORE_MILVUS_URI"] = str(work_dir / "milvus" / "bench.db")
+    os.environ["VECTORSTORE_MILVUS_COLLECTION"] = "bench"
+    os.environ["EMBEDDING_DIMENSION"] = str(dim)
+
+    from app.core.config import get_settings
+    get_settings.cache_clear()
+    from app.integrations.vectorstore.registry import get_vector_store
+
+    reports = []
+    for backend in ("faiss", "milvus"):
+        try:
+            store = get_vector_store("bench", backend=backend)
+        except Exception as e:
+            print(f"[skip] {backend}: {e}")
+            continue
+        reports.append(bench_backend(backend, store, vectors, ids, metadatas, queries, args.top_k, args.batch_size))
+
+    baseline = reports[0]["results"] if reports else []
+    print(f"corpus={len(ids)} dim={dim} queries={args.queries} top_k={args.top_k}")
+    print(f"{'backend':8s} {'count':>8s} {'ingest_s':>9s} {'p50_ms':>8s} {'p95_ms':>8s} {'mean_ms':>8s} {'filt_p50':>9s} {'recall@k':>9s}")
+    for report in reports:
+        recall = statistics.fmean(
+            len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(baseline, report["results"])
+        )
+        print(
+            f"{report['backend']:8s} {report['count']:8d} {report['ingest_s']:9.2f} {report['p50_ms']:8.2f} "
+            f"{report['p95_ms']:8.2f} {report['mean_ms']:8.2f} {report['filter_p50_ms']:9.2f} {recall:9.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
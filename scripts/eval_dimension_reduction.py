@@ -0,0 +1,123 @@
+"""임베딩 차원 축소 평가 (recall 손실 vs 메모리/지연 절감)
+
+원본 차원 FAISS 저장소의 벡터를 코퍼스로, 저장 벡터에 잡음을 더한 것을 쿼리로 사용한다.
+원본 차원 Flat 검색 결과를 정답으로 두고 차원/방식별 recall@k, 인덱스 메모리,
+검색 지연(p50/p95)을 비교한다. 실제 쿼리 분포를 반영하려면 --query-file 로
+쿼리 임베딩(.npy, 원본 차원)을 지정한다.
+
+Usage:
+    python scripts/eval_dimension_reduction.py --store incident
+    python scripts/eval_dimension_reduction.py --synthetic 20000 --dim 1536 --dims 128 256 512
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.integrations.vectorstore.projection import PCAProjection  # noqa: E402
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def load_store_vectors(store: str) -> np.ndarray:
+    from app.integrations.vectorstore.faiss_store import get_faiss_store
+
+    faiss_store = get_faiss_store(store)
+    positions = np.array(sorted(faiss_store.idx_to_id), dtype=np.int64)
+    if len(positions) == 0:
+        return np.zeros((0, faiss_store.dimension), dtype=np.float32)
+    return faiss_store.index.reconstruct_batch(positions)
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """앞쪽 차원에 분산이 몰린 임의 벡터 (Matryoshka 임베딩의 근사)"""
+    rng = np.random.default_rng(seed)
+    scale = 1.0 / np.sqrt(np.arange(1, dim + 1, dtype=np.float32))
+    return normalize(rng.standard_normal((n, dim)).astype(np.float32) * scale)
+
+
+def timed_search(index: faiss.Index, queries: np.ndarray, top_k: int):
+    """쿼리 1건씩 검색하여 지연 분포와 결과 반환"""
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+    return latencies, np.array(results)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Dimension reduction recall / memory / latency eval")
+    parser.add_argument("--store", default="policy", help="원본 차원 FAISS 저장소")
+    parser.add_argument("--synthetic", type=int, default=0, help="임의 벡터 N개 사용")
+    parser.add_argument("--dim", type=int, default=1536, help="--synthetic 차원")
+    parser.add_argument("--query-file", type=Path, default=None, help="쿼리 임베딩 .npy (원본 차원)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.02, help="저장 벡터 기반 쿼리 잡음 표준편차")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256, 512, 768])
+    args = parser.parse_args()
+
+    corpus = synthetic_vectors(args.synthetic, args.dim) if args.synthetic else load_store_vectors(args.store)
+    if len(corpus) == 0:
+        print("Corpus is empty. Ingest documents first or use --synthetic N.")
+        return 1
+    full_dim = corpus.shape[1]
+
+    if args.query_file:
+        queries = normalize(np.load(args.query_file))
+    else:
+        rng = np.random.default_rng(1)
+        picks = rng.integers(0, len(corpus), size=args.queries)
+        queries = normalize(corpus[picks] + rng.normal(0, args.noise, size=(args.queries, full_dim)))
+
+    top_k = min(args.top_k, len(corpus))
+    full_index = faiss.IndexFlatIP(full_dim)
+    full_index.add(corpus)
+    base_latency, truth = timed_search(full_index, queries, top_k)
+    base_memory = len(corpus) * full_dim * 4
+
+    print(f"corpus={len(corpus)} full_dim={full_dim} queries={len(queries)} top_k={top_k}")
+    print(f"{'method':11s} {'dim':>5s} {'recall@k':>9s} {'mem_mb':>8s} {'mem_%':>6s} {'p50_ms':>8s} {'p95_ms':>8s}")
+    print(f"{'full':11s} {full_dim:5d} {1.0:9.3f} {base_memory / 2**20:8.2f} {100.0:6.1f} "
+          f"{percentile(base_latency, 50):8.3f} {percentile(base_latency, 95):8.3f}")
+
+    for dim in sorted(d for d in args.dims if d < full_dim):
+        reducers = {"matryoshka": (lambda v, d=dim: normalize(v[:, :d]), 0)}
+        if dim <= min(corpus.shape):
+            pca = PCAProjection.fit(corpus, dim)
+            reducers["pca"] = (lambda v, p=pca: normalize(p.transform(v)), pca.components.nbytes + pca.mean.nbytes)
+
+        for method, (reduce, extra_bytes) in reducers.items():
+            index = faiss.IndexFlatIP(dim)
+            index.add(reduce(corpus))
+            latency, found = timed_search(index, reduce(queries), top_k)
+            recall = statistics.fmean(
+                len(set(a) & set(b)) / top_k for a, b in zip(truth, found)
+            )
+            memory = len(corpus) * dim * 4 + extra_bytes
+            print(f"{method:11s} {dim:5d} {recall:9.3f} {memory / 2**20:8.2f} {100 * memory / base_memory:6.1f} "
+                  f"{percentile(latency, 50):8.3f} {percentile(latency, 95):8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
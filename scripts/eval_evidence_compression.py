@@ -0,0 +1,147 @@
+"""증거 추출 압축 평가 (토큰 절감 vs 품질)
+
+데모 문서(demo/demo_docs)를 청킹하고 fixture 질의(scripts/fixtures/*.json 의 query,
+demo/demo_request_mixed.json)마다 hashing 임베딩으로 상위 청크를 증거로 고른 뒤,
+압축 전/후 프롬프트 증거 토큰과 질의 용어 보존율(원본 증거에 있던 질의 용어 중
+압축 후에도 남은 비율)을 비교한다. 네트워크 없이 실행된다.
+
+--llm 을 주면 같은 질의에 대해 원본/압축 증거로 각각 답변을 생성하고
+답변 간 용어 F1(일치도)을 함께 보고한다 (OPENROUTER_API_KEY 필요).
+평균 절감률이 --min-reduction 미만이거나 보존율이 --min-coverage 미만이면 종료 코드 1.
+
+Usage:
+    python scripts/eval_evidence_compression.py
+    python scripts/eval_evidence_compression.py --ratio 0.3 --top-k 8 --llm
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.agent.compression import _terms, compress_evidence  # noqa: E402
+from app.agent.prompt_builder import SECTION_SEPARATOR, get_token_counter  # noqa: E402
+from app.integrations.embeddings.registry import get_embedding_provider  # noqa: E402
+from app.integrations.parsers.text_parser import chunk_text  # noqa: E402
+
+ANSWER_PROMPT = """다음 근거 문서만 사용해 사용자 질문에 한국어로 간결하게 답하세요.
+
+### 근거
+{evidence}"""
+
+
+def load_chunks(docs_dir: Path) -> list[dict]:
+    chunks = []
+    for path in sorted(docs_dir.glob("*")):
+        if path.suffix.lower() in (".txt", ".md", ".markdown"):
+            for i, text in enumerate(chunk_text(path.read_text(encoding="utf-8"))):
+                chunks.append({"doc_id": path.stem, "content": text, "metadata": {"chunk_index": i}})
+    return chunks
+
+
+def load_queries() -> list[str]:
+    queries = []
+    for path in sorted((ROOT / "scripts" / "fixtures").glob("*.json")) + [ROOT / "demo" / "demo_request_mixed.json"]:
+        query = json.loads(path.read_text(encoding="utf-8-sig")).get("query")
+        if query:
+            queries.append(query)
+    return queries
+
+
+def evidence_text(evidence: list[dict]) -> str:
+    return SECTION_SEPARATOR.join(f"[근거: {e['doc_id']}]\n{e['content']}" for e in evidence)
+
+
+def query_terms(query: str) -> set[str]:
+    return {term for term in _terms(query) if len(term) >= 2}
+
+
+def answer_f1(a: str, b: str) -> float:
+    ta, tb = set(_terms(a)), set(_terms(b))
+    if not ta or not tb:
+        return 0.0
+    overlap = len(ta & tb)
+    precision, recall = overlap / len(tb), overlap / len(ta)
+    return 2 * precision * recall / (precision + recall) if overlap else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evidence compression token/quality eval")
+    parser.add_argument("--docs", type=Path, default=ROOT / "demo" / "demo_docs")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--ratio", type=float, default=None, help="청크당 남길 문장 비율 (기본: 설정값)")
+    parser.add_argument("--llm", action="store_true", help="원본/압축 증거로 답변을 생성해 일치도 비교")
+    parser.add_argument("--min-reduction", type=float, default=0.5)
+    parser.add_argument("--min-coverage", type=float, default=0.8)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.docs)
+    queries = load_queries()
+    if not chunks or not queries:
+        print(f"No chunks ({args.docs}) or fixture queries found")
+        return 1
+
+    provider = get_embedding_provider(provider="hashing")
+    chunk_vectors = np.asarray(provider.embed([c["content"] for c in chunks]), dtype=np.float32)
+    counter = get_token_counter()
+    client = None
+    if args.llm:
+        from app.integrations.llm.openrouter_client import get_openrouter_client
+        client = get_openrouter_client()
+
+    print(f"tokenizer={counter.name} chunks={len(chunks)} queries={len(queries)} top_k={args.top_k}\n")
+    reductions, coverages, agreements = [], [], []
+    for query in queries:
+        scores = chunk_vectors @ np.asarray(provider.embed_query(query), dtype=np.float32)
+        evidence = [
+            {**chunks[i], "score": float(scores[i])}
+            for i in np.argsort(-scores)[:args.top_k]
+        ]
+        compressed, stats = compress_evidence(query, evidence, ratio=args.ratio)
+
+        original, reduced = evidence_text(evidence), evidence_text(compressed)
+        before, after = counter.count(original), counter.count(reduced)
+        reduction = 1 - after / before if before else 0.0
+
+        present = {t for t in query_terms(query) if t in set(_terms(original))}
+        kept = {t for t in present if t in set(_terms(reduced))}
+        coverage = len(kept) / len(present) if present else 1.0
+
+        reductions.append(reduction)
+        coverages.append(coverage)
+        line = (f"tokens {before:5d} -> {after:5d} (-{reduction:.0%})  "
+                f"sentences {stats.sentences_kept}/{stats.sentences_total}  coverage={coverage:.2f}")
+
+        if client is not None:
+            full = client.chat_with_system(system_prompt=ANSWER_PROMPT.format(evidence=original), user_message=query)
+            short = client.chat_with_system(system_prompt=ANSWER_PROMPT.format(evidence=reduced), user_message=query)
+            agreements.append(answer_f1(full, short))
+            line += f"  answer_f1={agreements[-1]:.2f}"
+        print(f"{line}  | {query[:40]}")
+
+    mean_reduction, mean_coverage = statistics.mean(reductions), statistics.mean(coverages)
+    print(f"\nmean token reduction={mean_reduction:.1%}  mean query-term coverage={mean_coverage:.2f}")
+    if agreements:
+        print(f"mean answer agreement (term F1)={statistics.mean(agreements):.2f}")
+
+    failed = False
+    if mean_reduction < args.min_reduction:
+        print(f"FAIL: token reduction {mean_reduction:.1%} < {args.min_reduction:.0%}")
+        failed = True
+    if mean_coverage < args.min_coverage:
+        print(f"FAIL: query-term coverage {mean_coverage:.2f} < {args.min_coverage:.2f}")
+        failed = True
+    if not failed:
+        print("OK: compression within targets")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
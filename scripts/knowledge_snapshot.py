@@ -0,0 +1,49 @@
+"""지식 저장소 스냅샷 CLI
+
+Usage:
+    python scripts/knowledge_snapshot.py export snapshot.tar.gz [--stores policy incident]
+    python scripts/knowledge_snapshot.py import snapshot.tar.gz
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.schemas.knowledge import StoreType  # noqa: E402
+from app.services.snapshot_service import export_snapshot, import_snapshot  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="TRACE-AI knowledge store snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="저장소를 아카이브로 내보내기")
+    export_parser.add_argument("archive", type=Path)
+    export_parser.add_argument("--stores", nargs="*", choices=[s.value for s in StoreType])
+
+    import_parser = sub.add_parser("import", help="아카이브에서 저장소 복원")
+    import_parser.add_argument("archive", type=Path)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    if args.command == "export":
+        stores = [StoreType(s) for s in args.stores] if args.stores else None
+        manifest = export_snapshot(args.archive, stores)
+    else:
+        with open(args.archive, "rb") as f:
+            manifest = import_snapshot(f)
+
+    elapsed = time.perf_counter() - start
+    for store_type, info in manifest.stores.items():
+        print(f"{store_type:10s} docs={info.document_count:<6d} chunks={info.chunk_count:<8d} files={len(info.files)}")
+    print(f"{args.command} completed in {elapsed:.2f}s ({args.archive})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
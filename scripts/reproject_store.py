@@ -0,0 +1,116 @@
+"""저장소 벡터 차원 재투영 (재임베딩 없이 기존 FAISS 저장소 축소)
+
+- matryoshka: 저장된 벡터의 앞 N차원만 남기고 재정규화
+- pca: 저장된 원본 차원 벡터로 PCA를 학습하여 projection.npz 저장 후 투영
+
+축소는 되돌릴 수 없으므로 기존 인덱스는 index.faiss.bak 으로 보관한다.
+변환 후 출력되는 설정(EMBEDDING_STORE_DIMENSIONS / EMBEDDING_STORE_REDUCTION)을
+.env에 반영하고 서버를 재시작해야 쿼리도 같은 차원으로 축소된다.
+
+Usage:
+    python scripts/reproject_store.py --store incident --method matryoshka --dim 512
+    python scripts/reproject_store.py --store system --method pca --dim 256
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import get_settings  # noqa: E402
+from app.integrations.vectorstore.faiss_store import get_faiss_store  # noqa: E402
+from app.integrations.vectorstore.projection import (  # noqa: E402
+    METHOD_MATRYOSHKA,
+    METHOD_PCA,
+    PCAProjection,
+    get_store_projection,
+    projection_path,
+)
+from app.schemas.knowledge import StoreType  # noqa: E402
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-project a FAISS knowledge store to a smaller dimension")
+    parser.add_argument("--store", required=True, choices=[s.value for s in StoreType])
+    parser.add_argument("--method", required=True, choices=[METHOD_MATRYOSHKA, METHOD_PCA])
+    parser.add_argument("--dim", type=int, required=True, help="목표 차원")
+    parser.add_argument("--no-backup", action="store_true", help="기존 인덱스 백업 생략")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    store = get_faiss_store(args.store)
+    if store.count() == 0:
+        print(f"Store '{args.store}' is empty; nothing to re-project.")
+        return 1
+
+    positions = sorted(store.idx_to_id)
+    ids = [store.idx_to_id[i] for i in positions]
+    metadatas = [store.metadatas[chunk_id] for chunk_id in ids]
+    vectors = store.get_vectors(ids)
+    current_dim = vectors.shape[1]
+    proj_file = projection_path(args.store)
+
+    if args.dim >= current_dim:
+        print(f"Target dim {args.dim} must be smaller than the current dim {current_dim}.")
+        return 1
+
+    pca = None
+    if args.method == METHOD_PCA:
+        # PCA는 원본 차원 벡터에서만 학습 (이미 축소된 저장소는 재적재 필요)
+        # 원본 차원은 저장소의 임베딩 제공자 기준 (hashing / onnx 등은 EMBEDDING_DIMENSION과 다름)
+        source_dim = get_store_projection(args.store).source_dimension
+        if current_dim != source_dim:
+            print(
+                f"PCA needs full {source_dim}-dim vectors but the store has {current_dim}; "
+                "re-ingest the store first."
+            )
+            return 1
+        pca = PCAProjection.fit(vectors, args.dim)
+        reduced = normalize(pca.transform(vectors))
+    else:
+        # Matryoshka 절단은 원본 임베딩 공간에서만 의미가 있음 (PCA 공간 제외)
+        if proj_file.exists():
+            print(f"Store '{args.store}' is PCA-projected; truncation is not applicable. Re-ingest first.")
+            return 1
+        reduced = normalize(vectors[:, :args.dim])
+
+    if not args.no_backup:
+        for path in (store.index_path, proj_file):
+            if path.exists():
+                shutil.copyfile(path, path.with_name(path.name + ".bak"))
+
+    store.reset(dimension=args.dim)
+    store.add(reduced.tolist(), metadatas, ids)
+    store.save()
+
+    if pca is not None:
+        pca.save(proj_file)
+    elif proj_file.exists():
+        proj_file.unlink()
+
+    saved_mb = len(ids) * (current_dim - args.dim) * 4 / 1024 / 1024
+    print(f"Re-projected '{args.store}': {len(ids)} vectors, {current_dim} -> {args.dim} ({args.method}), "
+          f"index memory -{saved_mb:.1f}MB")
+
+    dimensions = {**settings.EMBEDDING_STORE_DIMENSIONS, args.store: args.dim}
+    reduction = {**settings.EMBEDDING_STORE_REDUCTION, args.store: args.method}
+    print("Update .env and restart the server:")
+    print(f"  EMBEDDING_STORE_DIMENSIONS={json.dumps(dimensions)}")
+    print(f"  EMBEDDING_STORE_REDUCTION={json.dumps(reduction)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())